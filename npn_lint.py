@@ -1,3 +1,5 @@
+#!/usr/bin/env python3
+r"""
 
 ```
 Este script, llamado `npn_lint.py`, valida nombres de archivo según una expresión regular definida. Aquí hay una explicación detallada de cómo funciona y qué hace:
@@ -117,9 +119,21 @@ REGEX = re.compile(
 Valida que los nombres de archivo cumplan la expresión
 canónica definida en el SOP.
 Uso:  python npn_lint.py <archivo1> [archivo2 ...]
+      python npn_lint.py --recursive DIR [--include GLOB] [--exclude GLOB]
+                         [--no-gitignore] [--jobs N] [--format text|jsonl] [--summary-only]
+                         [--cache [FILE]]
+      python npn_lint.py --changed-since REV [--recursive DIR ...]
+      python npn_lint.py index build DIR | latest NPN | type TIPODOC | duplicates | conflicts
+
+Como biblioteca:
+      from npn_lint import validate, validate_many
+      parsed = validate("AB12-34-567-8901-DOC-v1.0.txt")   # ParsedNPN o None
 Devuelve 0 si todos los nombres son válidos; 1 en caso contrario.
 """
-import re, sys, pathlib
+import fnmatch, hashlib, json, os, re, sys
+from functools import lru_cache
+# argparse, multiprocessing, sqlite3 and subprocess are imported where used so
+# that `import npn_lint` stays cheap for in-process callers of validate()
 
 REGEX = re.compile(
     r"^(?P<NPN>[A-Z0-9]{2,5}-[0-9]{2}-[0-9]{3}-[0-9]{4})-"
@@ -129,20 +143,754 @@ REGEX = re.compile(
     r"(?P<ext>[a-z0-9]{1,5})$"
 )
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python npn_lint.py <file1> [file2 ...]")
-        sys.exit(2)
+# Shortest possible canonical name: XX-00-000-0000-XX-r01.x
+MIN_NAME_LENGTH = 23
+_FIRST_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+VALIDATE_CACHE_SIZE = 65536
+
+
+# --- Library API -------------------------------------------------------------
+
+class ParsedNPN:
+    """Fields of a canonical file name.
+
+    Memoized results are shared between callers, so treat instances as
+    read-only (a guarding __setattr__ would triple the construction cost).
+    """
+    __slots__ = ("name", "npn", "tipodoc", "seq", "ver", "ext")
+
+    def __init__(self, name, npn, tipodoc, seq, ver, ext):
+        self.name = name
+        self.npn = npn
+        self.tipodoc = tipodoc
+        self.seq = seq
+        self.ver = ver
+        self.ext = ext
+
+    def __repr__(self):
+        return f"ParsedNPN({self.name!r})"
+
+    def __eq__(self, other):
+        return isinstance(other, ParsedNPN) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    @property
+    def version_key(self):
+        return version_key(self.ver)
+
+    def as_dict(self):
+        """Same keys as the REGEX named groups"""
+        return {"NPN": self.npn, "TipoDoc": self.tipodoc, "Seq": self.seq,
+                "Ver": self.ver, "ext": self.ext}
+
+
+def _validate(name, match=REGEX.match):
+    # Length and leading character class reject most junk before the regex runs
+    # (a full charset scan costs more than the regex failing early)
+    if len(name) < MIN_NAME_LENGTH or name[0] not in _FIRST_CHARS:
+        return None
+    m = match(name)
+    if m is None:
+        return None
+    return ParsedNPN(name, *m.groups())   # groups are NPN, TipoDoc, Seq, Ver, ext
+
+
+_validate_cached = lru_cache(maxsize=VALIDATE_CACHE_SIZE)(_validate)
+
+
+def validate(name, cache=True):
+    """Parse a bare file name; returns ParsedNPN, or None if it is not canonical.
+
+    Results are memoized (LRU) unless ``cache`` is False, which suits
+    streams of mostly unique names.
+    """
+    return _validate_cached(name) if cache else _validate(name)
+
+
+def validate_many(names, cache=False):
+    """Lazily yield (name, ParsedNPN or None) for each name in ``names``"""
+    check = _validate_cached if cache else _validate
+    for name in names:
+        yield name, check(name)
+
+
+CHUNK_SIZE = 4096   # paths handed to a worker process at a time
+PARALLEL_MIN = 2 * CHUNK_SIZE   # below this a pool costs more than it saves
+DEFAULT_CACHE = ".npn_lint_cache.json"
+DEFAULT_INDEX = ".npn_index.sqlite"
+CACHE_VERSION = 1
+INDEX_VERSION = 2
+
+# Files this tool writes (cache, index and their temporaries): the default
+# names anywhere, other paths once opened; neither is ever linted itself
+_OWN_SUFFIXES = ("", ".tmp", "-journal")
+_DEFAULT_OWN_NAMES = frozenset(f"{name}{suffix}" for name in (DEFAULT_CACHE, DEFAULT_INDEX)
+                               for suffix in _OWN_SUFFIXES)
+_OWN_FILES = set()
+_OWN_NAMES = set(_DEFAULT_OWN_NAMES)
+
+
+def _own_file(path):
+    path = os.path.abspath(path)
+    for suffix in _OWN_SUFFIXES:
+        own = f"{path}{suffix}"
+        _OWN_FILES.add(own)
+        _OWN_NAMES.add(os.path.basename(own))
+
+
+# --- .gitignore --------------------------------------------------------------
+
+def _compile_gitignore(path):
+    """Parse one .gitignore into (regex, negate, dir_only, anchored) rules"""
+    rules = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return rules
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line.startswith("**/"):
+            line, anchored = line[3:], False
+        if line:
+            rules.append((re.compile(fnmatch.translate(line)), negate, dir_only, anchored))
+    return rules
+
+
+def _ignored(ignores, rel_path, name, is_dir):
+    """Apply inherited .gitignore rules (outermost first; last match wins)"""
+    ignored = False
+    for base, rules in ignores:
+        rel = rel_path[len(base) + 1:] if base else rel_path
+        for regex, negate, dir_only, anchored in rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel if anchored else name):
+                ignored = not negate
+    return ignored
+
+
+# --- Tree walk ---------------------------------------------------------------
+
+def _matches_any(globs, rel, name):
+    return any(fnmatch.fnmatchcase(rel, g) or fnmatch.fnmatchcase(name, g) for g in globs)
+
+
+def _with_gitignore(dirpath, rel_dir, ignores, signature=""):
+    """Add the rules of ``dirpath/.gitignore`` (if any) to the inherited ones.
+
+    ``signature`` accumulates the mtimes of every applicable .gitignore so
+    cached directory results are dropped when an ancestor's rules change.
+    """
+    path = os.path.join(dirpath, ".gitignore")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return ignores, signature
+    rules = _compile_gitignore(path)
+    if rules:
+        ignores = ignores + ((rel_dir, rules),)
+    return ignores, f"{signature}{rel_dir}:{mtime};"
+
+
+def _scan_dir(dirpath, rel_dir, ignores, include, exclude):
+    """List one directory: (file names, subdirectory names) after filtering"""
+    try:
+        entries = list(os.scandir(dirpath))
+    except OSError as e:
+        print(f"npn_lint: {dirpath}: {e.strerror}", file=sys.stderr)
+        return None
+    files, subdirs = [], []
+    for entry in entries:
+        name = entry.name
+        rel = f"{rel_dir}/{name}" if rel_dir else name
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir and name == ".git":
+            continue
+        if exclude and _matches_any(exclude, rel, name):
+            continue
+        if ignores and _ignored(ignores, rel, name, is_dir):
+            continue
+        if is_dir:
+            subdirs.append(name)
+        elif name in _OWN_NAMES and (name in _DEFAULT_OWN_NAMES
+                                     or os.path.abspath(entry.path) in _OWN_FILES):
+            continue
+        elif not include or _matches_any(include, rel, name):
+            files.append(name)
+    return files, subdirs
+
+
+def _push_subdirs(stack, dirpath, rel_dir, subdirs, *state):
+    for name in reversed(subdirs):
+        stack.append((os.path.join(dirpath, name), f"{rel_dir}/{name}" if rel_dir else name)
+                     + state)
+
+
+def iter_files(root, include=(), exclude=(), gitignore=True):
+    """Yield file paths under ``root`` using os.scandir (no per-file stat calls).
+
+    ``include``/``exclude`` globs match the path relative to ``root`` or the
+    bare name; excluded and git-ignored directories are pruned, not walked.
+    """
+    stack = [(root, "", ())]
+    while stack:
+        dirpath, rel_dir, ignores = stack.pop()
+        if gitignore:
+            ignores, _ = _with_gitignore(dirpath, rel_dir, ignores)
+        scanned = _scan_dir(dirpath, rel_dir, ignores, include, exclude)
+        if scanned is None:
+            continue
+        files, subdirs = scanned
+        for name in files:
+            yield os.path.join(dirpath, name)
+        _push_subdirs(stack, dirpath, rel_dir, subdirs, ignores)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def check_paths(paths):
+    """Match a batch of paths; returns (path, groupdict or None) pairs.
+
+    Cached results may carry ``True`` instead of the groupdict for valid
+    names; ``report`` re-parses those only when it needs the fields.
+    """
+    results = []
+    for path in paths:
+        parsed = _validate(os.path.basename(path))
+        results.append((path, parsed.as_dict() if parsed else None))
+    return results
+
+
+def lint_tree(roots, include=(), exclude=(), gitignore=True, jobs=None):
+    """Stream (path, groupdict or None) for every file under ``roots``.
+
+    Walking happens in this process; chunks of paths are matched by a
+    process pool once the tree proves large enough to be worth it.
+    Results keep walk order.
+    """
+    paths = (p for root in roots for p in iter_files(root, include, exclude, gitignore))
+    chunks = _chunks(paths, CHUNK_SIZE)
+    head = []
+    for chunk in chunks:
+        head.append(chunk)
+        if len(head) * CHUNK_SIZE >= PARALLEL_MIN:
+            break
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(head) * CHUNK_SIZE < PARALLEL_MIN:
+        for chunk in head:
+            yield from check_paths(chunk)
+        for chunk in chunks:
+            yield from check_paths(chunk)
+        return
+
+    def all_chunks():
+        yield from head
+        yield from chunks
+
+    import multiprocessing as mp
+    with mp.Pool(jobs) as pool:
+        for results in pool.imap(check_paths, all_chunks()):
+            yield from results
 
-    exit_code = 0
-    for fname in sys.argv[1:]:
-        name = pathlib.Path(fname).name
-        if REGEX.match(name):
-            print(f"✔ {name} : OK")
+
+# --- Incremental cache -------------------------------------------------------
+
+def regex_fingerprint():
+    """Hash of REGEX; any change to the pattern invalidates cached results"""
+    return hashlib.sha256(f"{REGEX.pattern}\0{REGEX.flags}".encode("utf-8")).hexdigest()[:16]
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class LintCache:
+    """Per-directory lint results keyed by path, mtime and inode.
+
+    Adding, removing or renaming a file bumps its directory's mtime, so a
+    directory whose (mtime, inode) and .gitignore signature are unchanged
+    still holds exactly the cached names and needs no scandir or matching.
+    Subdirectories are still stat'ed, since their changes do not propagate up.
+    """
+
+    def __init__(self, path, include=(), exclude=(), gitignore=True):
+        self.path = path
+        _own_file(path)
+        self.key = {"version": CACHE_VERSION, "regex": regex_fingerprint(),
+                    "options": [sorted(include), sorted(exclude), gitignore]}
+        self.dirs = {}
+        self.seen = {}
+        self.hits = self.misses = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("key") == self.key:
+            self.dirs = data.get("dirs", {})
+
+    def lookup(self, key, st, signature):
+        """Return (files, invalid, subdirs) if the directory is unchanged"""
+        entry = self.dirs.get(key)
+        if (entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_ino
+                and entry[2] == signature):
+            self.hits += 1
+            self.seen[key] = entry
+            return entry[3], entry[4], entry[5]
+        return None
+
+    def store(self, key, st, signature, files, invalid, subdirs):
+        self.misses += 1
+        self.seen[key] = [st.st_mtime_ns, st.st_ino, signature, files, invalid, subdirs]
+
+    def save(self, roots):
+        """Write visited directories, keeping entries outside ``roots``"""
+        prefixes = tuple(os.path.join(os.path.abspath(r), "") for r in roots)
+        kept = {k: v for k, v in self.dirs.items()
+                if not (k + os.sep).startswith(prefixes)}
+        kept.update(self.seen)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        before = _mtime(directory)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "dirs": kept}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        # Creating the file bumped its directory's mtime; if that directory
+        # was otherwise unchanged, record the new mtime and rewrite in place
+        # (overwriting an existing file leaves the directory mtime alone)
+        entry = kept.get(directory)
+        after = _mtime(directory)
+        if entry is not None and entry[0] == before and after != before:
+            entry[0] = after
+            with open(self.path, "r+", encoding="utf-8") as f:
+                json.dump({"key": self.key, "dirs": kept}, f, separators=(",", ":"))
+                f.truncate()
+
+
+def lint_tree_cached(roots, cache, include=(), exclude=(), gitignore=True):
+    """Like ``lint_tree`` but reuse cached results for unchanged directories"""
+    match = REGEX.match
+    for root in roots:
+        stack = [(root, "", (), "")]
+        while stack:
+            dirpath, rel_dir, ignores, signature = stack.pop()
+            if gitignore:
+                ignores, signature = _with_gitignore(dirpath, rel_dir, ignores, signature)
+            try:
+                st = os.stat(dirpath)
+            except OSError as e:
+                print(f"npn_lint: {dirpath}: {e.strerror}", file=sys.stderr)
+                continue
+            key = os.path.abspath(dirpath)
+            cached = cache.lookup(key, st, signature)
+            if cached is None:
+                scanned = _scan_dir(dirpath, rel_dir, ignores, include, exclude)
+                if scanned is None:
+                    continue
+                files, subdirs = scanned
+                invalid = [name for name in files if not match(name)]
+                cache.store(key, st, signature, files, invalid, subdirs)
+            else:
+                files, invalid, subdirs = cached
+            invalid = set(invalid)
+            for name in files:
+                yield os.path.join(dirpath, name), None if name in invalid else True
+            _push_subdirs(stack, dirpath, rel_dir, subdirs, ignores, signature)
+
+
+def _git(*args):
+    import subprocess
+    result = subprocess.run(("git",) + args, capture_output=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip())
+    return result.stdout
+
+
+def changed_paths(rev, roots=(), include=(), exclude=()):
+    """Existing files added, copied, modified or renamed since ``rev``, plus untracked ones"""
+    top = _git("rev-parse", "--show-toplevel").decode().strip()
+    names = _git("diff", "--name-only", "--diff-filter=ACMRT", "-z", rev, "--").split(b"\0")
+    names += _git("-C", top, "ls-files", "--others", "--exclude-standard", "-z").split(b"\0")
+    roots = tuple(os.path.join(os.path.abspath(r), "") for r in roots)
+    paths = []
+    for name in dict.fromkeys(n.decode("utf-8", "surrogateescape") for n in names if n):
+        path = os.path.join(top, name)
+        if roots and not path.startswith(roots):
+            continue
+        base = os.path.basename(name)
+        if exclude and _matches_any(exclude, name, base):
+            continue
+        if include and not _matches_any(include, name, base):
+            continue
+        paths.append(os.path.relpath(path))
+    return paths
+
+
+# --- Registry index ----------------------------------------------------------
+
+def version_key(ver):
+    """``v1.10`` -> ("v", 1, 10); ``r07`` -> ("r", 7, 0)"""
+    if ver.startswith("v"):
+        major, minor = ver[1:].split(".")
+        return "v", int(major), int(minor)
+    return "r", int(ver[1:]), 0
+
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime_ns INTEGER, ino INTEGER,
+                                 signature TEXT, subdirs TEXT);
+CREATE TABLE IF NOT EXISTS docs (dir TEXT, name TEXT, npn TEXT, tipodoc TEXT, seq TEXT,
+                                 ver TEXT, scheme TEXT, major INTEGER, minor INTEGER, ext TEXT,
+                                 PRIMARY KEY (dir, name)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS docs_by_key ON docs (npn, tipodoc, seq, major, minor);
+CREATE INDEX IF NOT EXISTS docs_by_type ON docs (tipodoc, npn);
+"""
+
+_DOC_COLUMNS = "dir, name, npn, tipodoc, seq, ver, scheme, major, minor, ext"
+
+
+class NPNIndex:
+    """Persistent NPN -> TipoDoc -> Seq -> Ver -> paths index (SQLite).
+
+    Rows are keyed by (directory, name) with a composite index in
+    hierarchy order, so point queries never scan the table. ``update``
+    reuses the directory mtime/inode scheme of ``LintCache``: unchanged
+    directories are not listed again (their subdirectories are stored with
+    them) and vanished ones are purged.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX, include=(), exclude=(), gitignore=True,
+                 readonly=False):
+        self.include, self.exclude, self.gitignore = include, exclude, gitignore
+        import sqlite3
+        if readonly:
+            # Queries must not reset an index built with other options
+            self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            return
+        self.path = path
+        _own_file(path)
+        self.db = sqlite3.connect(path)
+        # A persistent journal is not created and deleted per transaction, so
+        # updating an index kept inside the tree does not touch its directory
+        self.db.execute("PRAGMA journal_mode=PERSIST")
+        self.db.executescript(_INDEX_SCHEMA)
+        key = json.dumps({"version": INDEX_VERSION, "regex": regex_fingerprint(),
+                          "options": [sorted(include), sorted(exclude), gitignore]})
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'key'").fetchone()
+        if row is None or row[0] != key:
+            with self.db:
+                # Rebuilt rather than cleared: older versions lack columns
+                self.db.execute("DROP TABLE dirs")
+                self.db.execute("DROP TABLE docs")
+                self.db.executescript(_INDEX_SCHEMA)
+                self.db.execute("INSERT OR REPLACE INTO meta VALUES ('key', ?)", (key,))
+
+    def close(self):
+        self.db.close()
+
+    def update(self, root):
+        """Bring the index in line with ``root``; returns walk statistics"""
+        stats = {"reused": 0, "rescanned": 0, "purged": 0}
+        match = REGEX.match
+        known = {path: ((mtime, ino, sig), subdirs) for path, mtime, ino, sig, subdirs
+                 in self.db.execute("SELECT path, mtime_ns, ino, signature, subdirs FROM dirs")}
+        seen = set()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        before = _mtime(directory)
+        with self.db:
+            stack = [(root, "", (), "")]
+            while stack:
+                dirpath, rel_dir, ignores, signature = stack.pop()
+                if self.gitignore:
+                    ignores, signature = _with_gitignore(dirpath, rel_dir, ignores, signature)
+                try:
+                    st = os.stat(dirpath)
+                except OSError:
+                    continue
+                key = os.path.abspath(dirpath)
+                seen.add(key)
+                entry = known.get(key)
+                if entry is not None and entry[0] == (st.st_mtime_ns, st.st_ino, signature):
+                    stats["reused"] += 1
+                    subdirs = json.loads(entry[1])
+                else:
+                    scanned = _scan_dir(dirpath, rel_dir, ignores, self.include, self.exclude)
+                    if scanned is None:
+                        continue
+                    files, subdirs = scanned
+                    stats["rescanned"] += 1
+                    rows = []
+                    for name in files:
+                        m = match(name)
+                        if m:
+                            g = m.groupdict()
+                            scheme, major, minor = version_key(g["Ver"])
+                            rows.append((key, name, g["NPN"], g["TipoDoc"], g["Seq"] or "",
+                                         g["Ver"], scheme, major, minor, g["ext"]))
+                    self.db.execute("DELETE FROM docs WHERE dir = ?", (key,))
+                    self.db.executemany(f"INSERT INTO docs ({_DOC_COLUMNS}) "
+                                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                    self.db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?)",
+                                    (key, st.st_mtime_ns, st.st_ino, signature, json.dumps(subdirs)))
+                _push_subdirs(stack, dirpath, rel_dir, subdirs, ignores, signature)
+
+            prefix = os.path.join(os.path.abspath(root), "")
+            gone = [(path,) for path in known
+                    if path not in seen and (path + os.sep).startswith(prefix)]
+            self.db.executemany("DELETE FROM docs WHERE dir = ?", gone)
+            self.db.executemany("DELETE FROM dirs WHERE path = ?", gone)
+            stats["purged"] = len(gone)
+        # Creating the index (or its journal) bumped its own directory's
+        # mtime; keep that directory reusable if nothing else changed in it
+        after = _mtime(directory)
+        entry = self.db.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (directory,)).fetchone()
+        if entry is not None and entry[0] == before and after != before:
+            with self.db:
+                self.db.execute("UPDATE dirs SET mtime_ns = ? WHERE path = ?", (after, directory))
+        return stats
+
+    def _rows(self, sql, params=()):
+        cursor = self.db.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        for row in cursor:
+            doc = dict(zip(names, row))
+            doc["path"] = os.path.join(doc.pop("dir"), doc.pop("name"))
+            yield doc
+
+    def latest(self, npn, tipodoc=None, seq=None):
+        """Highest version of each (TipoDoc, Seq) registered under ``npn``.
+
+        ``vX.Y`` and ``rNN`` numbers are not comparable, so a document
+        numbered in both schemes gets one result per scheme (see ``conflicts``).
+        """
+        sql = f"SELECT {_DOC_COLUMNS} FROM docs WHERE npn = ?"
+        params = [npn]
+        if tipodoc is not None:
+            sql += " AND tipodoc = ?"
+            params.append(tipodoc)
+        if seq is not None:
+            sql += " AND seq = ?"
+            params.append(seq)
+        sql += " ORDER BY tipodoc, seq, scheme, major DESC, minor DESC"
+        result, last = [], None
+        for doc in self._rows(sql, params):
+            group = (doc["tipodoc"], doc["seq"], doc["scheme"])
+            if group != last:
+                result.append(doc)
+                last = group
+        return result
+
+    def by_type(self, tipodoc):
+        """Every document of type ``tipodoc``"""
+        return list(self._rows(f"SELECT {_DOC_COLUMNS} FROM docs WHERE tipodoc = ? "
+                               "ORDER BY npn, seq, major, minor", (tipodoc,)))
+
+    def duplicates(self):
+        """Same NPN/TipoDoc/Seq/Ver registered at more than one path"""
+        return list(self._rows(
+            f"SELECT {_DOC_COLUMNS} FROM docs WHERE (npn, tipodoc, seq, ver) IN ("
+            "  SELECT npn, tipodoc, seq, ver FROM docs"
+            "  GROUP BY npn, tipodoc, seq, ver HAVING COUNT(*) > 1)"
+            " ORDER BY npn, tipodoc, seq, ver"))
+
+    def conflicts(self):
+        """Documents whose versions clash: mixed v/r schemes, or one version spelled two ways"""
+        return list(self._rows(
+            f"SELECT {_DOC_COLUMNS} FROM docs WHERE (npn, tipodoc, seq) IN ("
+            "  SELECT npn, tipodoc, seq FROM docs GROUP BY npn, tipodoc, seq"
+            "  HAVING COUNT(DISTINCT scheme) > 1"
+            "  UNION"
+            "  SELECT npn, tipodoc, seq FROM docs GROUP BY npn, tipodoc, seq, scheme, major, minor"
+            "  HAVING COUNT(DISTINCT ver) > 1)"
+            " ORDER BY npn, tipodoc, seq, major, minor"))
+
+
+def index_main(argv):
+    import argparse
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DEFAULT_INDEX, help=f"index file (default: {DEFAULT_INDEX})")
+    common.add_argument("--format", choices=("text", "jsonl"), default="text")
+    parser = argparse.ArgumentParser(prog="npn_lint.py index",
+                                     description="Build and query the NPN registry index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", parents=[common],
+                                help="create or incrementally update the index")
+    build.add_argument("dirs", nargs="+", metavar="DIR")
+    build.add_argument("--include", action="append", default=[], metavar="GLOB")
+    build.add_argument("--exclude", action="append", default=[], metavar="GLOB")
+    build.add_argument("--no-gitignore", dest="gitignore", action="store_false")
+    latest = commands.add_parser("latest", parents=[common], help="latest version of each document of an NPN")
+    latest.add_argument("npn")
+    latest.add_argument("--type", dest="tipodoc")
+    latest.add_argument("--seq")
+    by_type = commands.add_parser("type", parents=[common], help="all documents of a type")
+    by_type.add_argument("tipodoc")
+    commands.add_parser("duplicates", parents=[common], help="versions registered at more than one path")
+    commands.add_parser("conflicts", parents=[common], help="inconsistent version numbering")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = NPNIndex(args.db, args.include, args.exclude, args.gitignore)
+        for root in args.dirs:
+            stats = index.update(root)
+            print(f"{root}: {stats['rescanned']} directories indexed, "
+                  f"{stats['reused']} unchanged, {stats['purged']} removed", file=sys.stderr)
+        index.close()
+        return 0
+
+    if not os.path.exists(args.db):
+        print(f"npn_lint: no index at {args.db}; run 'index build DIR' first", file=sys.stderr)
+        return 2
+    index = NPNIndex(args.db, readonly=True)
+    if args.command == "latest":
+        docs = index.latest(args.npn, args.tipodoc, args.seq)
+    elif args.command == "type":
+        docs = index.by_type(args.tipodoc)
+    elif args.command == "duplicates":
+        docs = index.duplicates()
+    else:
+        docs = index.conflicts()
+    index.close()
+
+    for doc in docs:
+        if args.format == "jsonl":
+            print(json.dumps(doc, ensure_ascii=False))
         else:
-            print(f"✖ {name} : INVALID")
-            exit_code = 1
-    sys.exit(exit_code)
+            seq = f"-{doc['seq']}" if doc["seq"] else ""
+            print(f"{doc['npn']}-{doc['tipodoc']}{seq} {doc['ver']:<8} {os.path.relpath(doc['path'])}")
+    # Lookups fail when nothing matched; audits fail when they found something
+    if args.command in ("duplicates", "conflicts"):
+        return 1 if docs else 0
+    return 0 if docs else 1
+
+
+# --- Output ------------------------------------------------------------------
+
+def report(results, fmt="text", summary_only=False, out=sys.stdout):
+    """Write results as they arrive; returns (checked, invalid)"""
+    checked = invalid = 0
+    write = out.write
+    for path, groups in results:
+        checked += 1
+        if groups is None:
+            invalid += 1
+        if summary_only:
+            continue
+        if fmt == "jsonl":
+            if groups is True:
+                groups = REGEX.match(os.path.basename(path)).groupdict()
+            write(json.dumps({"type": "file", "path": path, "valid": groups is not None,
+                              "fields": groups}, ensure_ascii=False) + "\n")
+        elif groups is not None:
+            write(f"✔ {os.path.basename(path)} : OK\n")
+        else:
+            write(f"✖ {os.path.basename(path)} : INVALID\n")
+    return checked, invalid
+
+
+def _parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="npn_lint.py", description="Validate file names against the canonical NPN pattern")
+    parser.add_argument("files", nargs="*", help="file names to check")
+    parser.add_argument("-r", "--recursive", action="append", default=[], metavar="DIR",
+                        help="check every file under DIR (repeatable)")
+    parser.add_argument("--include", action="append", default=[], metavar="GLOB",
+                        help="only check files matching GLOB (repeatable)")
+    parser.add_argument("--exclude", action="append", default=[], metavar="GLOB",
+                        help="skip files and directories matching GLOB (repeatable)")
+    parser.add_argument("--no-gitignore", dest="gitignore", action="store_false",
+                        help="do not honour .gitignore files")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="worker processes for matching (default: CPU count)")
+    parser.add_argument("--format", choices=("text", "jsonl"), default="text")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="print only the totals")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE, metavar="FILE",
+                        help=f"reuse results for unchanged directories (default file: {DEFAULT_CACHE})")
+    parser.add_argument("--changed-since", metavar="REV",
+                        help="only lint files changed since the git revision REV "
+                             "(restricted to --recursive DIRs if given)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["index"]:
+        sys.exit(index_main(argv[1:]))
+    args = _parse_args(argv)
+    if not args.files and not args.recursive and not args.changed_since:
+        print("Usage: python npn_lint.py <file1> [file2 ...] | --recursive DIR | --changed-since REV")
+        sys.exit(2)
+
+    files = list(args.files)
+    if args.changed_since:
+        try:
+            files += changed_paths(args.changed_since, args.recursive, args.include, args.exclude)
+        except (OSError, RuntimeError) as e:
+            print(f"npn_lint: git failed: {e}", file=sys.stderr)
+            sys.exit(2)
+    tree_mode = bool(args.recursive) and not args.changed_since
+    cache = (LintCache(args.cache, args.include, args.exclude, args.gitignore)
+             if args.cache and tree_mode else None)
+
+    try:
+        results = check_paths(files)
+        checked, invalid = report(results, args.format, args.summary_only)
+        if tree_mode:
+            if cache:
+                tree = lint_tree_cached(args.recursive, cache, args.include, args.exclude,
+                                        args.gitignore)
+            else:
+                tree = lint_tree(args.recursive, args.include, args.exclude, args.gitignore,
+                                 args.jobs)
+            more_checked, more_invalid = report(tree, args.format, args.summary_only)
+            checked += more_checked
+            invalid += more_invalid
+    except BrokenPipeError:
+        # Output closed early (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    if cache:
+        cache.save(args.recursive)
+
+    totals = args.recursive or args.changed_since or args.summary_only
+    if args.format == "jsonl":
+        if totals:
+            print(json.dumps({"type": "summary", "checked": checked, "invalid": invalid}))
+    elif totals:
+        print(f"{checked} checked, {invalid} invalid")
+    if cache:
+        print(f"cache: {cache.hits} directories reused, {cache.misses} rescanned", file=sys.stderr)
+    sys.exit(1 if invalid else 0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q AGAD Phase Analytics
+Bounded columnar AGAD phase store with vectorized readiness, pass-rate and coverage analytics
+"""
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from agad_matrix import AGADMatrix, phase_key
+from metric_ring_buffer import ColumnarRingBuffer
+
+# A phase is ready to advance once it passed with more than this V&V coverage
+READINESS_COVERAGE = 80.0
+# Coverage histogram edges (10% bins; 100% falls in the last bin)
+COVERAGE_BINS = np.arange(0.0, 101.0, 10.0)
+
+# In-memory columns. The free-text validation report is not kept in memory;
+# it stays in the telemetry store's "agad" table when one is configured.
+AGAD_FIELDS = {
+    "phase_id": "|S32",
+    "trl_level": "<i8",
+    "verification_method": "|S64",
+    "passed": "|u1",
+    "coverage_percentage": "<f8",   # NaN when not reported
+    "timestamp_utc": "<i8",
+    "method_valid": "<i1",          # 1 valid, 0 not in the matrix entry, -1 pair unknown
+}
+RECORD_FIELDS = tuple(name for name in AGAD_FIELDS if name != "method_valid")
+
+
+def _decode(value: bytes) -> str:
+    return value.decode("utf-8", errors="replace")
+
+
+def _fits(name: str, data: bytes) -> bytes:
+    """``data`` if it fits the fixed-width column ``name``; cutting it would merge phases"""
+    width = np.dtype(AGAD_FIELDS[name]).itemsize
+    if len(data) > width:
+        raise ValueError(f"{name} is {len(data)} bytes, the AGAD record holds {width}: {_decode(data)!r}")
+    return data
+
+
+def _typed(values: Any, name: str) -> np.ndarray:
+    dtype = AGAD_FIELDS[name]
+    if dtype.startswith("|S") and isinstance(values, (list, tuple)):
+        values = [v.encode("utf-8") if isinstance(v, str) else v for v in values]
+    values = np.asarray(values)
+    if dtype.startswith("|S") and values.dtype.kind == "U":
+        values = np.array([v.encode("utf-8") for v in values.tolist()])
+    if dtype.startswith("|S") and values.dtype.itemsize > np.dtype(dtype).itemsize:
+        for value in values[np.char.str_len(values) > np.dtype(dtype).itemsize][:1].tolist():
+            _fits(name, value)
+    elif dtype == "<f8" and values.dtype == object:
+        values = np.array([np.nan if v is None else v for v in values.tolist()], dtype=np.float64)
+    return values.astype(dtype, copy=False)
+
+
+def agad_columns(samples) -> Dict[str, np.ndarray]:
+    """Convert AGADPhaseData records (or a mapping of columns) to typed columns.
+
+    Strings become fixed-width UTF-8 bytes (a ValueError names any value
+    too long for its column) and a missing coverage becomes NaN.
+    ``validation_report`` is passed through untouched when present so
+    callers can hand the same columns to the telemetry store.
+    """
+    if isinstance(samples, dict):
+        columns = {name: _typed(samples[name], name) for name in RECORD_FIELDS}
+        if "validation_report" in samples:
+            columns["validation_report"] = samples["validation_report"]
+        return columns
+    columns = {
+        name: _typed([getattr(sample, name) for sample in samples], name)
+        for name in RECORD_FIELDS if name != "coverage_percentage"
+    }
+    columns["coverage_percentage"] = np.array(
+        [sample.coverage_percentage for sample in samples], dtype=np.float64)   # None -> NaN
+    columns["validation_report"] = [sample.validation_report for sample in samples]
+    return columns
+
+
+def next_phase_readiness(passed: np.ndarray, coverage: np.ndarray) -> np.ndarray:
+    """Vectorized ``passed and (coverage or 0) > 80``"""
+    return np.asarray(passed, dtype=bool) & (np.nan_to_num(coverage, nan=0.0) > READINESS_COVERAGE)
+
+
+def method_validity(matrix: Optional[AGADMatrix], columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Per-row 1/0/-1 verification check against the AGAD matrix.
+
+    Only the distinct (phase, TRL, method) combinations are decoded and
+    looked up, so a portfolio of thousands of programs costs a handful of
+    matrix lookups plus one ``np.unique``.
+    """
+    count = len(columns["trl_level"])
+    if matrix is None or count == 0:
+        return np.full(count, -1, dtype=np.int8)
+    phases, phase_index = np.unique(columns["phase_id"], return_inverse=True)
+    methods, method_index = np.unique(columns["verification_method"], return_inverse=True)
+    trl = np.asarray(columns["trl_level"], dtype=np.int64)
+    trl_min = int(trl.min())
+    span = int(trl.max()) - trl_min + 1
+    combo = ((phase_index.reshape(-1) * len(methods) + method_index.reshape(-1)) * span
+             + (trl - trl_min))
+    combos, inverse = np.unique(combo, return_inverse=True)
+    trls, rest = combos % span + trl_min, combos // span
+    masks = matrix.validate_batch([_decode(p) for p in phases[rest // len(methods)].tolist()],
+                                  trls.tolist(),
+                                  [_decode(m) for m in methods[rest % len(methods)].tolist()])
+    codes = np.where(masks["known"], masks["valid"].astype(np.int8), np.int8(-1))
+    return codes[inverse.reshape(-1)]
+
+
+def _grouped_percentiles(values: np.ndarray, groups: np.ndarray, counts: np.ndarray,
+                         quantiles: Sequence[float]) -> Dict[float, np.ndarray]:
+    """Linear-interpolated percentiles of ``values`` per group from one sort"""
+    order = np.lexsort((values, groups))
+    ordered = values[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = max(len(ordered) - 1, 0)
+    result = {}
+    for q in quantiles:
+        position = q * np.maximum(counts - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        if len(ordered):
+            lo_values = ordered[np.minimum(starts + low, last)]
+            hi_values = ordered[np.minimum(starts + high, last)]
+            estimate = lo_values + (position - low) * (hi_values - lo_values)
+        else:
+            estimate = np.zeros(len(counts))
+        result[q] = np.where(counts > 0, estimate, np.nan)
+    return result
+
+
+def _rate(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / np.maximum(denominator, 1), np.nan)
+
+
+def phase_analytics(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Readiness, pass rate and coverage distribution per (phase, TRL) in one pass.
+
+    ``columns`` holds at least ``phase_id``, ``trl_level``, ``passed`` and
+    ``coverage_percentage`` (``method_valid`` is optional). Phase ids are
+    normalized with :func:`agad_matrix.phase_key`, so ``"AGAD 2/5"`` and
+    ``"2"`` are the same phase. Per-group results are aligned arrays under
+    ``groups``; ``phases`` rolls them up per phase across TRLs.
+    """
+    phase_ids = np.asarray(columns["phase_id"])
+    trl = np.asarray(columns["trl_level"], dtype=np.int64)
+    passed = np.asarray(columns["passed"], dtype=bool)
+    coverage = np.asarray(columns["coverage_percentage"], dtype=np.float64)
+    ready = next_phase_readiness(passed, coverage)
+    count = len(trl)
+    bins = len(COVERAGE_BINS) - 1
+
+    if count:
+        distinct, id_index = np.unique(phase_ids, return_inverse=True)
+        keys = [phase_key(_decode(p) if isinstance(p, bytes) else p) or
+                (_decode(p) if isinstance(p, bytes) else p) for p in distinct.tolist()]
+        phases, key_index = np.unique(np.asarray(keys, dtype=str), return_inverse=True)
+        phase_index = key_index.reshape(-1)[id_index.reshape(-1)]
+        trl_min = int(trl.min())
+        span = int(trl.max()) - trl_min + 1
+        group_ids, group_index = np.unique(phase_index * span + (trl - trl_min), return_inverse=True)
+        group_index = group_index.reshape(-1)
+    else:
+        phases = np.empty(0, dtype=str)
+        phase_index = group_index = np.empty(0, dtype=np.int64)
+        group_ids = np.empty(0, dtype=np.int64)
+        trl_min, span = 0, 1
+    size = len(group_ids)
+
+    group_count = np.bincount(group_index, minlength=size)
+    group_passed = np.bincount(group_index, weights=passed, minlength=size).astype(np.int64)
+    group_ready = np.bincount(group_index, weights=ready, minlength=size).astype(np.int64)
+
+    reported = ~np.isnan(coverage)
+    covered_groups = group_index[reported]
+    covered = coverage[reported]
+    coverage_count = np.bincount(covered_groups, minlength=size)
+    coverage_mean = _rate(np.bincount(covered_groups, weights=covered, minlength=size), coverage_count)
+    percentiles = _grouped_percentiles(covered, covered_groups, coverage_count, (0.5, 0.9))
+    bin_index = np.clip((covered // (100.0 / bins)).astype(np.int64), 0, bins - 1)
+    histogram = np.bincount(covered_groups * bins + bin_index,
+                            minlength=size * bins).reshape(size, bins)
+
+    groups = {
+        "phase": phases[group_ids // span],
+        "trl_level": group_ids % span + trl_min,
+        "count": group_count,
+        "passed": group_passed,
+        "pass_rate": _rate(group_passed, group_count),
+        "ready": group_ready,
+        "readiness_rate": _rate(group_ready, group_count),
+        "coverage_count": coverage_count,
+        "coverage_mean": coverage_mean,
+        "coverage_p50": percentiles[0.5],
+        "coverage_p90": percentiles[0.9],
+        "coverage_histogram": histogram,
+    }
+    if "method_valid" in columns:
+        invalid = np.asarray(columns["method_valid"]) == 0
+        groups["unexpected_methods"] = np.bincount(group_index, weights=invalid,
+                                                   minlength=size).astype(np.int64)
+
+    # Per-phase rollup across TRLs
+    phase_count = np.bincount(phase_index, minlength=len(phases))
+    phase_passed = np.bincount(phase_index, weights=passed, minlength=len(phases))
+    phase_ready = np.bincount(phase_index, weights=ready, minlength=len(phases))
+    return {
+        "count": count,
+        "pass_rate": float(passed.mean()) if count else None,
+        "readiness_rate": float(ready.mean()) if count else None,
+        "coverage_mean": float(covered.mean()) if len(covered) else None,
+        "coverage_bins": COVERAGE_BINS,
+        "coverage_histogram": histogram.sum(axis=0),
+        "groups": groups,
+        "phases": {
+            "phase": phases,
+            "count": phase_count,
+            "pass_rate": _rate(phase_passed, phase_count),
+            "readiness_rate": _rate(phase_ready, phase_count),
+        },
+    }
+
+
+class AGADPhaseStore:
+    """Bounded columnar store of AGAD phase records.
+
+    The newest ``capacity`` records live in a :class:`ColumnarRingBuffer`, so
+    memory is fixed no matter how long the monitor runs. When a spill table
+    (the telemetry store's ``agad`` stream) is attached, every record is
+    also appended there and older history stays queryable from disk.
+    """
+
+    def __init__(self, capacity: int = 10000, spill=None):
+        self.buffer = ColumnarRingBuffer(AGAD_FIELDS, capacity)
+        self.spill = spill
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    @property
+    def capacity(self) -> int:
+        return self.buffer.capacity
+
+    def append(self, record, method_valid: Optional[bool] = None) -> None:
+        """Store one AGADPhaseData; ``method_valid`` is the matrix check (None if unknown).
+
+        Raises ValueError for a phase id or method longer than its column.
+        """
+        coverage = record.coverage_percentage
+        self.buffer.append({
+            "phase_id": _fits("phase_id", record.phase_id.encode("utf-8")),
+            "trl_level": record.trl_level,
+            "verification_method": _fits("verification_method", record.verification_method.encode("utf-8")),
+            "passed": record.passed,
+            "coverage_percentage": np.nan if coverage is None else coverage,
+            "timestamp_utc": record.timestamp_utc,
+            "method_valid": -1 if method_valid is None else int(method_valid),
+        })
+        if self.spill is not None:
+            self.spill.append(record)
+
+    def extend(self, columns: Dict[str, Any], method_valid: Optional[np.ndarray] = None,
+               spill: bool = True) -> None:
+        """Store a batch given as :func:`agad_columns` output"""
+        count = len(columns["timestamp_utc"])
+        if method_valid is None:
+            method_valid = np.full(count, -1, dtype=np.int8)
+        self.buffer.extend({**{name: columns[name] for name in RECORD_FIELDS},
+                            "method_valid": method_valid})
+        if spill and self.spill is not None:
+            if "validation_report" not in columns:
+                columns = {**columns, "validation_report": [""] * count}
+            self.spill.append_columns(columns)
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        return self.buffer.window(n)
+
+    def analytics(self, n: Optional[int] = None, history: bool = False,
+                  start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, Any]:
+        """:func:`phase_analytics` over the newest ``n`` records in memory.
+
+        With ``history`` the spill table is read instead, optionally limited
+        to ``start_ts <= timestamp_utc <= end_ts``.
+        """
+        if not history:
+            return phase_analytics(self.buffer.window(n))
+        if self.spill is None:
+            raise ValueError("AGAD history needs a telemetry store")
+        int64 = np.iinfo(np.int64)
+        columns = self.spill.query(int64.min if start_ts is None else start_ts,
+                                   int64.max if end_ts is None else end_ts,
+                                   ("phase_id", "trl_level", "passed", "coverage_percentage"))
+        return phase_analytics(columns)
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q AGAD TRL/V&V Matrix
+Indexed (phase, TRL) lookups over AGAD-TRL-VV-TABLE.md with an mtime-checked binary cache
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from monitor_snapshot import decode_json, encode_json, read_snapshot, write_snapshot
+
+DEFAULT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "AGAD-TRL-VV-TABLE.md")
+
+# Sustainability recommendations by TRL band (previously if/elif chains in the monitor)
+_CONCEPT_RECOMMENDATIONS = (
+    "Integrate sustainability metrics into concept definition",
+    "Establish baseline CO2 and resource criticality targets",
+    "Identify sustainable material alternatives early",
+)
+_DESIGN_RECOMMENDATIONS = (
+    "Optimize design for material efficiency",
+    "Implement circular economy principles",
+    "Validate sustainability models with prototypes",
+)
+_DEVELOPMENT_RECOMMENDATIONS = (
+    "Monitor real-world sustainability performance",
+    "Implement adaptive optimization algorithms",
+    "Prepare for operational sustainability monitoring",
+)
+_OPERATIONAL_RECOMMENDATIONS = (
+    "Continuous sustainability optimization",
+    "Fleet-wide performance monitoring",
+    "End-of-life planning and circular economy implementation",
+)
+# Index = TRL level 0..9; anything above is operational
+TRL_RECOMMENDATIONS = ((_CONCEPT_RECOMMENDATIONS,) * 4 + (_DESIGN_RECOMMENDATIONS,) * 3
+                       + (_DEVELOPMENT_RECOMMENDATIONS,) * 3)
+
+
+def trl_recommendations(trl: int) -> Tuple[str, ...]:
+    """Shared recommendation tuple for a TRL level (O(1), never rebuilt)"""
+    if trl < 0:
+        return _CONCEPT_RECOMMENDATIONS
+    if trl < len(TRL_RECOMMENDATIONS):
+        return TRL_RECOMMENDATIONS[trl]
+    return _OPERATIONAL_RECOMMENDATIONS
+
+
+# (TRL band, phase, expected methods) -> band with the V&V mismatch advice in front
+_MISMATCH_RECOMMENDATIONS: Dict[Tuple, Tuple[str, ...]] = {}
+
+
+def phase_recommendations(trl: int, entry: Optional["MatrixEntry"] = None,
+                          method_valid: Optional[bool] = None) -> Tuple[str, ...]:
+    """Interned recommendations for a phase sample.
+
+    ``method_valid`` False (with its matrix ``entry``) prepends the expected
+    verification methods; the tuple is built once per (band, entry).
+    """
+    band = trl_recommendations(trl)
+    if entry is None or method_valid is not False:
+        return band
+    key = (band, entry.phase_id, entry.verification_methods)
+    cached = _MISMATCH_RECOMMENDATIONS.get(key)
+    if cached is None:
+        advice = (f"Use {', '.join(entry.verification_methods)} verification "
+                  f"as required for {entry.phase_id}")
+        cached = _MISMATCH_RECOMMENDATIONS.setdefault(key, (advice,) + band)
+    return cached
+
+
+@dataclass(frozen=True)
+class MatrixEntry:
+    """One row of the AGAD TRL/V&V table"""
+    phase: str
+    trl: int
+    phase_id: str
+    phase_name: str
+    data_types: str
+    vv_processes: Tuple[str, ...]
+    verification_methods: Tuple[str, ...]
+    example_report: str
+
+
+_METHOD = re.compile(r"VerificationMethod:\s*\[([^\]]*)\]")
+_REPORT = re.compile(r"ValidationReport:\s*([^`]+)`")
+_PHASE = re.compile(r"^(?:AGAD\s*)?([0-9A-Za-z]+)(?:\s*/\s*([0-9]+))?$")
+
+# Binary cache layout version (independent of the snapshot container version)
+_CACHE_FORMAT = 1
+
+
+@lru_cache(maxsize=4096)
+def phase_key(phase_id: str) -> Optional[str]:
+    """``"AGAD 2/5"``, ``"2/5"`` and ``"2"`` -> ``"2"``; None if unrecognized"""
+    match = _PHASE.match(phase_id.strip())
+    return match.group(1) if match else None
+
+
+def normalize_method(method: str) -> str:
+    """``[UseCaseReview]`` and ``UseCaseReview`` compare equal"""
+    return method.strip().strip("[]").strip()
+
+
+def parse_table(path: str) -> List[MatrixEntry]:
+    """Parse the Markdown table; rows that are not AGAD phases are skipped"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cells = [cell.strip() for cell in line.strip().strip("|").split("|")]
+            if len(cells) < 6 or not cells[0].upper().startswith("AGAD"):
+                continue
+            match = _PHASE.match(cells[0])
+            if not match or not cells[2].isdigit():
+                continue
+            artefact = cells[5]
+            report = _REPORT.search(artefact)
+            entries.append(MatrixEntry(
+                phase=match.group(1),
+                trl=int(cells[2]),
+                phase_id=cells[0],
+                phase_name=cells[1],
+                data_types=cells[3],
+                vv_processes=tuple(p.strip() for p in cells[4].split(",") if p.strip()),
+                verification_methods=tuple(
+                    normalize_method(m) for found in _METHOD.findall(artefact)
+                    for m in found.split(",") if m.strip()),
+                example_report=report.group(1).strip() if report else "",
+            ))
+    return entries
+
+
+class AGADMatrix:
+    """(phase, TRL) -> MatrixEntry index with O(1) verification checks.
+
+    ``phase_id`` values such as ``"AGAD 2/5"``, ``"2/5"`` or ``"2"`` all map
+    to phase ``"2"``; the TRL always comes from the sample itself.
+    """
+
+    def __init__(self, entries: Iterable[MatrixEntry]):
+        self.entries: Dict[Tuple[str, int], MatrixEntry] = {(e.phase, e.trl): e for e in entries}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, phase_id: str, trl: int) -> Optional[MatrixEntry]:
+        return self.entries.get((phase_key(phase_id), trl))
+
+    def expected_methods(self, phase_id: str, trl: int) -> Tuple[str, ...]:
+        entry = self.lookup(phase_id, trl)
+        return entry.verification_methods if entry else ()
+
+    def check_method(self, phase_id: str, trl: int, method: str) -> Optional[bool]:
+        """True/False against the matrix; None when (phase, TRL) is not in it"""
+        entry = self.lookup(phase_id, trl)
+        if entry is None:
+            return None
+        return normalize_method(method) in entry.verification_methods
+
+    def validate_batch(self, phase_ids: Sequence[str], trls: Sequence[int],
+                       methods: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Check many samples at once: ``known`` and ``valid`` boolean masks.
+
+        Each sample costs two dict lookups and a tuple membership test, so a
+        batch scales linearly with no per-call parsing.
+        """
+        count = len(phase_ids)
+        found = [self.entries.get((phase_key(p), int(t))) for p, t in zip(phase_ids, trls)]
+        known = np.fromiter((e is not None for e in found), dtype=bool, count=count)
+        valid = np.fromiter((e is not None and normalize_method(m) in e.verification_methods
+                             for e, m in zip(found, methods)), dtype=bool, count=count)
+        return {"known": known, "valid": valid}
+
+    # --- Binary cache --------------------------------------------------------
+
+    def to_sections(self) -> Dict[str, np.ndarray]:
+        rows = [[e.phase, e.trl, e.phase_id, e.phase_name, e.data_types,
+                 list(e.vv_processes), list(e.verification_methods), e.example_report]
+                for e in self.entries.values()]
+        return {"entries": encode_json(rows)}
+
+    @classmethod
+    def from_sections(cls, sections: Dict[str, np.ndarray]) -> "AGADMatrix":
+        return cls(MatrixEntry(phase, trl, phase_id, name, data_types, tuple(vv), tuple(methods),
+                               report)
+                   for phase, trl, phase_id, name, data_types, vv, methods, report
+                   in decode_json(sections["entries"]))
+
+
+def _cache_path(table_path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(table_path))
+    return os.path.join(directory, "__pycache__", f"{name}.agadcache")
+
+
+# Process-wide: every monitor in a fleet worker shares one parsed matrix
+_LOADED: Dict[str, Tuple[int, AGADMatrix]] = {}
+
+
+def load_matrix(path: str = DEFAULT_TABLE, use_cache: bool = True) -> AGADMatrix:
+    """Load the matrix, reparsing the Markdown only when its mtime changed.
+
+    The parsed form is kept per process and, when ``use_cache`` is set,
+    in a binary snapshot under ``__pycache__`` next to the table.
+    """
+    st = os.stat(path)
+    loaded = _LOADED.get(path)
+    if loaded and loaded[0] == st.st_mtime_ns:
+        return loaded[1]
+
+    matrix = None
+    cache = _cache_path(path)
+    stamp = [_CACHE_FORMAT, st.st_mtime_ns, st.st_size]
+    if use_cache:
+        try:
+            sections = read_snapshot(cache)
+            if decode_json(sections["source"]) == stamp:
+                matrix = AGADMatrix.from_sections(sections)
+        except Exception:
+            # Missing, truncated (a worker died mid-write) or otherwise
+            # unreadable: the cache is only a shortcut, reparse the table
+            matrix = None
+    if matrix is None:
+        matrix = AGADMatrix(parse_table(path))
+        if use_cache:
+            try:
+                os.makedirs(os.path.dirname(cache), exist_ok=True)
+                write_snapshot(cache, {"source": encode_json(stamp), **matrix.to_sections()},
+                               fsync=False)
+            except OSError:
+                pass   # read-only checkout: the in-process copy still applies
+    _LOADED[path] = (st.st_mtime_ns, matrix)
+    return matrix
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Monitor Benchmark
+Reproducible synthetic load generation and regression gating for the sustainability monitor
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sustainability_ai_monitor import (
+    AGADPhaseData,
+    CO2Metrics,
+    ResourceMetrics,
+    SustainabilityAIMonitor,
+)
+
+STREAMS = ("co2", "resource", "agad")
+
+# Stream -> (per-sample coroutine, batch coroutine or None)
+_ENTRY_POINTS = {
+    "co2": ("process_co2_metrics", "process_co2_metrics_batch"),
+    "resource": ("process_resource_metrics", "process_resource_metrics_batch"),
+    "agad": ("process_agad_phase", "process_agad_phases_batch"),
+}
+
+_VERIFICATION_METHODS = ("UseCaseReview", "TradeStudyReview", "LabPrototypeTest",
+                         "SystemPrototypeTest", "FlightTest")
+
+# Metrics compared by ``compare``: (path, higher_is_better)
+_GATED_METRICS = (
+    (("throughput_per_s",), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p99"), False),
+    (("startup", "to_first_result_ms"), False),
+    (("startup", "import_ms"), False),
+)
+
+# Child process for the startup benchmark: a cold interpreter importing the
+# monitor and running its health check (see sustainability_ai_monitor --check)
+_STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+import sustainability_ai_monitor
+imported = time.perf_counter()
+numpy_on_import = "numpy" in sys.modules
+import asyncio, json
+report = asyncio.run(sustainability_ai_monitor.health_check(sys.argv[1], {lazy}))
+report["timings_ms"]["import"] = (imported - started) * 1000
+report["numpy_on_import"] = numpy_on_import
+print(json.dumps(report))
+"""
+
+
+@dataclass
+class LoadProfile:
+    """Shape of the synthetic load (all fields land in the result JSON)"""
+    assets: int = 8
+    ticks: int = 500                   # samples generated per asset
+    rate_hz: float = 0.0               # ticks per second; 0 runs unthrottled
+    mix: Dict[str, float] = field(default_factory=lambda: {"co2": 1.0, "resource": 1.0, "agad": 0.1})
+    distribution: str = "normal"       # normal | uniform | lognormal noise around the baselines
+    noise: float = 0.1                 # relative noise scale
+    burst_probability: float = 0.01    # chance per asset and tick that a breach burst starts
+    burst_length: int = 20             # ticks a burst lasts
+    burst_factor: float = 1.6          # multiplier applied to emissions/risk during a burst
+    batch_size: int = 0                # >0 drives the *_batch coroutines with this many samples
+    seed: int = 1
+
+
+class SyntheticLoad:
+    """Deterministic per-asset telemetry generator with breach bursts.
+
+    Values are drawn around the nominal sample in ``main()`` of the monitor;
+    a burst scales emissions and supply risk past the HIGH/CRITICAL
+    thresholds so the slow paths are exercised too.
+    """
+
+    def __init__(self, profile: LoadProfile):
+        self.profile = profile
+        self.rng = np.random.default_rng(profile.seed)
+        self.burst_left = np.zeros(profile.assets, dtype=np.int64)
+        self.phase_step = np.zeros(profile.assets, dtype=np.int64)
+        weights = np.array([profile.mix.get(s, 0.0) for s in STREAMS], dtype=np.float64)
+        if weights.sum() <= 0:
+            raise ValueError("load mix must give at least one stream a positive weight")
+        self.stream_weights = weights / weights.sum()
+
+    def _noise(self, size) -> np.ndarray:
+        p = self.profile
+        if p.distribution == "normal":
+            return 1.0 + p.noise * self.rng.standard_normal(size)
+        if p.distribution == "uniform":
+            return 1.0 + p.noise * self.rng.uniform(-1.7320508, 1.7320508, size)   # unit variance
+        if p.distribution == "lognormal":
+            return self.rng.lognormal(0.0, p.noise, size)
+        raise ValueError(f"Unknown distribution: {p.distribution}")
+
+    def _bursting(self) -> np.ndarray:
+        p = self.profile
+        starting = (self.burst_left == 0) & (self.rng.random(p.assets) < p.burst_probability)
+        self.burst_left[starting] = p.burst_length
+        bursting = self.burst_left > 0
+        self.burst_left[bursting] -= 1
+        return bursting
+
+    def tick(self, timestamp: int) -> List[Tuple[int, str, object]]:
+        """One sample per asset: ``(asset, stream, record)`` tuples"""
+        p = self.profile
+        n = p.assets
+        streams = self.rng.choice(len(STREAMS), size=n, p=self.stream_weights)
+        scale = np.where(self._bursting(), p.burst_factor, 1.0)
+        noise = self._noise((n, 4))
+        samples = []
+        for asset in range(n):
+            stream = STREAMS[streams[asset]]
+            a = noise[asset]
+            if stream == "co2":
+                record = CO2Metrics(
+                    absolute_co2_emissions=45.2 * a[0] * scale[asset],
+                    co2_intensity=89.5 * a[1] * scale[asset],
+                    well_to_wake_emissions=42.1 * a[2],
+                    co2_abatement_potential=12.3 * a[3],
+                    timestamp_utc=timestamp,
+                )
+            elif stream == "resource":
+                record = ResourceMetrics(
+                    critical_material_intensity=0.65 * a[0] * scale[asset],
+                    resource_circularity_indicator=0.42 * a[1] / scale[asset],
+                    supply_chain_risk_index=min(100.0, 35.8 * a[2] * scale[asset] ** 2),
+                    resource_efficiency_index=78.2 * a[3],
+                    timestamp_utc=timestamp,
+                )
+            else:
+                step = self.phase_step[asset]
+                self.phase_step[asset] += 1
+                record = AGADPhaseData(
+                    phase_id=f"AGAD {step // 9 % 9 + 1}/{step % 9 + 1}",
+                    trl_level=int(step % 9 + 1),
+                    verification_method=_VERIFICATION_METHODS[step % len(_VERIFICATION_METHODS)],
+                    validation_report=f"report_{asset:04d}_{step:06d}.pdf",
+                    passed=bool(scale[asset] == 1.0),
+                    coverage_percentage=float(min(100.0, 80.0 * a[0])),
+                    timestamp_utc=timestamp,
+                )
+            samples.append((asset, stream, record))
+        return samples
+
+
+def _latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    if not latencies_s:
+        return {}
+    ms = np.asarray(latencies_s) * 1e3
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {"p50": float(p50), "p90": float(p90), "p99": float(p99),
+            "max": float(ms.max()), "mean": float(ms.mean())}
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+class MonitorBenchmark:
+    """Drive one monitor per synthetic asset through the public coroutines"""
+
+    def __init__(self, profile: LoadProfile, config_path: str = "config.json"):
+        self.profile = profile
+        self.config = SustainabilityAIMonitor._load_config(config_path)
+        # Benchmarks measure the processing path, not persistence side effects
+        self.config.pop("telemetry_store", None)
+        self.config.pop("snapshot", None)
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.monitors: List[SustainabilityAIMonitor] = []
+
+    async def setup(self) -> None:
+        self.monitors = [SustainabilityAIMonitor(config=self.config, executor=self.executor)
+                         for _ in range(self.profile.assets)]
+        await asyncio.gather(*(m.initialize_ai_models() for m in self.monitors))
+
+    def close(self) -> None:
+        for monitor in self.monitors:
+            monitor.offload.close()
+        self.executor.shutdown(wait=True)
+
+    async def _call(self, monitor, method: str, payload, latencies: List[float]) -> None:
+        start = time.perf_counter()
+        await getattr(monitor, method)(payload)
+        latencies.append(time.perf_counter() - start)
+
+    async def _drive(self, ticks: int, latencies: Dict[str, List[float]],
+                     counts: Dict[str, int]) -> None:
+        """Generate ``ticks`` ticks and process them, per sample or in batches"""
+        p = self.profile
+        load = SyntheticLoad(p)
+        interval = 1.0 / p.rate_hz if p.rate_hz > 0 else 0.0
+        pending: Dict[Tuple[int, str], list] = {}
+        base_ts = int(time.time())
+        next_tick = time.perf_counter()
+
+        for t in range(ticks):
+            calls = []
+            for asset, stream, record in load.tick(base_ts + t):
+                counts[stream] += 1
+                single, batch = _ENTRY_POINTS[stream]
+                if p.batch_size > 0 and batch:
+                    queued = pending.setdefault((asset, stream), [])
+                    queued.append(record)
+                    if len(queued) >= p.batch_size:
+                        calls.append(self._call(self.monitors[asset], batch, queued,
+                                                latencies[stream]))
+                        pending[(asset, stream)] = []
+                else:
+                    calls.append(self._call(self.monitors[asset], single, record,
+                                            latencies[stream]))
+            # All assets of a tick run concurrently, as they would in production
+            await asyncio.gather(*calls)
+
+            if interval:
+                next_tick += interval
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+        leftovers = [self._call(self.monitors[asset], _ENTRY_POINTS[stream][1], queued,
+                                latencies[stream])
+                     for (asset, stream), queued in pending.items() if queued]
+        await asyncio.gather(*leftovers)
+
+    async def run(self, warmup_ticks: int = 20) -> Dict:
+        await self.setup()
+        await self._drive(warmup_ticks, {s: [] for s in STREAMS}, {s: 0 for s in STREAMS})
+
+        latencies: Dict[str, List[float]] = {s: [] for s in STREAMS}
+        counts = {s: 0 for s in STREAMS}
+        start = time.perf_counter()
+        await self._drive(self.profile.ticks, latencies, counts)
+        elapsed = time.perf_counter() - start
+
+        total = sum(counts.values())
+        streams = {}
+        for stream in STREAMS:
+            if counts[stream]:
+                streams[stream] = {
+                    "samples": counts[stream],
+                    "calls": len(latencies[stream]),
+                    "throughput_per_s": counts[stream] / elapsed,
+                    "latency_ms": _latency_summary(latencies[stream]),
+                }
+        all_latencies = [x for stream in STREAMS for x in latencies[stream]]
+        return {
+            "samples": total,
+            "elapsed_s": elapsed,
+            "throughput_per_s": total / elapsed if elapsed else 0.0,
+            "latency_ms": _latency_summary(all_latencies),
+            "streams": streams,
+            # Where each stage ended up (inline or pooled) on the first asset
+            "offload": self.monitors[0].offload.stats(),
+            # Matured predictions, rolling error and updates of the same asset's model
+            "training": self.monitors[0].trainer.stats() if self.monitors[0].trainer else None,
+            "peak_rss_mib": _peak_rss_mib(),
+        }
+
+    async def measure_allocations(self, ticks: int = 100) -> Dict[str, float]:
+        """Separate traced pass: tracemalloc slows everything, so it is not timed"""
+        latencies = {s: [] for s in STREAMS}
+        counts = {s: 0 for s in STREAMS}
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            current_before, _ = tracemalloc.get_traced_memory()
+            await self._drive(ticks, latencies, counts)
+            current_after, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        samples = max(1, sum(counts.values()))
+        diff = after.compare_to(before, "filename")
+        allocated = sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+        blocks = sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+        return {
+            "traced_samples": samples,
+            "retained_bytes_per_sample": (current_after - current_before) / samples,
+            "retained_blocks_per_sample": blocks / samples,
+            "grown_bytes_per_sample": allocated / samples,
+            "traced_peak_kib": (peak - current_before) / 1024,
+        }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+async def run_benchmark(profile: LoadProfile, config_path: str = "config.json",
+                        trace_ticks: int = 100) -> Dict:
+    """Run the timed pass (and optionally the allocation pass); returns the result document"""
+    bench = MonitorBenchmark(profile, config_path)
+    try:
+        result = await bench.run()
+        if trace_ticks > 0:
+            result["allocations"] = await bench.measure_allocations(trace_ticks)
+    finally:
+        bench.close()
+    return {
+        "created_utc": int(time.time()),
+        "environment": environment(),
+        "profile": asdict(profile),
+        "result": result,
+    }
+
+
+def _parse_importtime(stderr: str) -> Dict[str, Tuple[float, float]]:
+    """``-X importtime`` lines -> {module: (self_ms, cumulative_ms)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return modules
+
+
+def measure_startup(runs: int = 5, config_path: str = "config.json",
+                    lazy_models: Optional[bool] = None, top: int = 10) -> Dict:
+    """Cold-start the monitor ``runs`` times in fresh interpreters.
+
+    Each run imports the monitor under ``-X importtime`` and runs its
+    health check; reported values are medians. ``to_first_result_ms`` is
+    import + construction + model initialization + the first CO2 result.
+    """
+    script = _STARTUP_SCRIPT.format(lazy=repr(lazy_models))
+    here = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.abspath(config_path)
+    walls, phases, imports, numpy_on_import = [], {}, {}, False
+    for _ in range(runs):
+        start = time.perf_counter()
+        child = subprocess.run([sys.executable, "-X", "importtime", "-c", script, config_path],
+                               cwd=here, capture_output=True, text=True, check=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        report = json.loads(child.stdout.strip().splitlines()[-1])
+        numpy_on_import |= report["numpy_on_import"]
+        for phase, ms in report["timings_ms"].items():
+            phases.setdefault(phase, []).append(ms)
+        for name, (self_ms, _) in _parse_importtime(child.stderr).items():
+            imports.setdefault(name, []).append(self_ms)
+
+    median = {phase: statistics.median(values) for phase, values in phases.items()}
+    slowest = sorted(((statistics.median(v), name) for name, v in imports.items()), reverse=True)
+    return {
+        "runs": runs,
+        "lazy_models": lazy_models,
+        "process_wall_ms": statistics.median(walls),
+        "import_ms": median["import"],
+        "to_first_result_ms": (median["import"] + median["construct"] + median["initialize"] +
+                               median["first_result"]),
+        "phases_ms": median,
+        "numpy_on_import": numpy_on_import,
+        "slowest_imports_ms": [{"module": name, "self_ms": ms} for ms, name in slowest[:top]],
+    }
+
+
+def _lookup(result: Dict, path: Tuple[str, ...]) -> Optional[float]:
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(baseline: Dict, candidate: Dict, tolerance: float = 0.10) -> Tuple[List[Dict], bool]:
+    """Compare two result documents; returns (rows, regressed).
+
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (relative), overall and for every stream present in both.
+    """
+    scopes = [("total", baseline["result"], candidate["result"])]
+    for stream in STREAMS:
+        base = baseline["result"].get("streams", {}).get(stream)
+        cand = candidate["result"].get("streams", {}).get(stream)
+        if base and cand:
+            scopes.append((stream, base, cand))
+
+    rows = []
+    regressed = False
+    for scope, base, cand in scopes:
+        for path, higher_is_better in _GATED_METRICS:
+            old, new = _lookup(base, path), _lookup(cand, path)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            failed = worse > tolerance
+            regressed |= failed
+            rows.append({"scope": scope, "metric": ".".join(path), "baseline": old,
+                         "candidate": new, "change": change, "regressed": failed})
+    if baseline["profile"] != candidate["profile"]:
+        logging.getLogger(__name__).warning("Load profiles differ; comparison may be meaningless")
+    return rows, regressed
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in STREAMS:
+            raise argparse.ArgumentTypeError(f"unknown stream {name!r} (expected one of {STREAMS})")
+        mix[name] = float(weight or 1.0)
+    return mix
+
+
+def _print_result(document: Dict) -> None:
+    result = document["result"]
+    latency = result["latency_ms"]
+    print(f"{result['samples']} samples in {result['elapsed_s']:.2f}s: "
+          f"{result['throughput_per_s']:.0f}/s, p50 {latency['p50']:.3f} ms, "
+          f"p99 {latency['p99']:.3f} ms, peak RSS {result['peak_rss_mib']:.1f} MiB")
+    for stream, stats in result["streams"].items():
+        print(f"  {stream:<9} {stats['throughput_per_s']:>10.0f}/s  "
+              f"p50 {stats['latency_ms']['p50']:.3f} ms  p99 {stats['latency_ms']['p99']:.3f} ms")
+    allocations = result.get("allocations")
+    if allocations:
+        print(f"  allocations: {allocations['grown_bytes_per_sample']:.0f} B/sample grown, "
+              f"{allocations['retained_blocks_per_sample']:.2f} blocks/sample retained")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GAIA-Q Sustainability Monitor benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="generate synthetic load and measure the monitor")
+    defaults = LoadProfile()
+    run.add_argument("--assets", type=int, default=defaults.assets)
+    run.add_argument("--ticks", type=int, default=defaults.ticks, help="samples per asset")
+    run.add_argument("--rate", type=float, default=defaults.rate_hz,
+                     help="ticks per second (0 = as fast as possible)")
+    run.add_argument("--mix", type=_parse_mix, default=defaults.mix,
+                     help="stream weights, e.g. co2=1,resource=1,agad=0.1")
+    run.add_argument("--distribution", choices=("normal", "uniform", "lognormal"),
+                     default=defaults.distribution)
+    run.add_argument("--noise", type=float, default=defaults.noise)
+    run.add_argument("--burst-probability", type=float, default=defaults.burst_probability)
+    run.add_argument("--burst-length", type=int, default=defaults.burst_length)
+    run.add_argument("--batch-size", type=int, default=defaults.batch_size,
+                     help="drive the batch coroutines with N samples per call")
+    run.add_argument("--seed", type=int, default=defaults.seed)
+    run.add_argument("--trace-ticks", type=int, default=100,
+                     help="ticks in the tracemalloc pass (0 disables it)")
+    run.add_argument("--config", default="config.json")
+    run.add_argument("--output", help="write the result JSON here")
+
+    startup = commands.add_parser("startup", help="cold-start time until the first result")
+    startup.add_argument("--runs", type=int, default=5, help="fresh interpreters to launch")
+    startup.add_argument("--lazy-models", action="store_true",
+                         help="defer model construction to the first sample")
+    startup.add_argument("--config", default="config.json")
+    startup.add_argument("--output", help="write the result JSON here")
+
+    cmp = commands.add_parser("compare", help="gate a run against a baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("candidate")
+    cmp.add_argument("--tolerance", type=float, default=0.10,
+                     help="allowed relative regression (default 0.10)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.command == "run":
+        profile = LoadProfile(assets=args.assets, ticks=args.ticks, rate_hz=args.rate,
+                              mix=args.mix, distribution=args.distribution, noise=args.noise,
+                              burst_probability=args.burst_probability,
+                              burst_length=args.burst_length, batch_size=args.batch_size,
+                              seed=args.seed)
+        document = asyncio.run(run_benchmark(profile, args.config, args.trace_ticks))
+        _print_result(document)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+        return 0
+
+    if args.command == "startup":
+        result = measure_startup(args.runs, args.config, True if args.lazy_models else None)
+        document = {
+            "created_utc": int(time.time()),
+            "environment": environment(),
+            "profile": {"startup_runs": args.runs, "lazy_models": args.lazy_models},
+            "result": {"startup": result},
+        }
+        print(f"startup: {result['to_first_result_ms']:.1f} ms to first result "
+              f"(import {result['import_ms']:.1f} ms, process {result['process_wall_ms']:.1f} ms, "
+              f"numpy on import: {'yes' if result['numpy_on_import'] else 'no'})")
+        for phase, ms in result["phases_ms"].items():
+            print(f"  {phase:<18} {ms:8.2f} ms")
+        print("  slowest imports (self):")
+        for row in result["slowest_imports_ms"]:
+            print(f"    {row['module']:<40} {row['self_ms']:7.2f} ms")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(document, f, indent=2)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    rows, regressed = compare(baseline, candidate, args.tolerance)
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "ok"
+        print(f"{row['scope']:<9} {row['metric']:<17} {row['baseline']:>12.3f} -> "
+              f"{row['candidate']:>12.3f}  {row['change']:+7.1%}  {flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Fleet Sustainability Monitor
+Shards monitored assets across worker processes, one SustainabilityAIMonitor per asset
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import threading
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+from offload_policy import OffloadPolicy
+from prediction_engine import MicroBatcher
+from sustainability_ai_monitor import (
+    AGADPhaseData,
+    CO2Metrics,
+    ResourceMetrics,
+    SustainabilityAIMonitor,
+)
+
+# Operations understood by a shard worker, mapped to the per-asset monitor coroutine
+_OPERATIONS = {
+    "co2": "process_co2_metrics",
+    "resource": "process_resource_metrics",
+    "agad": "process_agad_phase",
+    "co2_batch": "process_co2_metrics_batch",
+    "resource_batch": "process_resource_metrics_batch",
+    "agad_batch": "process_agad_phases_batch",
+}
+
+# Per-asset overrides of the monitor config. A shard holds one monitor per
+# asset, so the capacities sized for a single monitor (10 000 AGAD records,
+# thousands of replayed training windows) are cut down; config
+# "fleet": {"asset": {...}} overrides these, one level deep
+DEFAULT_ASSET_CONFIG = {
+    "agad_capacity": 256,
+    "training": {"replay_capacity": 256, "pending_capacity": 1024, "queue_capacity": 4096},
+}
+
+
+def shard_for(asset_id: str, num_shards: int) -> int:
+    """Stable shard index for an asset ID (identical across processes and runs)"""
+    return zlib.crc32(asset_id.encode("utf-8")) % num_shards
+
+
+def asset_config(config: Mapping[str, Any], asset_id: str) -> Dict[str, Any]:
+    """Monitor config for one asset of the fleet.
+
+    Applies the per-asset overrides (see DEFAULT_ASSET_CONFIG) and gives the
+    asset its own telemetry store directory under ``telemetry_store.path``:
+    monitors sharing one store would interleave their rows in the same
+    tables and warm-start from each other's history.
+    """
+    overrides = {**DEFAULT_ASSET_CONFIG, **((config.get("fleet") or {}).get("asset") or {})}
+    result = dict(config)
+    for key, value in overrides.items():
+        if isinstance(value, Mapping):
+            result[key] = {**(config.get(key) or {}), **value}
+        else:
+            result[key] = value
+    store = config.get("telemetry_store")
+    if store and store.get("path"):
+        result["telemetry_store"] = {**store, "path": os.path.join(
+            store["path"], "asset-" + quote(asset_id, safe=""))}
+    return result
+
+
+class _ShardState:
+    """Per-process state owned by one shard worker"""
+
+    def __init__(self, shard_id: int, config_path: str):
+        self.shard_id = shard_id
+        self.config = SustainabilityAIMonitor._load_config(config_path)
+        # One small executor shared by every asset on the shard
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # ... and one prediction batcher: the assets of a request run
+        # concurrently (see handle), so their predictions at a tick become one
+        # call over every asset's model, placed by a shard-wide offload policy
+        self.offload = OffloadPolicy(self.config.get("offload"), thread_executor=lambda: self.executor)
+        self.prediction_batcher = MicroBatcher(runner=self._run_batched)
+        self.assets: Dict[str, SustainabilityAIMonitor] = {}
+
+    async def _run_batched(self, fn, arg):
+        return await self.offload.run("predict_batch", fn, arg, portable=True)
+
+    async def monitor_for(self, asset_id: str) -> SustainabilityAIMonitor:
+        monitor = self.assets.get(asset_id)
+        if monitor is None:
+            monitor = SustainabilityAIMonitor(config=asset_config(self.config, asset_id),
+                                              executor=self.executor,
+                                              prediction_batcher=self.prediction_batcher)
+            await monitor.initialize_ai_models()
+            self.assets[asset_id] = monitor
+        return monitor
+
+    async def handle(self, op: str, items: List[Tuple[str, Any]]) -> List[Any]:
+        """Run ``op`` for each (asset_id, payload) pair, results in input order.
+
+        Each asset's items run in order; different assets run concurrently.
+        """
+        method = _OPERATIONS[op]
+        positions: Dict[str, List[int]] = defaultdict(list)
+        for index, (asset_id, _) in enumerate(items):
+            positions[asset_id].append(index)
+        results: List[Any] = [None] * len(items)
+
+        async def run_asset(asset_id: str, indices: List[int]) -> None:
+            monitor = await self.monitor_for(asset_id)
+            for index in indices:
+                results[index] = await getattr(monitor, method)(items[index][1])
+
+        await asyncio.gather(*(run_asset(asset_id, indices) for asset_id, indices in positions.items()))
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shard_id": self.shard_id,
+            "pid": os.getpid(),
+            "assets": len(self.assets),
+            "buffered_co2_samples": sum(len(m.co2_buffer) for m in self.assets.values()),
+        }
+
+
+def _shard_worker(shard_id: int, conn, config_path: str) -> None:
+    """Worker process entry point: serve requests from the coordinator until closed"""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    state = _ShardState(shard_id, config_path)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            request_id, op, items = message
+            try:
+                if op == "stats":
+                    result = state.stats()
+                else:
+                    result = loop.run_until_complete(state.handle(op, items))
+                conn.send((request_id, True, result))
+            except Exception as e:
+                try:
+                    conn.send((request_id, False, e))
+                except Exception:
+                    conn.send((request_id, False, RuntimeError(repr(e))))
+    finally:
+        state.offload.close()
+        state.executor.shutdown(wait=False)
+        loop.close()
+        conn.close()
+
+
+class _Shard:
+    """Coordinator-side handle to one worker process"""
+
+    def __init__(self, shard_id: int, process, conn):
+        self.shard_id = shard_id
+        self.process = process
+        self.conn = conn
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.reader: Optional[threading.Thread] = None
+
+
+class FleetMonitor:
+    """Fleet-level coordinator routing per-asset samples to sharded worker processes.
+
+    Assets are assigned to shards by a stable hash of their ID, so every
+    sample of an asset lands on the same worker, which owns that asset's ring
+    buffers and prediction model. Each worker runs its own interpreter, so
+    the GIL-bound parts of processing scale across cores.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None,
+                 config_path: str = "config.json",
+                 start_method: str = "spawn"):
+        self.logger = logging.getLogger(__name__)
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.config_path = config_path
+        self._context = mp.get_context(start_method)
+        self._shards: List[_Shard] = []
+        self._request_ids = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Spawn the worker processes"""
+        self._loop = asyncio.get_running_loop()
+        for shard_id in range(self.num_workers):
+            parent_conn, child_conn = self._context.Pipe()
+            process = self._context.Process(
+                target=_shard_worker,
+                args=(shard_id, child_conn, self.config_path),
+                name=f"gaia-fleet-shard-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            shard = _Shard(shard_id, process, parent_conn)
+            shard.reader = threading.Thread(
+                target=self._read_responses, args=(shard,),
+                name=f"gaia-fleet-reader-{shard_id}", daemon=True)
+            shard.reader.start()
+            self._shards.append(shard)
+        self.logger.info(f"Fleet monitor started with {self.num_workers} workers")
+
+    async def stop(self) -> None:
+        """Ask every worker to exit and wait for them"""
+        for shard in self._shards:
+            try:
+                shard.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        loop = asyncio.get_running_loop()
+        for shard in self._shards:
+            await loop.run_in_executor(None, shard.process.join, 5.0)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            shard.conn.close()
+        self._shards = []
+
+    async def __aenter__(self) -> "FleetMonitor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def _read_responses(self, shard: _Shard) -> None:
+        """Reader thread: resolve pending futures as responses arrive"""
+        while True:
+            try:
+                request_id, ok, payload = shard.conn.recv()
+            except (EOFError, OSError):
+                break
+            future = shard.pending.pop(request_id, None)
+            if future is not None:
+                self._loop.call_soon_threadsafe(self._resolve, future, ok, payload)
+        # Worker went away: fail anything still waiting on it
+        for request_id in list(shard.pending):
+            future = shard.pending.pop(request_id)
+            self._loop.call_soon_threadsafe(
+                self._resolve, future, False,
+                RuntimeError(f"Fleet shard {shard.shard_id} exited"))
+
+    @staticmethod
+    def _resolve(future: asyncio.Future, ok: bool, payload: Any) -> None:
+        if future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+
+    def _request(self, shard: _Shard, op: str, items: Any) -> asyncio.Future:
+        if self._loop is None:
+            raise RuntimeError("FleetMonitor.start() must be awaited first")
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        shard.pending[request_id] = future
+        shard.conn.send((request_id, op, items))
+        return future
+
+    def shard_of(self, asset_id: str) -> int:
+        return shard_for(asset_id, self.num_workers)
+
+    async def _submit_one(self, op: str, asset_id: str, payload: Any) -> Dict[str, Any]:
+        shard = self._shards[self.shard_of(asset_id)]
+        results = await self._request(shard, op, [(asset_id, payload)])
+        return results[0]
+
+    async def process_co2_metrics(self, asset_id: str, metrics: CO2Metrics) -> Dict[str, Any]:
+        """Route one CO2 sample to its asset's shard"""
+        return await self._submit_one("co2", asset_id, metrics)
+
+    async def process_resource_metrics(self, asset_id: str,
+                                       metrics: ResourceMetrics) -> Dict[str, Any]:
+        """Route one resource sample to its asset's shard"""
+        return await self._submit_one("resource", asset_id, metrics)
+
+    async def process_agad_phase(self, asset_id: str, phase_data: AGADPhaseData) -> Dict[str, Any]:
+        """Route one AGAD phase record to its asset's shard"""
+        return await self._submit_one("agad", asset_id, phase_data)
+
+    async def process_many(self, op: str,
+                           items: Sequence[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Fan a mixed-asset batch out to all shards, one message per shard.
+
+        ``op`` is one of ``co2``, ``resource``, ``agad``, ``co2_batch``,
+        ``resource_batch`` or ``agad_batch``; ``items`` are (asset_id, payload) pairs. Results
+        are returned in input order.
+        """
+        if op not in _OPERATIONS:
+            raise ValueError(f"Unknown fleet operation: {op}")
+        positions: Dict[int, List[int]] = defaultdict(list)
+        grouped: Dict[int, List[Tuple[str, Any]]] = defaultdict(list)
+        for index, (asset_id, payload) in enumerate(items):
+            shard_id = self.shard_of(asset_id)
+            positions[shard_id].append(index)
+            grouped[shard_id].append((asset_id, payload))
+
+        shard_ids = list(grouped)
+        responses = await asyncio.gather(*(
+            self._request(self._shards[shard_id], op, grouped[shard_id])
+            for shard_id in shard_ids
+        ))
+
+        results: List[Any] = [None] * len(items)
+        for shard_id, shard_results in zip(shard_ids, responses):
+            for index, result in zip(positions[shard_id], shard_results):
+                results[index] = result
+        return results
+
+    async def stats(self) -> List[Dict[str, Any]]:
+        """Per-shard asset counts and buffer fill"""
+        return list(await asyncio.gather(*(
+            self._request(shard, "stats", None) for shard in self._shards
+        )))
+
+
+async def main():
+    """Drive a small synthetic fleet through the sharded monitor"""
+    import time
+
+    async with FleetMonitor(num_workers=2) as fleet:
+        assets = [f"AMPEL360-{n:03d}" for n in range(8)]
+        now = int(time.time())
+        items = [
+            (asset, CO2Metrics(40.0 + i, 89.5, 42.1, 12.3, now + i))
+            for i in range(12) for asset in assets
+        ]
+        results = await fleet.process_many("co2", items)
+        print(f"Processed {len(results)} samples across {len(assets)} assets")
+        for shard in await fleet.stats():
+            print(f"Shard {shard['shard_id']}: {shard['assets']} assets, "
+                  f"{shard['buffered_co2_samples']} buffered CO2 samples")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Front-Matter Index
+Head-only YAML front-matter extraction and an incremental document index keyed by id
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from metadata_check_insert import find_markdown
+
+try:
+    import yaml
+except ImportError:  # optional: only needed for front matter beyond the flat subset
+    yaml = None
+
+DEFAULT_INDEX = ".frontmatter_index.json"
+INDEX_VERSION = 1
+MAX_FRONT_MATTER_BYTES = 64 * 1024   # stop looking for a closing delimiter after this
+LIST_FIELDS = ("tags", "related", "authors", "reviewers", "approvers", "extensions")
+
+
+class FrontMatterError(ValueError):
+    """Front matter that neither the fast parser nor YAML could read"""
+
+
+def _split_flow_list(body: str) -> List[str]:
+    """Split ``a, "b, c", d`` on top-level commas, honouring quotes and brackets"""
+    items, current, quote, depth = [], [], None, 0
+    for ch in body:
+        if quote:
+            if ch == quote:
+                quote = None
+            else:
+                current.append(ch)
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "[(":
+            depth += 1
+            current.append(ch)
+        elif ch in "])":
+            depth -= 1
+            current.append(ch)
+        elif ch == "," and depth == 0:
+            items.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    last = "".join(current).strip()
+    if last or items:
+        items.append(last)
+    return [item for item in items if item]
+
+
+def _scalar(value: str) -> Any:
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return _split_flow_list(value[1:-1])
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def parse_front_matter(lines: List[str]) -> Dict[str, Any]:
+    """Parse the lines between the ``---`` delimiters.
+
+    The fast path covers what the vault uses: flat ``key: value`` pairs,
+    flow lists and block ``- item`` lists, with every scalar kept as a
+    string (so ``version: 1.0`` stays "1.0"). Anything else is handed to
+    PyYAML's BaseLoader, which also yields strings, when it is installed.
+    """
+    meta: Dict[str, Any] = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if line[0] in " \t-" and key is not None and stripped.startswith("- "):
+            if not isinstance(meta.get(key), list):
+                meta[key] = []
+            meta[key].append(_scalar(stripped[2:]))
+            continue
+        name, sep, value = line.partition(":")
+        if not sep or line[0] in " \t" or not name.strip():
+            if yaml is None:
+                raise FrontMatterError(f"unsupported front matter line: {line.rstrip()!r}")
+            try:
+                loaded = yaml.load("".join(lines), Loader=yaml.BaseLoader)
+            except yaml.YAMLError as e:
+                raise FrontMatterError(str(e)) from e
+            return loaded if isinstance(loaded, dict) else {}
+        key = name.strip()
+        meta[key] = _scalar(value) if value.strip() else []
+    # Empty "key:" lines that never got block items are empty strings, as in YAML
+    return {k: ("" if v == [] and k not in LIST_FIELDS else v) for k, v in meta.items()}
+
+
+def read_front_matter(path: str) -> Optional[Dict[str, Any]]:
+    """Return the parsed front matter, or None if the file has none.
+
+    Only the lines up to the closing delimiter are read, never the body.
+    """
+    lines: List[str] = []
+    read = 0
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for line in f:
+            if line.strip():
+                break
+        else:
+            return None
+        if line.strip() != "---":
+            return None
+        for line in f:
+            if line.rstrip() in ("---", "..."):
+                return parse_front_matter(lines)
+            read += len(line)
+            if read > MAX_FRONT_MATTER_BYTES:
+                break
+            lines.append(line)
+    raise FrontMatterError(f"{path}: front matter is not closed")
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None or value == "":
+        return []
+    return [str(v) for v in value] if isinstance(value, list) else [str(value)]
+
+
+class FrontMatterIndex:
+    """Incremental front-matter index keyed by document id.
+
+    Per-file entries are reused while the file's (mtime_ns, size) is
+    unchanged, so a rebuild only opens new or edited documents. The id is
+    the ``id`` field, else the file name without ``.md``. Tag, status and
+    relationship maps are derived in memory after every load or update.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.files = data["files"]
+        except (OSError, ValueError):
+            pass
+        self._derive()
+
+    def update(self, roots: Iterable[str]) -> Dict[str, Any]:
+        """Rescan ``roots``; returns counts plus per-file parse errors"""
+        stats = {"reused": 0, "parsed": 0, "removed": 0, "errors": []}
+        roots = [os.path.abspath(r) for r in roots]
+        seen = set()
+        for root in roots:
+            for path in find_markdown(root):
+                path = os.path.abspath(path)
+                seen.add(path)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entry = self.files.get(path)
+                if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+                    stats["reused"] += 1
+                    continue
+                try:
+                    meta = read_front_matter(path)
+                except (OSError, FrontMatterError) as e:
+                    stats["errors"].append({"path": path, "error": str(e)})
+                    meta = None
+                stats["parsed"] += 1
+                self.files[path] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "meta": meta}
+        prefixes = tuple(os.path.join(r, "") for r in roots)
+        for path in [p for p in self.files if p.startswith(prefixes) and p not in seen]:
+            del self.files[path]
+            stats["removed"] += 1
+        self._derive()
+        return stats
+
+    def save(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "files": self.files}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _derive(self) -> None:
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.paths: Dict[str, List[str]] = defaultdict(list)
+        self.tags: Dict[str, List[str]] = defaultdict(list)
+        self.statuses: Dict[str, List[str]] = defaultdict(list)
+        self.edges: Dict[str, List[str]] = {}
+        self.backrefs: Dict[str, List[str]] = defaultdict(list)
+        for path in sorted(self.files):
+            meta = self.files[path]["meta"]
+            if meta is None:
+                continue
+            doc_id = str(meta.get("id") or os.path.splitext(os.path.basename(path))[0])
+            self.paths[doc_id].append(path)
+            if doc_id in self.docs:
+                continue   # duplicate id: first path wins, see duplicate_ids()
+            self.docs[doc_id] = meta
+            for tag in _as_list(meta.get("tags")):
+                self.tags[tag].append(doc_id)
+            status = meta.get("status")
+            if status:
+                self.statuses[str(status).upper()].append(doc_id)
+            related = _as_list(meta.get("related"))
+            self.edges[doc_id] = related
+            for target in related:
+                self.backrefs[target].append(doc_id)
+
+    # --- Queries -------------------------------------------------------------
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return self.docs.get(doc_id)
+
+    def by_tag(self, tag: str) -> List[str]:
+        return list(self.tags.get(tag, ()))
+
+    def by_status(self, status: str) -> List[str]:
+        return list(self.statuses.get(status.upper(), ()))
+
+    def query(self, **fields: str) -> List[str]:
+        """Ids whose fields equal (or, for lists, contain) every given value"""
+        result = []
+        for doc_id, meta in self.docs.items():
+            for name, wanted in fields.items():
+                value = meta.get(name)
+                if not (wanted in value if isinstance(value, list) else str(value) == wanted):
+                    break
+            else:
+                result.append(doc_id)
+        return result
+
+    def related(self, doc_id: str, depth: int = 1) -> List[Tuple[str, int]]:
+        """Documents reachable through ``related`` within ``depth`` hops"""
+        found: Dict[str, int] = {}
+        queue = deque([(doc_id, 0)])
+        while queue:
+            current, hops = queue.popleft()
+            if hops == depth:
+                continue
+            for target in self.edges.get(current, ()):
+                if target != doc_id and target not in found:
+                    found[target] = hops + 1
+                    queue.append((target, hops + 1))
+        return list(found.items())
+
+    def backlinks(self, doc_id: str) -> List[str]:
+        return list(self.backrefs.get(doc_id, ()))
+
+    def dangling(self) -> List[Tuple[str, str]]:
+        """(source id, missing id) for every ``related`` entry with no document"""
+        return [(source, target) for source, targets in self.edges.items()
+                for target in targets if target not in self.docs]
+
+    def duplicate_ids(self) -> Dict[str, List[str]]:
+        return {doc_id: paths for doc_id, paths in self.paths.items() if len(paths) > 1}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--index", default=DEFAULT_INDEX, help=f"index file (default: {DEFAULT_INDEX})")
+    common.add_argument("--json", action="store_true", help="machine-readable output")
+    parser = argparse.ArgumentParser(description="GAIA-Q front-matter index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", parents=[common], help="create or update the index")
+    build.add_argument("dirs", nargs="+", metavar="DIR")
+    show = commands.add_parser("show", parents=[common], help="front matter of a document")
+    show.add_argument("doc_id")
+    tag = commands.add_parser("tag", parents=[common], help="documents carrying a tag")
+    tag.add_argument("tag")
+    status = commands.add_parser("status", parents=[common], help="documents in a status")
+    status.add_argument("status")
+    related = commands.add_parser("related", parents=[common], help="related-document graph")
+    related.add_argument("doc_id")
+    related.add_argument("--depth", type=int, default=1)
+    backlinks = commands.add_parser("backlinks", parents=[common], help="documents citing an id")
+    backlinks.add_argument("doc_id")
+    commands.add_parser("dangling", parents=[common], help="related ids with no document")
+    commands.add_parser("duplicates", parents=[common], help="ids defined by several files")
+    args = parser.parse_args(argv)
+
+    index = FrontMatterIndex(args.index)
+    if args.command == "build":
+        stats = index.update(args.dirs)
+        index.save()
+        for error in stats["errors"]:
+            print(f"{error['path']}: {error['error']}", file=sys.stderr)
+        print(json.dumps(stats) if args.json else
+              f"{len(index.docs)} documents: {stats['parsed']} parsed, {stats['reused']} unchanged, "
+              f"{stats['removed']} removed, {len(stats['errors'])} errors")
+        return 1 if stats["errors"] else 0
+
+    if args.command == "show":
+        result: Any = index.get(args.doc_id)
+        if result is None:
+            print(f"{args.doc_id}: not indexed", file=sys.stderr)
+            return 1
+    elif args.command == "tag":
+        result = index.by_tag(args.tag)
+    elif args.command == "status":
+        result = index.by_status(args.status)
+    elif args.command == "related":
+        result = index.related(args.doc_id, args.depth)
+    elif args.command == "backlinks":
+        result = index.backlinks(args.doc_id)
+    elif args.command == "dangling":
+        result = index.dangling()
+    else:
+        result = index.duplicate_ids()
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    else:
+        for item in result:
+            print(" ".join(str(part) for part in item) if isinstance(item, tuple) else item)
+    # Audits fail when they find something
+    if args.command in ("dangling", "duplicates"):
+        return 1 if result else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
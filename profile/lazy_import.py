@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Lazy Imports
+Module stand-ins that defer an import until the first attribute access
+"""
+
+import importlib
+import sys
+from typing import Any, Dict, Optional
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access.
+
+    When created with the importing module's ``globals()``, the proxy
+    rebinds its name there to the real module once loaded, so later
+    lookups go straight to the module with no proxy in between.
+    """
+
+    __slots__ = ("_name", "_alias", "_namespace")
+
+    def __init__(self, name: str, namespace: Optional[Dict[str, Any]] = None,
+                 alias: Optional[str] = None):
+        self._name = name
+        self._alias = alias or name.rpartition(".")[2]
+        self._namespace = namespace
+
+    def _load(self):
+        module = importlib.import_module(self._name)
+        if self._namespace is not None and self._namespace.get(self._alias) is self:
+            self._namespace[self._alias] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._name in sys.modules else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name: str, namespace: Optional[Dict[str, Any]] = None,
+                alias: Optional[str] = None) -> Any:
+    """The module itself if already imported, else a :class:`LazyModule`"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name, namespace, alias)
@@ -1,11 +1,20 @@
 """
 Check or insert YAML metadata in markdown files.
 Usage:
-    python metadata_check_insert.py file1.md [file2.md ...]
+    python metadata_check_insert.py [--no-fsync] file1.md [file2.md ...]
+    python metadata_check_insert.py --recursive DIR [--check-only] [--json] [--workers N]
 """
 
+import argparse
+import codecs
+import fnmatch
+import json
+import os
+import shutil
 import sys
-import pathlib
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 
 YAML_TEMPLATE = """---
@@ -20,23 +29,165 @@ extensions: []
 ---
 """
 
+HEAD_BYTES = 4096        # detection reads this much (more only for whitespace-only heads)
+COPY_BUFFER = 1 << 20    # bounded buffer for streaming the body into the new file
+_BOM = b"\xef\xbb\xbf"
+
 def has_yaml_metadata(text):
     return text.lstrip().startswith("---")
 
-def insert_metadata(fname):
-    with open(fname, "r", encoding="utf-8") as f:
-        content = f.read()
-    if has_yaml_metadata(content):
-        print(f"{fname}: Metadata already present.")
-        return
+def file_has_yaml_metadata(fname):
+    """has_yaml_metadata on the file's text, reading only its head.
+
+    A UTF-8 byte order mark before the front matter is skipped; leading
+    whitespace is stripped chunk by chunk, never buffered.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    head = ""
+    with open(fname, "rb") as f:
+        while True:
+            chunk = f.read(HEAD_BYTES)
+            head = (head + decoder.decode(chunk, final=not chunk)).lstrip()
+            if len(head) >= 3 or not chunk:
+                return has_yaml_metadata(head)
+
+def insert_metadata(fname, fsync=True, verbose=True):
+    """Prepend the template unless front matter exists; returns "present" or "inserted".
+
+    The body is streamed into a temporary file in the same directory, which
+    then atomically replaces the original, so memory use does not depend on
+    the file size and a crash never leaves a half-written document. A UTF-8
+    byte order mark stays at the start of the file, before the template.
+    """
+    if file_has_yaml_metadata(fname):
+        if verbose:
+            print(f"{fname}: Metadata already present.")
+        return "present"
     metadata = YAML_TEMPLATE.format(today=date.today())
-    with open(fname, "w", encoding="utf-8") as f:
-        f.write(metadata + "\n" + content)
-    print(f"{fname}: Metadata inserted.")
+    directory = os.path.dirname(os.path.abspath(fname))
+    fd, tmp = tempfile.mkstemp(prefix=".meta-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out, open(fname, "rb") as src:
+            bom = src.read(len(_BOM))
+            if bom != _BOM:
+                bom = b""
+                src.seek(0)
+            out.write(bom + (metadata + "\n").encode("utf-8"))
+            shutil.copyfileobj(src, out, COPY_BUFFER)
+            os.chmod(tmp, os.stat(src.fileno()).st_mode & 0o7777)
+            if fsync:
+                out.flush()
+                os.fsync(out.fileno())
+        os.replace(tmp, fname)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    if verbose:
+        print(f"{fname}: Metadata inserted.")
+    return "inserted"
+
+def find_markdown(root, pattern="*.md"):
+    """Yield files under root matching pattern, skipping hidden directories"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError as e:
+            print(f"{directory}: {e.strerror}", file=sys.stderr)
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not entry.name.startswith("."):
+                    stack.append(entry.path)
+            elif fnmatch.fnmatch(entry.name, pattern):
+                yield entry.path
+
+def process_file(fname, check_only=False, fsync=True):
+    """Check (and unless check_only, fix) one file; returns (fname, status, error)"""
+    try:
+        if check_only:
+            return fname, "present" if file_has_yaml_metadata(fname) else "missing", None
+        return fname, insert_metadata(fname, fsync=fsync, verbose=False), None
+    except (OSError, UnicodeError) as e:
+        return fname, "error", str(e)
+
+def run_bulk(files, check_only=False, fsync=True, workers=None, on_result=None):
+    """Fan the per-file work out to a thread pool (the job is I/O bound).
+
+    Returns a summary dict; on_result(fname, status, error) is called as
+    results arrive, in input order.
+    """
+    started = time.perf_counter()
+    summary = {"mode": "check" if check_only else "insert", "files": 0,
+               "present": 0, "missing": [], "inserted": [], "errors": []}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda f: process_file(f, check_only, fsync), files)
+        for fname, status, error in results:
+            summary["files"] += 1
+            if status == "present":
+                summary["present"] += 1
+            elif status == "error":
+                summary["errors"].append({"path": fname, "error": error})
+            else:
+                summary[status].append(fname)
+            if on_result:
+                on_result(fname, status, error)
+    summary["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return summary
+
+_MESSAGES = {
+    "present": "Metadata already present.",
+    "inserted": "Metadata inserted.",
+    "missing": "Metadata missing.",
+}
+
+def _print_result(fname, status, error):
+    if status == "error":
+        print(f"{fname}: Error: {error}", file=sys.stderr)
+    else:
+        print(f"{fname}: {_MESSAGES[status]}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or insert YAML metadata in markdown files")
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("-r", "--recursive", action="append", default=[], metavar="DIR",
+                        help="process every *.md file under DIR")
+    parser.add_argument("--pattern", default="*.md", help="file name glob for --recursive")
+    parser.add_argument("--check-only", action="store_true",
+                        help="dry run: report missing metadata, exit 1 if any")
+    parser.add_argument("--json", action="store_true", help="print a JSON summary only")
+    parser.add_argument("--workers", type=int, default=None, help="thread pool size")
+    parser.add_argument("--no-fsync", dest="fsync", action="store_false")
+    args = parser.parse_args(argv)
+
+    files = list(args.files)
+    for root in args.recursive:
+        files.extend(find_markdown(root, args.pattern))
+    if not files and not args.recursive:
+        print("Usage: python metadata_check_insert.py file1.md [file2.md ...] | --recursive DIR")
+        return 1
+
+    summary = run_bulk(files, args.check_only, args.fsync, args.workers,
+                       None if args.json else _print_result)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        changed = len(summary["missing"] if args.check_only else summary["inserted"])
+        print(f"{summary['files']} files: {summary['present']} with metadata, "
+              f"{changed} {'missing' if args.check_only else 'inserted'}, "
+              f"{len(summary['errors'])} errors ({summary['elapsed_s']}s)")
+    return 1 if summary["errors"] or (args.check_only and summary["missing"]) else 0
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python metadata_check_insert.py file1.md [file2.md ...]")
-        sys.exit(1)
-    for fname in sys.argv[1:]:
-        insert_metadata(fname)
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Metric Ring Buffer
+Fixed-capacity columnar storage for GA-SToP-CO2 metric streams
+"""
+
+import dataclasses
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+# Column dtypes by dataclass annotation
+_FIELD_DTYPES = {
+    float: np.float64,
+    int: np.int64,
+    bool: np.bool_,
+    "float": np.float64,
+    "int": np.int64,
+    "bool": np.bool_,
+}
+
+
+class ColumnarRingBuffer:
+    """Fixed-capacity ring buffer with one preallocated column per field.
+
+    Every column is allocated at twice the capacity and each sample is written
+    to both halves (``i`` and ``i + capacity``), so the most recent ``n``
+    samples are always a contiguous slice. Appends are O(1) and windows are
+    zero-copy views into the column storage.
+    """
+
+    def __init__(self, fields: Dict[str, np.dtype], capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in fields.items()}
+        self._columns = {
+            name: np.zeros(2 * self.capacity, dtype=dtype)
+            for name, dtype in self.dtypes.items()
+        }
+        self._head = 0   # next write position in [0, capacity)
+        self._size = 0
+        self.total_appended = 0
+        self.record_type: Optional[Type] = None
+
+    @classmethod
+    def for_dataclass(cls, record_type: Type, capacity: int = 1000) -> "ColumnarRingBuffer":
+        """Build a buffer with one column per numeric dataclass field"""
+        fields = {}
+        for field in dataclasses.fields(record_type):
+            dtype = _FIELD_DTYPES.get(field.type)
+            if dtype is None:
+                raise TypeError(
+                    f"{record_type.__name__}.{field.name}: unsupported column type {field.type!r}")
+            fields[field.name] = dtype
+        buffer = cls(fields, capacity)
+        buffer.record_type = record_type
+        return buffer
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def append(self, record) -> None:
+        """Append a single record (dataclass instance or mapping)"""
+        head = self._head
+        mirror = head + self.capacity
+        get = record.get if isinstance(record, dict) else record.__getattribute__
+        for name, column in self._columns.items():
+            value = get(name)
+            column[head] = value
+            column[mirror] = value
+        self._advance(1)
+
+    def extend(self, columns: Dict[str, np.ndarray]) -> None:
+        """Append N samples given as equally sized column arrays"""
+        count = len(columns[self.fields[0]])
+        if count == 0:
+            return
+        if count > self.capacity:
+            # Only the newest `capacity` samples can survive
+            columns = {name: np.asarray(values)[-self.capacity:] for name, values in columns.items()}
+            self.total_appended += count - self.capacity
+            count = self.capacity
+        cap = self.capacity
+        head = self._head
+        first = min(count, cap - head)
+        for name, column in self._columns.items():
+            values = np.asarray(columns[name])
+            column[head:head + first] = values[:first]
+            column[head + cap:head + cap + first] = values[:first]
+            if first < count:
+                rest = count - first
+                column[:rest] = values[first:]
+                column[cap:cap + rest] = values[first:]
+        self._advance(count)
+
+    def _advance(self, count: int) -> None:
+        self._head = (self._head + count) % self.capacity
+        self._size = min(self.capacity, self._size + count)
+        self.total_appended += count
+
+    def _window_bounds(self, n: Optional[int]) -> Tuple[int, int]:
+        n = self._size if n is None else min(int(n), self._size)
+        end = self._head + self.capacity
+        return end - n, end
+
+    def column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        """Zero-copy view of the newest ``n`` values of one column (oldest first)"""
+        start, end = self._window_bounds(n)
+        view = self._columns[name][start:end]
+        view.flags.writeable = False
+        return view
+
+    def window(self, n: Optional[int] = None,
+               fields: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the newest ``n`` samples, keyed by field"""
+        start, end = self._window_bounds(n)
+        result = {}
+        for name in (self.fields if fields is None else fields):
+            view = self._columns[name][start:end]
+            view.flags.writeable = False
+            result[name] = view
+        return result
+
+    def matrix(self, n: Optional[int] = None,
+               fields: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Newest ``n`` samples stacked as an ``(n, len(fields))`` float64 array"""
+        names = self.fields if fields is None else fields
+        start, end = self._window_bounds(n)
+        out = np.empty((end - start, len(names)), dtype=np.float64)
+        for i, name in enumerate(names):
+            out[:, i] = self._columns[name][start:end]
+        return out
+
+    def latest(self):
+        """Most recent sample as a record (or dict if no record type is bound)"""
+        if not self._size:
+            return None
+        index = self._head + self.capacity - 1
+        values = {name: column[index].item() for name, column in self._columns.items()}
+        return self.record_type(**values) if self.record_type else values
+
+    def records(self, n: Optional[int] = None) -> List:
+        """Materialize the newest ``n`` samples as records (for debugging/export)"""
+        window = self.window(n)
+        count = len(window[self.fields[0]]) if self.fields else 0
+        rows = [{name: window[name][i].item() for name in self.fields} for i in range(count)]
+        if self.record_type:
+            return [self.record_type(**row) for row in rows]
+        return rows
+
+    def clear(self) -> None:
+        self._head = 0
+        self._size = 0
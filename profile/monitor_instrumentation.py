@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Monitor Instrumentation
+Low-overhead latency histograms, counters and gauges with pluggable exporters
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency bucket upper bounds in seconds (10 us .. ~10 s, roughly x2.5 apart)
+LATENCY_BUCKETS = (
+    1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+    1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Gauge set explicitly or read from a callback at export time"""
+    __slots__ = ("value", "callback")
+
+    def __init__(self, callback: Optional[Callable[[], float]] = None):
+        self.value = 0.0
+        self.callback = callback
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def read(self) -> float:
+        return float(self.callback()) if self.callback else self.value
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is one bisect and two adds"""
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile ``q``"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class _NullTimer:
+    """Shared no-op timer for unsampled calls"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Named counters, gauges and stage latency histograms.
+
+    ``sample_rate`` below 1.0 times only every N-th call of each stage
+    (deterministic, no RNG on the hot path); counters are always exact.
+    """
+
+    def __init__(self, namespace: str = "gaia_monitor", sample_rate: float = 1.0,
+                 enabled: bool = True):
+        self.namespace = namespace
+        self.enabled = enabled
+        self.sample_every = max(1, round(1.0 / sample_rate)) if sample_rate > 0 else 0
+        self.counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, Gauge]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+        self._stage_calls: Dict[str, int] = {}
+        # Executor calls wrapped by timed_executor_call; completions are
+        # counted on worker threads, hence the lock
+        self._executor_submitted = 0
+        self._executor_completed = 0
+        self._executor_lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted(labels.items()))
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        self.help.setdefault(name, help_text)
+        family = self.counters.setdefault(name, {})
+        key = self._key(labels)
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = Counter()
+        return metric
+
+    def gauge(self, name: str, help_text: str = "",
+              callback: Optional[Callable[[], float]] = None, **labels) -> Gauge:
+        self.help.setdefault(name, help_text)
+        family = self.gauges.setdefault(name, {})
+        key = self._key(labels)
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = Gauge(callback)
+        elif callback is not None:
+            metric.callback = callback
+        return metric
+
+    def histogram(self, name: str, help_text: str = "",
+                  bounds: Tuple[float, ...] = LATENCY_BUCKETS, **labels) -> Histogram:
+        self.help.setdefault(name, help_text)
+        family = self.histograms.setdefault(name, {})
+        key = self._key(labels)
+        metric = family.get(key)
+        if metric is None:
+            metric = family[key] = Histogram(bounds)
+        return metric
+
+    def inc(self, name: str, amount: int = 1, **labels) -> None:
+        if self.enabled:
+            self.counter(name, **labels).inc(amount)
+
+    def time_stage(self, stage: str):
+        """Context manager recording the stage latency (subject to sampling)"""
+        if not self.enabled or not self.sample_every:
+            return _NULL_TIMER
+        calls = self._stage_calls.get(stage, 0)
+        self._stage_calls[stage] = calls + 1
+        if calls % self.sample_every:
+            return _NULL_TIMER
+        return _StageTimer(self.histogram(
+            "stage_latency_seconds", "Latency of monitor processing stages", stage=stage))
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        if self.enabled:
+            self.histogram(name, **labels).observe(value)
+
+    def timed_executor_call(self, stage: str, fn: Callable, *args):
+        """Wrap ``fn`` for run_in_executor so the time spent queued is recorded"""
+        if not self.enabled:
+            return lambda: fn(*args)
+        submitted = time.perf_counter()
+        wait = self.histogram("executor_queue_wait_seconds",
+                              "Time between executor submit and start", stage=stage)
+        self._executor_submitted += 1
+
+        def run():
+            wait.observe(time.perf_counter() - submitted)
+            try:
+                return fn(*args)
+            finally:
+                done()
+        # Completed once it has run, or once dropped without running (the
+        # submit failed or shutdown cancelled it); finalize fires only once
+        done = weakref.finalize(run, self._executor_done)
+        return run
+
+    def _executor_done(self) -> None:
+        with self._executor_lock:
+            self._executor_completed += 1
+
+    def executor_backlog(self) -> int:
+        """Calls from timed_executor_call submitted but not yet completed"""
+        return self._executor_submitted - self._executor_completed
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Plain-dict view used by the structured log exporter"""
+        def label_str(key: LabelKey) -> str:
+            return ",".join(f"{k}={v}" for k, v in key) or "_"
+        return {
+            "counters": {name: {label_str(k): m.value for k, m in family.items()}
+                         for name, family in self.counters.items()},
+            "gauges": {name: {label_str(k): m.read() for k, m in family.items()}
+                       for name, family in self.gauges.items()},
+            "histograms": {name: {label_str(k): {"count": m.count, "sum": m.sum,
+                                                 "p50": m.quantile(0.5), "p99": m.quantile(0.99)}
+                                  for k, m in family.items()}
+                           for name, family in self.histograms.items()},
+        }
+
+
+def render_prometheus(registry: MetricsRegistry) -> str:
+    """Render the registry in the Prometheus text exposition format"""
+    ns = registry.namespace
+    lines: List[str] = []
+
+    def labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = key + extra
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+    # Called from the HTTP exporter's thread while the loop keeps registering
+    # families and label sets: iterate over snapshots of the live dicts
+    for kind, families in (("counter", registry.counters), ("gauge", registry.gauges)):
+        for name, family in sorted(list(families.items())):
+            full = f"{ns}_{name}"
+            lines.append(f"# HELP {full} {registry.help.get(name, '')}")
+            lines.append(f"# TYPE {full} {kind}")
+            for key, metric in list(family.items()):
+                value = metric.value if kind == "counter" else metric.read()
+                lines.append(f"{full}{labels(key)} {value}")
+
+    for name, family in sorted(list(registry.histograms.items())):
+        full = f"{ns}_{name}"
+        lines.append(f"# HELP {full} {registry.help.get(name, '')}")
+        lines.append(f"# TYPE {full} histogram")
+        for key, metric in list(family.items()):
+            cumulative = 0
+            for bound, count in zip(metric.bounds, metric.counts):
+                cumulative += count
+                lines.append(f"{full}_bucket{labels(key, (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{full}_bucket{labels(key, (('le', '+Inf'),))} {metric.count}")
+            lines.append(f"{full}_sum{labels(key)} {metric.sum}")
+            lines.append(f"{full}_count{labels(key)} {metric.count}")
+    return "\n".join(lines) + "\n"
+
+
+class PrometheusFileExporter:
+    """Periodically write the text format to a file (node_exporter textfile collector)"""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval_s: float = 15.0):
+        self.registry = registry
+        self.path = path
+        self.interval_s = interval_s
+
+    def export(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(render_prometheus(self.registry))
+        os.replace(tmp, self.path)
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval_s)
+            await loop.run_in_executor(None, self.export)
+
+
+class HttpExporter:
+    """Serve ``/metrics`` from a background thread on a local port"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.server = None
+
+    def start(self) -> None:
+        # Imported here: http.server is only needed when this exporter is configured
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render_prometheus(registry).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name="gaia-metrics-http",
+                         daemon=True).start()
+
+    async def run(self) -> None:
+        self.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            # shutdown() blocks until serve_forever's poll loop notices (up to
+            # 0.5 s); wait for it off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.server.shutdown)
+            self.server.server_close()
+
+
+class StructuredLogExporter:
+    """Periodically log the registry snapshot as one JSON line"""
+
+    def __init__(self, registry: MetricsRegistry, interval_s: float = 60.0,
+                 logger: Optional[logging.Logger] = None):
+        self.registry = registry
+        self.interval_s = interval_s
+        self.logger = logger or logging.getLogger(__name__)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            self.logger.info(json.dumps({"metrics": self.registry.snapshot()}))
+
+
+def create_exporter(registry: MetricsRegistry, config: Dict):
+    """Build the exporter named by ``instrumentation.exporter`` in config.json"""
+    kind = config.get("exporter", "log")
+    interval_s = config.get("interval_s", 15.0)
+    if kind == "prometheus_file":
+        return PrometheusFileExporter(registry, config.get("path", "gaia_monitor.prom"), interval_s)
+    if kind == "http":
+        return HttpExporter(registry, config.get("host", "127.0.0.1"), config.get("port", 9464))
+    if kind == "log":
+        return StructuredLogExporter(registry, interval_s)
+    raise ValueError(f"Unknown metrics exporter: {kind}")
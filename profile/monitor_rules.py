@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Monitor Rules
+Thresholds and weights compiled from config into bitmask rule tables with interned results
+"""
+
+import operator
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+# Always appended to the CO2 recommendations, whatever fired
+CO2_BASE_RECOMMENDATIONS = (
+    "Consider sustainable aviation fuel (SAF) adoption",
+    "Implement operational efficiency improvements",
+    "Explore hydrogen propulsion for future fleet",
+)
+
+# Defaults for the "rules" config section (the values the monitor always used)
+DEFAULT_RULES = {
+    "co2_threshold": 50.0,             # tCO2 max
+    "urgent_co2_fraction": 0.8,        # urgent above this fraction of co2_threshold
+    "max_well_to_wake": 50.0,          # gCO2e/MJ
+    "criticality_threshold": 0.8,      # 80% max criticality
+    "max_supply_risk": 70.0,           # 70% risk threshold
+    "min_circularity": 0.3,            # 30% minimum circularity
+    "risk_weights": {"material_intensity": 0.3, "supply_risk": 0.4, "circularity": 0.3},
+    "improvement_multipliers": {"co2_reduction_percentage": 10.0,
+                                "cost_reduction_percentage": 5.0,
+                                "risk_reduction_percentage": 15.0},
+}
+DEFAULT_SAFETY_MARGINS = {"co2_margin": 0.1, "resource_margin": 0.15}
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One threshold condition; ``result`` is reported when it triggers"""
+    name: str
+    field: str
+    op: str
+    threshold: Any
+    result: str
+
+
+class RuleTable:
+    """Rules compiled to one bit each of an integer condition code.
+
+    ``code`` evaluates one sample and ``codes`` a column batch as boolean
+    masks. Results are built once per distinct code and interned, so every
+    sample that triggers the same conditions gets the same tuple object.
+    """
+
+    def __init__(self, rules: Sequence[Rule], suffix: Tuple[str, ...] = ()):
+        if len(rules) > 32:
+            raise ValueError("a rule table holds at most 32 rules")
+        self.rules = tuple(rules)
+        self.suffix = tuple(suffix)
+        self._compiled = tuple((rule.field, _OPERATORS[rule.op], rule.threshold, 1 << bit)
+                               for bit, rule in enumerate(self.rules))
+        self._results: Dict[int, Tuple[str, ...]] = {}
+        self._names: Dict[int, Tuple[str, ...]] = {}
+
+    def code(self, record, extra: Optional[Mapping[str, Any]] = None) -> int:
+        """Condition code of one record; ``extra`` supplies derived fields"""
+        code = 0
+        for field, compare, threshold, bit in self._compiled:
+            value = extra[field] if extra and field in extra else getattr(record, field)
+            if compare(value, threshold):
+                code |= bit
+        return code
+
+    def masks(self, columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """One boolean mask per rule over a column batch"""
+        return {rule.name: np.asarray(compare(np.asarray(columns[field]), threshold), dtype=bool)
+                for rule, (field, compare, threshold, _) in zip(self.rules, self._compiled)}
+
+    def codes(self, columns: Mapping[str, np.ndarray],
+              masks: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+        masks = masks if masks is not None else self.masks(columns)
+        count = len(next(iter(columns.values()))) if columns else 0
+        codes = np.zeros(count, dtype=np.uint32)
+        for bit, rule in enumerate(self.rules):
+            codes |= masks[rule.name].astype(np.uint32) << np.uint32(bit)
+        return codes
+
+    def results(self, code: int) -> Tuple[str, ...]:
+        """Interned triggered results (in rule order) followed by the suffix"""
+        cached = self._results.get(code)
+        if cached is None:
+            cached = tuple(rule.result for bit, rule in enumerate(self.rules)
+                           if code >> bit & 1) + self.suffix
+            cached = self._results.setdefault(code, cached)
+        return cached
+
+    def names(self, code: int) -> Tuple[str, ...]:
+        """Interned names of the triggered rules"""
+        cached = self._names.get(code)
+        if cached is None:
+            cached = tuple(rule.name for bit, rule in enumerate(self.rules) if code >> bit & 1)
+            cached = self._names.setdefault(code, cached)
+        return cached
+
+    def results_batch(self, codes: np.ndarray) -> List[Tuple[str, ...]]:
+        """Shared result tuples for a batch of codes"""
+        return [self.results(code) for code in codes.tolist()]
+
+
+# Pairwise comparison code -> value indexes ordered by descending value
+_RANKINGS: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+
+
+def rank_indices(values: Sequence[float]) -> Tuple[int, ...]:
+    """Indexes of ``values`` by descending value, ties kept in index order.
+
+    The order is fully determined by the pairwise comparisons, so it is
+    looked up by their bit code and shared instead of sorted per sample.
+    """
+    code, bit, count = 0, 1, len(values)
+    for i in range(count):
+        for j in range(i + 1, count):
+            if values[i] < values[j]:
+                code |= bit
+            bit <<= 1
+    key = (count, code)
+    ranked = _RANKINGS.get(key)
+    if ranked is None:
+        ranked = _RANKINGS.setdefault(
+            key, tuple(sorted(range(count), key=lambda k: values[k], reverse=True)))
+    return ranked
+
+
+# (names, ranking) -> names in that order
+_RANKED_NAMES: Dict[Tuple[Tuple[str, ...], Tuple[int, ...]], Tuple[str, ...]] = {}
+
+
+def rank_names(names: Tuple[str, ...], values: Sequence[float]) -> Tuple[str, ...]:
+    """``names`` sorted by descending value, ties kept in declaration order"""
+    key = (names, rank_indices(values))
+    ranked = _RANKED_NAMES.get(key)
+    if ranked is None:
+        ranked = _RANKED_NAMES.setdefault(key, tuple(names[k] for k in key[1]))
+    return ranked
+
+
+class MonitorRules:
+    """Every threshold, weight and constraint the monitor applies.
+
+    Built once from the ``rules`` and ``safety_margins`` config sections
+    (missing keys fall back to :data:`DEFAULT_RULES`); the monitor's safety,
+    criticality, risk and recommendation paths all read from here.
+    """
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None):
+        config = config or {}
+        rules = {**DEFAULT_RULES, **(config.get("rules") or {})}
+        margins = {**DEFAULT_SAFETY_MARGINS, **(config.get("safety_margins") or {})}
+
+        self.co2_threshold = float(rules["co2_threshold"])
+        self.co2_margin = float(margins["co2_margin"])
+        self.co2_limit = self.co2_threshold * (1 - self.co2_margin)
+        self.criticality_threshold = float(rules["criticality_threshold"])
+        self.resource_margin = float(margins["resource_margin"])
+        self.max_supply_risk = float(rules["max_supply_risk"])
+        self.min_circularity = float(rules["min_circularity"])
+
+        weights = {**DEFAULT_RULES["risk_weights"], **rules["risk_weights"]}
+        self.risk_weights = (float(weights["material_intensity"]), float(weights["supply_risk"]),
+                             float(weights["circularity"]))
+        self.improvement_multipliers = MappingProxyType(
+            {**DEFAULT_RULES["improvement_multipliers"], **rules["improvement_multipliers"]})
+        self.constraints = MappingProxyType({
+            "max_material_intensity": self.criticality_threshold,
+            "min_circularity": self.min_circularity,
+            "max_supply_risk": self.max_supply_risk,
+        })
+
+        self.resource = RuleTable((
+            Rule("high_material_intensity", "critical_material_intensity", ">",
+                 self.criticality_threshold * (1 + self.resource_margin), "high_material_intensity"),
+            Rule("supply_chain_risk", "supply_chain_risk_index", ">", self.max_supply_risk,
+                 "supply_chain_risk"),
+            Rule("low_circularity", "resource_circularity_indicator", "<", self.min_circularity,
+                 "low_circularity"),
+        ))
+        self.co2_recommendations = RuleTable((
+            Rule("urgent", "absolute_co2_emissions", ">",
+                 self.co2_threshold * float(rules["urgent_co2_fraction"]),
+                 "URGENT: Implement immediate CO2 reduction measures"),
+            Rule("increasing_trend", "trend_direction", "==", "increasing",
+                 "Proactive measures needed to reverse CO2 trend"),
+            Rule("supply_chain", "well_to_wake_emissions", ">", float(rules["max_well_to_wake"]),
+                 "Optimize fuel/energy supply chain efficiency"),
+        ), suffix=CO2_BASE_RECOMMENDATIONS)
+
+    def risk_score(self, intensity: float, supply_risk: float, circularity: float) -> float:
+        material_weight, supply_weight, circularity_weight = self.risk_weights
+        score = (material_weight * intensity + supply_weight * (supply_risk / 100.0) +
+                 circularity_weight * (1.0 - circularity))
+        return min(1.0, max(0.0, score))
+
+    def risk_score_batch(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        material_weight, supply_weight, circularity_weight = self.risk_weights
+        score = (material_weight * columns["critical_material_intensity"] +
+                 supply_weight * (columns["supply_chain_risk_index"] / 100.0) +
+                 circularity_weight * (1.0 - columns["resource_circularity_indicator"]))
+        return np.clip(score, 0.0, 1.0)
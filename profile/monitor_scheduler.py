@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Monitoring Scheduler
+Per-asset adaptive polling intervals on a deadline heap with batched dispatch
+"""
+
+import asyncio
+import heapq
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from monitor_instrumentation import MetricsRegistry
+
+# Statuses that tighten an asset's interval (CO2 severity / resource status)
+URGENT_STATUSES = frozenset({"HIGH", "CRITICAL"})
+
+# Defaults for the "scheduler" config section; the base interval falls back
+# to the top-level monitoring_interval_ms
+DEFAULT_SCHEDULER = {
+    "min_interval_ms": 25,
+    "max_interval_ms": 5000,
+    "tighten_factor": 0.5,      # interval multiplier on an urgent status
+    "relax_factor": 1.5,        # interval multiplier after stable_ticks calm polls
+    "stable_ticks": 10,
+    "stable_tolerance": 0.05,   # relative change still counted as stable
+    "batch_window_ms": 5,       # assets due within this window share a dispatch
+    "max_batch": 1024,
+}
+
+# Jitter bucket upper bounds in seconds: 0.1 ms steps where a healthy loop
+# sits, so the bucket-bound quantiles in stats() stay close to the truth
+JITTER_BUCKETS = (
+    1e-4, 2e-4, 3e-4, 4e-4, 5e-4, 6e-4, 7e-4, 8e-4, 9e-4, 1e-3,
+    1.25e-3, 1.5e-3, 1.75e-3, 2e-3, 2.5e-3, 3e-3, 4e-3, 5e-3, 7.5e-3,
+    1e-2, 1.5e-2, 2e-2, 3e-2, 5e-2, 7.5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+# Dispatch callback: due asset IDs -> optional {asset_id: status or (status, value)}
+Dispatch = Callable[[List[str]], Awaitable[Optional[Mapping[str, Any]]]]
+
+
+class AssetSchedule:
+    """Polling state of one asset"""
+    __slots__ = ("asset_id", "interval_s", "due", "generation", "calm", "last_value",
+                 "polls", "missed")
+
+    def __init__(self, asset_id: str, interval_s: float, due: float):
+        self.asset_id = asset_id
+        self.interval_s = interval_s
+        self.due = due
+        self.generation = 0       # bumped on reschedule; stale heap entries are skipped
+        self.calm = 0             # consecutive stable, non-urgent polls
+        self.last_value: Optional[float] = None
+        self.polls = 0
+        self.missed = 0
+
+
+class MonitorScheduler:
+    """Polls thousands of assets, each on its own adaptive interval.
+
+    Deadlines live in one heap (lazy deletion on reschedule), so the run
+    loop sleeps until the earliest deadline and never scans idle assets.
+    Everything due within ``batch_window_ms`` goes to a single ``dispatch``
+    call. An urgent status (HIGH / CRITICAL) multiplies the asset's
+    interval by ``tighten_factor`` and pulls its next poll in; after
+    ``stable_ticks`` calm polls the interval grows by ``relax_factor``, up
+    to ``max_interval_ms``. Deadlines advance from the scheduled time, not
+    the dispatch time, so intervals do not drift; a poll that is already a
+    full interval late counts as a missed deadline and the asset skips
+    ahead instead of bursting to catch up.
+    """
+
+    def __init__(self, interval_ms: float = 100.0, config: Optional[Mapping[str, Any]] = None,
+                 metrics: Optional[MetricsRegistry] = None, clock: Callable[[], float] = time.monotonic):
+        settings = {**DEFAULT_SCHEDULER, **(config or {})}
+        self.interval_s = float(settings.get("interval_ms", interval_ms)) / 1000
+        self.min_interval_s = min(float(settings["min_interval_ms"]) / 1000, self.interval_s)
+        self.max_interval_s = max(float(settings["max_interval_ms"]) / 1000, self.interval_s)
+        self.tighten_factor = float(settings["tighten_factor"])
+        self.relax_factor = float(settings["relax_factor"])
+        self.stable_ticks = int(settings["stable_ticks"])
+        self.stable_tolerance = float(settings["stable_tolerance"])
+        self.batch_window_s = float(settings["batch_window_ms"]) / 1000
+        self.max_batch = int(settings["max_batch"])
+        self.clock = clock
+        self.assets: Dict[str, AssetSchedule] = {}
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopped = False
+        self.counters = {"dispatched": 0, "batches": 0, "missed": 0, "tightened": 0, "relaxed": 0}
+
+        self.metrics = metrics or MetricsRegistry()
+        self.jitter = self.metrics.histogram("scheduler_jitter_seconds",
+                                             "Dispatch time minus scheduled deadline",
+                                             bounds=JITTER_BUCKETS)
+        self.metrics.gauge("scheduler_assets", "Assets under scheduled polling",
+                           callback=lambda: len(self.assets))
+        self.metrics.gauge("scheduler_polls_per_second", "Poll rate implied by current intervals",
+                           callback=self.poll_rate)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], metrics: Optional[MetricsRegistry] = None,
+                    **kwargs) -> "MonitorScheduler":
+        """Scheduler for the monitor config: ``scheduler`` section plus monitoring_interval_ms"""
+        return cls(config.get("monitoring_interval_ms", 100), config.get("scheduler"),
+                   metrics, **kwargs)
+
+    # --- Membership ------------------------------------------------------------
+
+    def add(self, asset_id: str, interval_ms: Optional[float] = None) -> None:
+        """Start polling ``asset_id``; the first poll lands at a random phase"""
+        interval_s = self.interval_s if interval_ms is None else interval_ms / 1000
+        if asset_id in self.assets:
+            self.remove(asset_id)
+        # Spread first deadlines over one interval so assets added together
+        # do not all fall due on the same tick
+        schedule = AssetSchedule(asset_id, interval_s, self.clock() + random.uniform(0, interval_s))
+        self.assets[asset_id] = schedule
+        self._push(schedule)
+
+    def remove(self, asset_id: str) -> None:
+        schedule = self.assets.pop(asset_id, None)
+        if schedule is not None:
+            schedule.generation += 1
+
+    def _push(self, schedule: AssetSchedule) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (schedule.due, self._seq, schedule.generation, schedule.asset_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # --- Adaptation --------------------------------------------------------------
+
+    def report(self, asset_id: str, status: str, value: Optional[float] = None) -> None:
+        """Adapt an asset's interval to its latest status (and optional key value)"""
+        schedule = self.assets.get(asset_id)
+        if schedule is None:
+            return
+        if status in URGENT_STATUSES:
+            schedule.calm = 0
+            tightened = max(self.min_interval_s, schedule.interval_s * self.tighten_factor)
+            if tightened < schedule.interval_s:
+                schedule.interval_s = tightened
+                self.counters["tightened"] += 1
+                # Pull an already scheduled poll in to the new interval
+                due = self.clock() + tightened
+                if due < schedule.due:
+                    schedule.due = due
+                    schedule.generation += 1
+                    self._push(schedule)
+        else:
+            last = schedule.last_value
+            stable = (value is None or last is None or
+                      abs(value - last) <= self.stable_tolerance * max(abs(last), 1e-12))
+            schedule.calm = schedule.calm + 1 if stable else 0
+            if schedule.calm >= self.stable_ticks and schedule.interval_s < self.max_interval_s:
+                schedule.interval_s = min(self.max_interval_s, schedule.interval_s * self.relax_factor)
+                schedule.calm = 0
+                self.counters["relaxed"] += 1
+        if value is not None:
+            schedule.last_value = value
+
+    # --- Run loop ----------------------------------------------------------------
+
+    def due_batch(self, now: float) -> List[AssetSchedule]:
+        """Pop every live schedule due by ``now + batch_window`` (up to max_batch)"""
+        horizon = now + self.batch_window_s
+        batch = []
+        heap = self._heap
+        while heap and heap[0][0] <= horizon and len(batch) < self.max_batch:
+            _, _, generation, asset_id = heapq.heappop(heap)
+            schedule = self.assets.get(asset_id)
+            if schedule is not None and schedule.generation == generation:
+                batch.append(schedule)
+        return batch
+
+    def advance_due(self, now: float) -> List[str]:
+        """Take the assets due by ``now`` (see due_batch) and schedule their next polls"""
+        batch = self.due_batch(now)
+        for schedule in batch:
+            self._advance(schedule, now)
+        if batch:
+            self.counters["batches"] += 1
+            self.counters["dispatched"] += len(batch)
+            self.metrics.inc("scheduler_dispatched_total", len(batch))
+        return [schedule.asset_id for schedule in batch]
+
+    def _advance(self, schedule: AssetSchedule, now: float) -> None:
+        lateness = now - schedule.due
+        self.jitter.observe(max(0.0, lateness))
+        if lateness > schedule.interval_s:
+            schedule.missed += 1
+            self.counters["missed"] += 1
+            self.metrics.inc("scheduler_missed_deadlines_total")
+        due = schedule.due + schedule.interval_s
+        if due <= now:
+            due = now + schedule.interval_s   # skip the missed slots
+        schedule.due = due
+        schedule.polls += 1
+        schedule.generation += 1
+        self._push(schedule)
+
+    def stop(self) -> None:
+        """Make :meth:`run` return after the dispatch in progress"""
+        self._stopped = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self, dispatch: Dispatch) -> None:
+        """Dispatch due assets until :meth:`stop` (or until the task is cancelled)"""
+        self._wakeup = asyncio.Event()
+        self._stopped = False
+        try:
+            while not self._stopped:
+                now = self.clock()
+                if not self._heap or self._heap[0][0] > now + self.batch_window_s:
+                    timeout = self._heap[0][0] - now if self._heap else None
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                asset_ids = self.advance_due(now)
+                if not asset_ids:
+                    continue
+                statuses = await dispatch(asset_ids)
+                for asset_id, status in (statuses or {}).items():
+                    if isinstance(status, tuple):
+                        self.report(asset_id, *status)
+                    else:
+                        self.report(asset_id, status)
+        finally:
+            self._wakeup = None
+
+    # --- Reporting ---------------------------------------------------------------
+
+    def poll_rate(self) -> float:
+        """Polls per second at the current intervals"""
+        return sum(1.0 / s.interval_s for s in self.assets.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and intervals; jitter percentiles are histogram bucket bounds.
+
+        ``jitter_ms`` holds the exact mean and, for p50/p99, the upper bound
+        of the bucket the percentile falls in ("p99_le": p99 <= this value).
+        """
+        intervals = [s.interval_s for s in self.assets.values()]
+        return {
+            "assets": len(self.assets),
+            **self.counters,
+            "mean_batch": self.counters["dispatched"] / self.counters["batches"]
+            if self.counters["batches"] else 0.0,
+            "polls_per_s": self.poll_rate(),
+            "base_rate_polls_per_s": len(intervals) / self.interval_s,
+            "interval_ms": {"min": min(intervals) * 1000, "mean": sum(intervals) / len(intervals) * 1000,
+                            "max": max(intervals) * 1000} if intervals else {},
+            "jitter_ms": {"mean": self.jitter.sum / self.jitter.count * 1000 if self.jitter.count else 0.0,
+                          "p50_le": (self.jitter.quantile(0.5) or 0.0) * 1000,
+                          "p99_le": (self.jitter.quantile(0.99) or 0.0) * 1000},
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Synthetic run: many assets, a few of them unstable, no monitor behind them"""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="GAIA-Q monitoring scheduler simulation")
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    parser.add_argument("--unstable", type=float, default=0.05,
+                        help="fraction of assets reporting HIGH on every poll")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    scheduler = MonitorScheduler(args.interval_ms)
+    unstable = set(random.sample(range(args.assets), int(args.assets * args.unstable)))
+    for i in range(args.assets):
+        scheduler.add(f"asset-{i}")
+
+    async def dispatch(asset_ids: List[str]) -> Dict[str, str]:
+        return {asset_id: "HIGH" if int(asset_id[6:]) in unstable else "NORMAL"
+                for asset_id in asset_ids}
+
+    async def run() -> None:
+        asyncio.get_running_loop().call_later(args.seconds, scheduler.stop)
+        await scheduler.run(dispatch)
+
+    started = time.process_time()
+    asyncio.run(run())
+    print(json.dumps({**scheduler.stats(), "cpu_s": time.process_time() - started}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Monitor Snapshots
+Compact versioned binary snapshots of named NumPy arrays
+
+File layout (little-endian)::
+
+    magic   6s   b"GQSNAP"
+    version u16
+    count   u32  number of sections
+    per section:
+        name    u16 length + UTF-8 bytes
+        dtype   u8 length + ASCII dtype string (e.g. "<f8")
+        ndim    u8, then ndim x u64 shape
+        nbytes  u64, then the raw array bytes
+"""
+
+import json
+import math
+import os
+import struct
+import tempfile
+from typing import Dict, Sequence
+
+import numpy as np
+
+MAGIC = b"GQSNAP"
+SNAPSHOT_VERSION = 1
+
+_HEADER = struct.Struct("<6sHI")
+
+
+class SnapshotVersionError(ValueError):
+    """Snapshot was written by an incompatible format version"""
+
+
+class SnapshotFormatError(ValueError):
+    """Snapshot is truncated, corrupt or missing a required section"""
+
+
+class _Cursor:
+    """Bounds-checked sequential reads from a snapshot buffer"""
+
+    def __init__(self, data: bytes, path: str):
+        self.data = data
+        self.path = path
+        self.offset = 0
+
+    def take(self, size: int) -> int:
+        """Skip ``size`` bytes and return where they start"""
+        start = self.offset
+        if start + size > len(self.data):
+            raise SnapshotFormatError(f"{self.path}: truncated snapshot "
+                                      f"({len(self.data)} bytes, needs {start + size})")
+        self.offset = start + size
+        return start
+
+    def unpack(self, fmt: str) -> tuple:
+        return struct.unpack_from(fmt, self.data, self.take(struct.calcsize(fmt)))
+
+    def text(self, size: int, encoding: str) -> str:
+        start = self.take(size)
+        try:
+            return self.data[start:start + size].decode(encoding)
+        except UnicodeDecodeError as e:
+            raise SnapshotFormatError(f"{self.path}: corrupt snapshot ({e})") from None
+
+
+def encode_json(payload) -> np.ndarray:
+    """Pack small JSON-serializable metadata as a uint8 section"""
+    return np.frombuffer(json.dumps(payload).encode("utf-8"), dtype=np.uint8)
+
+
+def decode_json(section: np.ndarray):
+    return json.loads(section.tobytes().decode("utf-8"))
+
+
+def write_snapshot(path: str, sections: Dict[str, np.ndarray], fsync: bool = True) -> int:
+    """Atomically write ``sections`` to ``path``; returns the file size.
+
+    The data goes to a uniquely named temporary file next to ``path`` first,
+    so concurrent writers (fleet workers rebuilding a shared cache) never
+    write into the same file; the last rename wins.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        size = _write_sections(fd, sections, fsync)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+def _write_sections(fd: int, sections: Dict[str, np.ndarray], fsync: bool) -> int:
+    with os.fdopen(fd, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_VERSION, len(sections)))
+        for name, array in sections.items():
+            array = np.ascontiguousarray(array)
+            name_bytes = name.encode("utf-8")
+            dtype_bytes = array.dtype.str.encode("ascii")
+            f.write(struct.pack("<H", len(name_bytes)) + name_bytes)
+            f.write(struct.pack("<B", len(dtype_bytes)) + dtype_bytes)
+            f.write(struct.pack(f"<B{array.ndim}Q", array.ndim, *array.shape))
+            f.write(struct.pack("<Q", array.nbytes))
+            f.write(array.tobytes())
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+        return f.tell()
+
+
+def read_snapshot(path: str, required: Sequence[str] = ()) -> Dict[str, np.ndarray]:
+    """Read every section of a snapshot; arrays are zero-copy views of one buffer.
+
+    A truncated or corrupt file, or one without every ``required`` section,
+    raises SnapshotFormatError; another format version raises
+    SnapshotVersionError. Both are ValueErrors.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    cursor = _Cursor(data, path)
+    magic, version, count = cursor.unpack(_HEADER.format)
+    if magic != MAGIC:
+        raise SnapshotFormatError(f"{path} is not a GAIA-Q snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotVersionError(
+            f"{path}: snapshot version {version}, expected {SNAPSHOT_VERSION}")
+
+    sections = {}
+    for _ in range(count):
+        (name_len,) = cursor.unpack("<H")
+        name = cursor.text(name_len, "utf-8")
+        (dtype_len,) = cursor.unpack("<B")
+        dtype_str = cursor.text(dtype_len, "ascii")
+        (ndim,) = cursor.unpack("<B")
+        shape = cursor.unpack(f"<{ndim}Q")
+        (nbytes,) = cursor.unpack("<Q")
+        offset = cursor.take(nbytes)
+        try:
+            dtype = np.dtype(dtype_str)
+        except TypeError as e:
+            raise SnapshotFormatError(f"{path}: corrupt snapshot section {name!r} ({e})") from None
+        if dtype.hasobject or math.prod(shape) * dtype.itemsize != nbytes:
+            raise SnapshotFormatError(f"{path}: corrupt snapshot section {name!r} "
+                                      f"({dtype_str} {shape} in {nbytes} bytes)")
+        if nbytes:
+            sections[name] = np.frombuffer(data, dtype=dtype, count=nbytes // dtype.itemsize,
+                                           offset=offset).reshape(shape)
+        else:
+            sections[name] = np.empty(shape, dtype=dtype)
+    missing = [name for name in required if name not in sections]
+    if missing:
+        raise SnapshotFormatError(f"{path}: snapshot has no {', '.join(missing)} section")
+    return sections
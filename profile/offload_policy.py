@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Offload Policy
+Measured per-stage choice between running work inline on the event loop or in a pool
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+ADAPTIVE = "adaptive"
+MODES = (ADAPTIVE, INLINE, THREAD, PROCESS)
+
+# Work measured below this runs inline: a thread hop costs tens of microseconds,
+# a process round trip (pickling, IPC) closer to a millisecond
+DEFAULT_INLINE_THRESHOLD_US = {THREAD: 200.0, PROCESS: 2000.0}
+# Blocking I/O never runs on the loop, however fast it was last time
+DEFAULT_STAGE_MODES = {"save_snapshot": THREAD}
+# Arrays at least this large go to process workers through shared memory
+DEFAULT_SHM_MIN_BYTES = 64 * 1024
+_COST_ALPHA = 0.2   # EWMA weight of the newest cost sample
+
+
+class SharedArray(NamedTuple):
+    """Handle to an array copied into a named shared memory block"""
+    name: str
+    shape: tuple
+    dtype: str
+
+
+def _run_shared(fn: Callable, args: tuple):
+    """Process worker entry: attach shared arrays, call ``fn``, time it.
+
+    The result is copied out before the blocks are detached, so nothing
+    returned to the parent refers to shared memory.
+    """
+    blocks = []
+    resolved = []
+    for arg in args:
+        if isinstance(arg, SharedArray):
+            block = shared_memory.SharedMemory(name=arg.name)
+            blocks.append(block)
+            resolved.append(np.ndarray(arg.shape, dtype=arg.dtype, buffer=block.buf))
+        else:
+            resolved.append(arg)
+    try:
+        started = time.perf_counter()
+        result = fn(*resolved)
+        elapsed = time.perf_counter() - started
+        if isinstance(result, np.ndarray):
+            result = result.copy()
+        return result, elapsed
+    finally:
+        del resolved
+        for block in blocks:
+            block.close()
+
+
+class _StageState:
+    __slots__ = ("cost_s", "last_s", "offloaded", "where", "inline_calls", "pool_calls")
+
+    def __init__(self):
+        self.cost_s: Optional[float] = None   # EWMA of the measured run time
+        self.last_s = 0.0
+        self.offloaded = False
+        self.where = INLINE                   # placement of the latest call
+        self.inline_calls = 0
+        self.pool_calls = 0
+
+
+class OffloadPolicy:
+    """Run named stages inline or in a pool, based on what they cost.
+
+    Every call is timed where it runs (on the loop, in the thread or in the
+    process worker) into a per-stage moving average. In ``adaptive`` mode a
+    stage runs inline until that average exceeds the threshold and returns
+    inline once it falls below half of it, so a stage does not flap at the
+    boundary; ``pool`` (thread or process) is where heavy work goes. The
+    ``inline``, ``thread`` and ``process`` modes pin every stage to one
+    place, and ``stages`` overrides the mode per stage.
+
+    Only callables passed with ``portable=True`` (picklable, e.g. a model's
+    bound method) go to the process pool; the rest use the thread pool.
+    Array arguments of ``shm_min_bytes`` or more are handed to process
+    workers through shared memory instead of being pickled.
+    """
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None, metrics=None,
+                 thread_executor: Optional[Callable[[], Executor]] = None):
+        config = dict(config or {})
+        mode = config.get("mode", ADAPTIVE)
+        if mode not in MODES:
+            raise ValueError(f"unknown offload mode {mode!r} (expected one of {MODES})")
+        pool = config.get("pool", PROCESS if mode == PROCESS else THREAD)
+        if pool not in (THREAD, PROCESS):
+            raise ValueError(f"unknown offload pool {pool!r} (expected thread or process)")
+        self.mode = mode
+        self.pool = pool
+        self.inline_threshold_s = float(config.get("inline_threshold_us",
+                                                   DEFAULT_INLINE_THRESHOLD_US[self.pool])) / 1e6
+        self.stage_modes = {**DEFAULT_STAGE_MODES, **(config.get("stages") or {})}
+        self.workers = int(config.get("workers", 4))
+        self.start_method = config.get("start_method", "spawn")
+        self.shm_min_bytes = int(config.get("shm_min_bytes", DEFAULT_SHM_MIN_BYTES))
+        self.metrics = metrics   # optional MetricsRegistry
+        self._thread_executor = thread_executor
+        self._process_executor = None
+        self.stages: Dict[str, _StageState] = {}
+
+    # --- Decisions -----------------------------------------------------------
+
+    def decide(self, stage: str, portable: bool = False) -> str:
+        """Where the next call of ``stage`` runs: inline, thread or process"""
+        mode = self.stage_modes.get(stage, self.mode)
+        if mode == ADAPTIVE:
+            state = self.stages.get(stage)
+            if state is None or not state.offloaded:
+                return INLINE
+            mode = self.pool
+        if mode == PROCESS and not portable:
+            return THREAD
+        return mode
+
+    def record(self, stage: str, cost_s: float, where: str) -> None:
+        """Account one measured call of ``stage`` (also for work run elsewhere)"""
+        self._record(stage, self._state(stage), cost_s, where)
+
+    def _record(self, stage: str, state: _StageState, cost_s: float, where: str) -> None:
+        state.where = where
+        state.last_s = cost_s
+        state.cost_s = cost_s if state.cost_s is None else state.cost_s + _COST_ALPHA * (cost_s - state.cost_s)
+        if state.offloaded:
+            state.offloaded = state.cost_s >= self.inline_threshold_s / 2
+        else:
+            state.offloaded = state.cost_s > self.inline_threshold_s
+        if self.metrics is not None:
+            self.metrics.inc("offload_decisions_total", stage=stage, mode=where)
+            self.metrics.observe("offload_cost_seconds", cost_s, stage=stage)
+
+    def _state(self, stage: str) -> _StageState:
+        state = self.stages.get(stage)
+        if state is None:
+            state = self.stages[stage] = _StageState()
+            if self.metrics is not None:
+                self.metrics.gauge("offload_cost_ewma_seconds",
+                                   "Moving average run time per offload stage",
+                                   callback=lambda: state.cost_s or 0.0, stage=stage)
+                self.metrics.gauge("offload_offloaded", "1 while a stage runs in a pool",
+                                   callback=lambda: float(state.offloaded), stage=stage)
+        return state
+
+    # --- Execution -----------------------------------------------------------
+
+    async def run(self, stage: str, fn: Callable, *args, portable: bool = False) -> Any:
+        """Call ``fn(*args)`` where the policy decides and return its result"""
+        state = self._state(stage)
+        where = self.decide(stage, portable)
+        if where == INLINE:
+            started = time.perf_counter()
+            result = fn(*args)
+            state.inline_calls += 1
+            self._record(stage, state, time.perf_counter() - started, INLINE)
+            return result
+
+        loop = asyncio.get_running_loop()
+        state.pool_calls += 1
+        if where == PROCESS:
+            result, cost_s = await self._run_in_process(loop, fn, args)
+        else:
+            def timed():
+                started = time.perf_counter()
+                value = fn(*args)
+                return value, time.perf_counter() - started
+            call = (self.metrics.timed_executor_call(stage, timed)
+                    if self.metrics is not None else timed)
+            result, cost_s = await loop.run_in_executor(
+                self._thread_executor() if self._thread_executor else None, call)
+        self._record(stage, state, cost_s, where)
+        return result
+
+    async def _run_in_process(self, loop: asyncio.AbstractEventLoop, fn: Callable, args: tuple):
+        blocks = []
+        try:
+            shared = []
+            for arg in args:
+                if isinstance(arg, np.ndarray) and arg.nbytes >= self.shm_min_bytes:
+                    block = shared_memory.SharedMemory(create=True, size=arg.nbytes)
+                    blocks.append(block)
+                    np.ndarray(arg.shape, dtype=arg.dtype, buffer=block.buf)[...] = arg
+                    shared.append(SharedArray(block.name, arg.shape, arg.dtype.str))
+                else:
+                    shared.append(arg)
+            return await loop.run_in_executor(self.process_executor, _run_shared, fn, tuple(shared))
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    @property
+    def process_executor(self) -> Executor:
+        """Process pool for portable heavy work, started on first use"""
+        if self._process_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            self._process_executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context(self.start_method))
+        return self._process_executor
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per stage: current placement, moving-average cost and call counts"""
+        return {stage: {"where": state.where,
+                        "cost_us": (state.cost_s or 0.0) * 1e6,
+                        "inline_calls": state.inline_calls,
+                        "pool_calls": state.pool_calls}
+                for stage, state in self.stages.items()}
+
+    def close(self) -> None:
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=False, cancel_futures=True)
+            self._process_executor = None
+
+
+class Coalescer:
+    """Run the calls made during one event-loop iteration as a single batch.
+
+    ``batch_fn`` takes the queued items and returns one result per item. It
+    runs through ``policy`` as ``stage``; the amortized per-item cost is
+    also recorded under ``item_stage`` so the per-item placement keeps
+    following what the work actually costs.
+    """
+
+    def __init__(self, policy: OffloadPolicy, stage: str,
+                 batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 item_stage: Optional[str] = None, portable: bool = False,
+                 max_batch: int = 1024):
+        self.policy = policy
+        self.stage = stage
+        self.batch_fn = batch_fn
+        self.item_stage = item_stage
+        self.portable = portable
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()   # the loop only keeps weak references
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and await its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        self.items += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: List[Tuple[Any, asyncio.Future]]) -> None:
+        self.batches += 1
+        try:
+            results = await self.policy.run(self.stage, self.batch_fn, [item for item, _ in pending],
+                                            portable=self.portable)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        if self.item_stage:
+            state = self.policy.stages[self.stage]
+            self.policy.record(self.item_stage, state.last_s / len(pending), state.where)
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
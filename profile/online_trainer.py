@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Online Trainer
+Background mini-batch training of the CO2 prediction model on realized emissions
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from prediction_engine import PREDICTION_FEATURES, PREDICTION_WINDOW, PredictionModel
+
+# Defaults for the "training" config section; the horizon falls back to the
+# top-level prediction_horizon_hours
+DEFAULT_TRAINING = {
+    "enabled": True,
+    "replay_capacity": 4096,    # matured (window, realized emissions) pairs kept for replay
+    "pending_capacity": 8192,   # predictions waiting for their horizon to elapse
+    "queue_capacity": 65536,    # ingest events not yet drained by the worker
+    "batch_size": 64,
+    "steps": 4,                 # gradient steps per training round
+    "train_every": 128,         # ingested samples between training rounds
+    "error_window": 256,        # matured predictions in the rolling error
+    "seed": None,
+}
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring of (window, realized emissions) training pairs"""
+
+    def __init__(self, capacity: int, window: int = PREDICTION_WINDOW,
+                 features: int = len(PREDICTION_FEATURES)):
+        self.capacity = capacity
+        self.windows = np.zeros((capacity, window, features))
+        self.targets = np.zeros(capacity)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def extend(self, windows: np.ndarray, targets: np.ndarray) -> None:
+        count = len(targets)
+        if count > self.capacity:
+            windows, targets, count = windows[-self.capacity:], targets[-self.capacity:], self.capacity
+        index = (self._next + np.arange(count)) % self.capacity
+        self.windows[index] = windows
+        self.targets[index] = targets
+        self._next = (self._next + count) % self.capacity
+        self._size = min(self.capacity, self._size + count)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies of the stored (windows, targets), oldest first"""
+        index = (self._next - self._size + np.arange(self._size)) % self.capacity
+        return self.windows[index], self.targets[index]
+
+    def sample(self, size: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """``size`` pairs drawn uniformly (with replacement) from the buffer"""
+        index = rng.integers(0, self._size, size)
+        return self.windows[index], self.targets[index]
+
+
+class OnlineTrainer:
+    """Train the prediction model on its own matured predictions, off the ingest path.
+
+    The ingest path only appends to two bounded deques (observed emissions
+    and new predictions) and, every ``train_every`` samples, submits one
+    training round to the executor unless a round is still running. The
+    round, on a worker thread:
+
+    1. matches each pending prediction with the first observed
+       ``absolute_co2_emissions`` at or after its timestamp plus the
+       horizon, in one ``searchsorted`` per chunk;
+    2. feeds the errors into a rolling window (MAE, RMSE, MAPE) and the
+       matched pairs into a :class:`ReplayBuffer`;
+    3. runs ``steps`` mini-batch gradient steps on replayed pairs.
+
+    The model publishes new weights with a single assignment (see
+    SimplePredictionModel), so inference never waits for training. The
+    rolling MAPE gives the reported ``confidence``: ``1 - MAPE``, clipped to
+    [0, 1], and 0.0 until the first prediction has matured.
+
+    Timestamps are assumed to be non-decreasing per monitor. When
+    ``pending_capacity`` predictions are already waiting, new ones are not
+    tracked (counted as ``untracked``) until older ones mature; if the
+    worker falls behind by ``queue_capacity`` events the oldest are dropped.
+
+    :meth:`get_state` / :meth:`set_state` carry the rolling errors (and so
+    the confidence) and the replay buffer across restarts; predictions still
+    waiting for their horizon are not kept.
+    """
+
+    def __init__(self, model: Callable[[], Optional[PredictionModel]],
+                 executor: Callable[[], Executor], horizon_s: float = 24 * 3600,
+                 config: Optional[Mapping[str, Any]] = None, metrics=None):
+        settings = {**DEFAULT_TRAINING, **(config or {})}
+        self.model = model
+        self.executor = executor
+        self.horizon_s = max(1.0, float(settings.get("horizon_s", horizon_s)))
+        self.batch_size = int(settings["batch_size"])
+        self.steps = int(settings["steps"])
+        self.train_every = int(settings["train_every"])
+        self.pending_capacity = int(settings["pending_capacity"])
+        self.metrics = metrics   # optional MetricsRegistry
+        self.logger = logging.getLogger(__name__)
+        self.replay = ReplayBuffer(int(settings["replay_capacity"]))
+        self.rng = np.random.default_rng(settings["seed"])
+
+        # Ingest side (event loop): appends only
+        queue_capacity = int(settings["queue_capacity"])
+        self._observed: Deque[Tuple[Any, Any]] = deque(maxlen=queue_capacity)
+        self._predicted: Deque[Tuple[Any, Any, Any]] = deque(maxlen=queue_capacity)
+        self._since = 0
+        self._busy = False
+        self._closed = False
+
+        # Worker side: pending (due, windows, predicted) chunks in due order
+        self._pending: Deque[Tuple[np.ndarray, np.ndarray, np.ndarray]] = deque()
+        self._pending_count = 0
+        error_window = int(settings["error_window"])
+        self._abs_errors = np.full(error_window, np.nan)
+        self._rel_errors = np.full(error_window, np.nan)
+        self._error_next = 0
+        # Held by the worker while it writes errors and replay pairs, so
+        # get_state() never copies half a round
+        self._state_lock = threading.Lock()
+
+        # Published by the worker, read lock-free by the inference path
+        self.confidence = 0.0
+        self.counters = {"rounds": 0, "updates": 0, "matured": 0, "untracked": 0}
+        self.loss: Optional[float] = None
+        self.round_s = 0.0
+
+        if metrics is not None:
+            metrics.gauge("prediction_confidence", "1 - rolling MAPE of matured predictions",
+                          callback=lambda: self.confidence)
+            metrics.gauge("prediction_rolling_mae", "Rolling mean absolute error of matured predictions",
+                          callback=lambda: self.rolling_error()["mae"] or 0.0)
+            metrics.gauge("training_replay_size", "Matured pairs in the replay buffer",
+                          callback=lambda: len(self.replay))
+            metrics.gauge("training_pending_predictions", "Predictions waiting for their horizon",
+                          callback=lambda: self._pending_count)
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], model: Callable[[], Optional[PredictionModel]],
+                    executor: Callable[[], Executor], metrics=None) -> Optional["OnlineTrainer"]:
+        """Trainer for the monitor config (``training`` section), or None when disabled"""
+        training = config.get("training") or {}
+        if not training.get("enabled", DEFAULT_TRAINING["enabled"]):
+            return None
+        return cls(model, executor, config.get("prediction_horizon_hours", 24) * 3600.0,
+                   training, metrics)
+
+    # --- Ingest side (event loop) ------------------------------------------------
+
+    def observe(self, timestamp: int, value: float) -> None:
+        """Record one realized emissions value"""
+        self._observed.append((timestamp, value))
+        self._since += 1
+        if self._since >= self.train_every and not self._busy:
+            self._start_round()
+
+    def observe_batch(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        self._observed.append((np.array(timestamps), np.array(values, dtype=np.float64)))
+        self._since += len(timestamps)
+        if self._since >= self.train_every and not self._busy:
+            self._start_round()
+
+    def track(self, timestamp: int, window: np.ndarray, predicted: float) -> None:
+        """Remember a prediction made at ``timestamp`` from ``window`` (not copied)"""
+        self._predicted.append((timestamp, window, predicted))
+
+    def track_batch(self, timestamps: np.ndarray, windows: np.ndarray,
+                    predicted: np.ndarray) -> None:
+        self._predicted.append((np.array(timestamps), windows, np.array(predicted)))
+
+    def _start_round(self) -> None:
+        if self._closed:
+            return
+        self._since = 0
+        self._busy = True
+        call = (self.metrics.timed_executor_call("train_prediction_model", self._round)
+                if self.metrics is not None else self._round)
+        try:
+            self.executor().submit(call)
+        except RuntimeError:   # executor shut down
+            self._busy = False
+
+    def close(self) -> None:
+        """Stop starting rounds; a round already running finishes on its own"""
+        self._closed = True
+
+    # --- Worker side -------------------------------------------------------------
+
+    def _round(self) -> None:
+        started = time.perf_counter()
+        try:
+            if self._mature():
+                self._train()
+            self.counters["rounds"] += 1
+        except Exception as e:
+            self.logger.error(f"Training round failed: {e}")
+        finally:
+            self.round_s = time.perf_counter() - started
+            self._busy = False
+
+    @staticmethod
+    def _drain(queue: deque) -> list:
+        return [queue.popleft() for _ in range(len(queue))]
+
+    @staticmethod
+    def _join(values: list) -> np.ndarray:
+        """One float64 array from per-sample scalars and/or batch arrays"""
+        if not any(isinstance(value, np.ndarray) for value in values):
+            return np.array(values, dtype=np.float64)
+        return np.concatenate([np.atleast_1d(value) for value in values]).astype(np.float64)
+
+    @staticmethod
+    def _sorted(keys: np.ndarray, *columns: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """``keys`` and aligned ``columns`` in key order (no copy when already sorted)"""
+        if len(keys) < 2 or np.all(keys[1:] >= keys[:-1]):
+            return (keys,) + columns
+        order = np.argsort(keys, kind="stable")
+        return (keys[order],) + tuple(column[order] for column in columns)
+
+    def _mature(self) -> int:
+        """Match pending predictions with observations past their horizon"""
+        shape = self.replay.windows.shape[1:]
+        tracked = self._drain(self._predicted)
+        if tracked:
+            # Everything queued since the last round becomes one pending chunk
+            timestamps, windows, predicted = zip(*tracked)
+            due = self._join(timestamps)
+            room = max(0, self.pending_capacity - self._pending_count)
+            if len(due) > room:
+                self.counters["untracked"] += len(due) - room
+            if room:
+                if all(w.ndim == 2 for w in windows):
+                    windows = np.stack(windows)
+                else:
+                    windows = np.concatenate([np.reshape(w, (-1, *shape)) for w in windows])
+                predicted = self._join(predicted)
+                due, windows, predicted = self._sorted(due[:room], windows[:room], predicted[:room])
+                self._pending.append((due + self.horizon_s, windows, predicted))
+                self._pending_count += len(due)
+
+        observed = self._drain(self._observed)
+        if not observed or not self._pending:
+            return 0
+        timestamps, values = self._sorted(*(self._join(column) for column in zip(*observed)))
+        latest = timestamps[-1]
+
+        matched = []
+        while self._pending and self._pending[0][0][0] <= latest:
+            due, windows, predicted = self._pending.popleft()
+            ready = int(np.searchsorted(due, latest, "right"))
+            if ready < len(due):
+                self._pending.appendleft((due[ready:], windows[ready:], predicted[ready:]))
+            targets = values[np.searchsorted(timestamps, due[:ready], "left")]
+            matched.append((windows[:ready], predicted[:ready], targets))
+            self._pending_count -= ready
+        if not matched:
+            return 0
+        windows, predicted, targets = (np.concatenate(parts) for parts in zip(*matched))
+        with self._state_lock:
+            self._record_errors(predicted - targets, targets)
+            self.replay.extend(windows, targets)
+        self.counters["matured"] += len(targets)
+        if self.metrics is not None:
+            self.metrics.inc("prediction_matured_total", len(targets))
+        return len(targets)
+
+    def _record_errors(self, errors: np.ndarray, targets: np.ndarray) -> None:
+        size = len(self._abs_errors)
+        errors, targets = errors[-size:], targets[-size:]
+        index = (self._error_next + np.arange(len(errors))) % size
+        self._abs_errors[index] = np.abs(errors)
+        self._rel_errors[index] = np.abs(errors) / np.maximum(np.abs(targets), 1e-9)
+        self._error_next = (self._error_next + len(errors)) % size
+        self.confidence = self._confidence()
+
+    def _confidence(self) -> float:
+        return float(np.clip(1.0 - np.nanmean(self._rel_errors), 0.0, 1.0))
+
+    def _train(self) -> None:
+        model = self.model()
+        if model is None or not len(self.replay):
+            return
+        size = min(self.batch_size, len(self.replay))
+        for _ in range(self.steps):
+            windows, targets = self.replay.sample(size, self.rng)
+            # Only output 0 (emissions at the horizon) has a realized target;
+            # the other outputs are their own targets, i.e. left unchanged
+            goal = model.predict_batch(windows)
+            self.loss = float(np.mean((goal[:, 0] - targets) ** 2))
+            goal[:, 0] = targets
+            model.update(windows, goal)
+        self.counters["updates"] += self.steps
+        if self.metrics is not None:
+            self.metrics.inc("training_updates_total", self.steps)
+
+    # --- State (monitor snapshots) ------------------------------------------------
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Rolling errors and replay pairs, oldest first"""
+        with self._state_lock:
+            order = (self._error_next + np.arange(len(self._abs_errors))) % len(self._abs_errors)
+            kept = order[~np.isnan(self._abs_errors[order])]
+            windows, targets = self.replay.ordered()
+            return {"abs_errors": self._abs_errors[kept], "rel_errors": self._rel_errors[kept],
+                    "replay_windows": windows, "replay_targets": targets}
+
+    def set_state(self, state: Mapping[str, np.ndarray]) -> None:
+        """Load :meth:`get_state` output; the newest entries win if capacities shrank"""
+        abs_errors, rel_errors = state["abs_errors"], state["rel_errors"]
+        windows, targets = state["replay_windows"], state["replay_targets"]
+        if len(abs_errors) != len(rel_errors) or len(windows) != len(targets):
+            raise ValueError("trainer state columns differ in length")
+        if windows.shape[1:] != self.replay.windows.shape[1:]:
+            raise ValueError(f"replay window shape {windows.shape[1:]} != {self.replay.windows.shape[1:]}")
+        with self._state_lock:
+            size = len(self._abs_errors)
+            count = min(size, len(abs_errors))
+            self._abs_errors[:] = np.nan
+            self._rel_errors[:] = np.nan
+            self._abs_errors[:count] = abs_errors[len(abs_errors) - count:]
+            self._rel_errors[:count] = rel_errors[len(rel_errors) - count:]
+            self._error_next = count % size
+            self.confidence = self._confidence() if count else 0.0
+            self.replay.clear()
+            self.replay.extend(windows, targets)
+
+    # --- Reporting ---------------------------------------------------------------
+
+    def rolling_error(self) -> Dict[str, Optional[float]]:
+        """MAE, RMSE and MAPE over the last ``error_window`` matured predictions"""
+        errors = self._abs_errors[~np.isnan(self._abs_errors)]
+        if not len(errors):
+            return {"mae": None, "rmse": None, "mape": None}
+        return {"mae": float(errors.mean()),
+                "rmse": float(np.sqrt(np.mean(errors ** 2))),
+                "mape": float(np.nanmean(self._rel_errors))}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            **self.rolling_error(),
+            "confidence": self.confidence,
+            "loss": self.loss,
+            "replay": len(self.replay),
+            "pending": self._pending_count,
+            "round_ms": self.round_s * 1000,
+        }
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Prediction Engine
+Batched inference for CO2 trend models behind a small pluggable interface
+"""
+
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Sequence, Set, Tuple
+
+import numpy as np
+
+# CO2Metrics columns fed to the prediction model, in window order
+PREDICTION_FEATURES = ("absolute_co2_emissions", "co2_intensity", "well_to_wake_emissions")
+PREDICTION_WINDOW = 10
+PREDICTION_OUTPUTS = 5   # output 0 is the emissions estimate at the prediction horizon
+# Step of the legacy update_weights() rule; update() uses the model's own rate
+LEGACY_LEARNING_RATE = 0.001
+
+
+class PredictionModel(Protocol):
+    """Interface every CO2 trend model must provide.
+
+    ``windows`` is always a ``(batch, PREDICTION_WINDOW, len(PREDICTION_FEATURES))``
+    float64 tensor, oldest sample first.
+    """
+
+    def predict_batch(self, windows: np.ndarray) -> np.ndarray:
+        """Return a ``(batch, outputs)`` array of predictions"""
+        ...
+
+    def update(self, windows: np.ndarray, targets: np.ndarray) -> float:
+        """Fit towards ``(batch, outputs)`` targets; return the pre-update loss"""
+        ...
+
+
+class SimplePredictionModel:
+    """Linear model over a flattened (window x features) input.
+
+    Weights and bias live in one ``(weights, bias)`` tuple that is never
+    modified in place: updates build new arrays and publish them with a
+    single attribute assignment, so a prediction running on another thread
+    sees either the old or the new parameters, never a mix, without a lock.
+    """
+
+    def __init__(self, window: int = PREDICTION_WINDOW,
+                 features: int = len(PREDICTION_FEATURES),
+                 outputs: int = PREDICTION_OUTPUTS,
+                 learning_rate: float = 0.1,
+                 rng: Optional[np.random.Generator] = None):
+        rng = rng or np.random.default_rng()
+        self.window = window
+        self.features = features
+        self.learning_rate = learning_rate
+        # Initialize with random weights (simplified)
+        self._params = (rng.standard_normal((window * features, outputs)),
+                        rng.standard_normal(outputs))
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self._params[0]
+
+    @property
+    def bias(self) -> np.ndarray:
+        return self._params[1]
+
+    def predict_batch(self, windows: np.ndarray) -> np.ndarray:
+        # One matmul for the whole batch: (B, W*F) @ (W*F, O)
+        weights, bias = self._params
+        flat = np.asarray(windows, dtype=np.float64).reshape(len(windows), -1)
+        return flat @ weights + bias
+
+    def predict(self, input_data: np.ndarray) -> np.ndarray:
+        """Single-window convenience wrapper around predict_batch"""
+        return self.predict_batch(np.asarray(input_data).reshape(1, self.window, self.features))[0]
+
+    def update(self, windows: np.ndarray, targets: np.ndarray) -> float:
+        # One normalized gradient step on the mean squared error: the step is
+        # divided by the mean squared input norm, so raw (unscaled) emissions
+        # windows cannot make it diverge for learning rates below 2
+        weights, bias = self._params
+        flat = np.asarray(windows, dtype=np.float64).reshape(len(windows), -1)
+        error = flat @ weights + bias - targets
+        step = self.learning_rate / (1.0 + np.einsum("ij,ij->i", flat, flat).mean())
+        self._params = (weights - step * (flat.T @ error) / len(flat),
+                        bias - step * error.mean(axis=0))
+        return float(np.mean(error ** 2))
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        weights, bias = self._params
+        return {"weights": weights.copy(), "bias": bias.copy()}
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        if state["weights"].shape != self.weights.shape:
+            raise ValueError(f"weights shape {state['weights'].shape} != {self.weights.shape}")
+        self._params = (np.array(state["weights"], dtype=np.float64),
+                        np.array(state["bias"], dtype=np.float64))
+
+    def update_weights(self, error: float, learning_rate: float = LEGACY_LEARNING_RATE):
+        # Simple gradient descent (simplified); not scaled by update()'s
+        # normalized rate, which would make this multiplicative rule 100x stronger
+        weights, bias = self._params
+        self._params = (weights * (1.0 - learning_rate * error), bias)
+
+
+def predict_groups(groups: Sequence[Tuple[Callable[[np.ndarray], np.ndarray], np.ndarray]]
+                   ) -> List[np.ndarray]:
+    """Run each ``(predict_batch, windows)`` pair; one executor call for several models"""
+    return [predict_batch(windows) for predict_batch, windows in groups]
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-window prediction requests into one batch.
+
+    Requests made during the same event-loop iteration (for example, one per
+    asset at a monitoring tick) are stacked into a single ``predict_batch``
+    call in the executor, so the thread hop and matmul setup are paid once
+    per tick rather than once per asset. Requests may name their own model
+    (one per asset in a fleet shard): each model gets one stacked call and
+    all of them share the one executor call (see predict_groups). With
+    ``runner`` (an async ``runner(fn, arg)``, e.g. an offload policy stage)
+    the batch goes there instead of the executor.
+    """
+
+    def __init__(self, predict_batch: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+                 executor: Optional[Executor] = None,
+                 max_batch: int = 1024,
+                 metrics=None,
+                 runner: Optional[Callable[[Callable, Any], Awaitable[Any]]] = None):
+        self.predict_batch = predict_batch   # used for requests that name no model
+        self.executor = executor
+        self.runner = runner
+        self.max_batch = max_batch
+        self.metrics = metrics   # optional MetricsRegistry
+        self._pending: List[Tuple[np.ndarray, asyncio.Future, Optional[PredictionModel]]] = []
+        self._flush_scheduled = False
+        self._tasks: Set[asyncio.Task] = set()   # the loop only keeps weak references
+        self.batches = 0
+        self.requests = 0
+
+    async def predict(self, window: np.ndarray,
+                      model: Optional[PredictionModel] = None) -> np.ndarray:
+        """Queue one ``(window, features)`` input for ``model`` and await its prediction row"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((window, future, model))
+        self.requests += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, []
+        if pending:
+            task = asyncio.ensure_future(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: List[Tuple[np.ndarray, asyncio.Future,
+                                            Optional[PredictionModel]]]) -> None:
+        # Requests per model in arrival order (keyed by identity: models need not hash)
+        groups: Dict[int, Tuple[Callable, List[int]]] = {}
+        for index, (_, _, model) in enumerate(pending):
+            key = id(model)
+            if key not in groups:
+                groups[key] = (self.predict_batch if model is None else model.predict_batch, [])
+            groups[key][1].append(index)
+        batches = [(predict_batch, np.stack([pending[i][0] for i in indices]))
+                   for predict_batch, indices in groups.values()]
+        self.batches += 1
+        try:
+            if len(batches) == 1:
+                outputs = [await self._call(*batches[0])]
+            else:
+                outputs = await self._call(predict_groups, batches)
+        except Exception as e:
+            for _, future, _ in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, indices), predictions in zip(groups.values(), outputs):
+            for index, row in zip(indices, predictions):
+                future = pending[index][1]
+                if not future.done():
+                    future.set_result(row)
+
+    async def _call(self, fn: Callable, arg: Any) -> Any:
+        if self.runner is not None:
+            return await self.runner(fn, arg)
+        loop = asyncio.get_running_loop()
+        call = (self.metrics.timed_executor_call("predict_batch", fn, arg)
+                if self.metrics else partial(fn, arg))
+        return await loop.run_in_executor(self.executor, call)
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Result Codec
+Compact length-prefixed columnar frames for monitor results, with a zero-copy reader
+
+Frame layout (little-endian)::
+
+    length  u32  bytes that follow, so frames can be split off a byte stream
+    magic   4s   b"GQRF"
+    version u16
+    kind    u8 length + ASCII frame kind (e.g. "co2")
+    rows    u32
+    meta    u32 length + UTF-8 JSON {"fields": [[name, dtype, shape], ...], "tables": {...}}
+    zero padding to an 8-byte boundary
+    per field, in "fields" order: rows x itemsize raw bytes, zero padded to 8 bytes
+
+Enumerations are stored as small integers and recommendations and critical
+indicators as rule condition codes (see monitor_rules); the ``tables``
+entry carries what a reader needs to turn them back into strings. AGAD
+frames carry the matrix details (phase name, expected verification methods)
+and recommendations of each (phase, TRL, method validity) they contain, and
+validation reports as codes into ``tables["text"]``, one entry per distinct
+report. Phase ids and methods keep the phase store's fixed widths, which
+the store enforces at ingest, so no field is cut on the way to a frame.
+"""
+
+import json
+import socket
+import struct
+import sys
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from agad_analytics import AGAD_FIELDS
+from agad_matrix import AGADMatrix, phase_recommendations
+from monitor_rules import MonitorRules
+
+MAGIC = b"GQRF"
+FRAME_VERSION = 2   # 2: AGAD frames carry validation_report
+
+_LENGTH = struct.Struct("<I")
+_PREFIX = struct.Struct("<4sH")
+_ALIGN = 8
+
+# Small-integer enumerations (index = stored value)
+SEVERITY = ("NORMAL", "HIGH")
+OVERALL_STATUS = ("NORMAL", "CRITICAL")
+PHASE_STATUS = ("FAILED", "PASSED")
+TREND_DIRECTIONS = ("decreasing", "increasing")
+TREND_CODES = {name: code for code, name in enumerate(TREND_DIRECTIONS)}
+NO_CODE = 255   # trend or priority slot not available (no model / no full window)
+
+# Must match sustainability_ai_monitor.OPTIMIZATION_FACTORS
+OPTIMIZATION_FACTORS = ("material_substitution_factor", "circularity_improvement", "supply_risk_mitigation")
+
+# Fixed result layouts; the metric fields come first, in dataclass order
+CO2_RESULT = np.dtype([
+    ("absolute_co2_emissions", "<f8"),
+    ("co2_intensity", "<f8"),
+    ("well_to_wake_emissions", "<f8"),
+    ("co2_abatement_potential", "<f8"),
+    ("timestamp_utc", "<i8"),
+    ("within_limits", "u1"),
+    ("severity", "u1"),                    # SEVERITY
+    ("predicted_emissions_24h", "<f8"),    # NaN without a prediction
+    ("trend_direction", "u1"),             # TREND_DIRECTIONS or NO_CODE
+    ("confidence", "<f8"),
+    ("recommendations", "<u4"),            # co2_recommendations condition code
+    ("processing_timestamp", "<i8"),
+])
+RESOURCE_RESULT = np.dtype([
+    ("critical_material_intensity", "<f8"),
+    ("resource_circularity_indicator", "<f8"),
+    ("supply_chain_risk_index", "<f8"),
+    ("resource_efficiency_index", "<f8"),
+    ("timestamp_utc", "<i8"),
+    ("critical_indicators", "<u4"),        # resource rule condition code
+    ("overall_status", "u1"),              # OVERALL_STATUS
+    ("risk_score", "<f8"),
+    *((name, "<f8") for name in OPTIMIZATION_FACTORS),   # NaN without a model
+    ("implementation_priority", "u1", (len(OPTIMIZATION_FACTORS),)),   # factor indexes
+    ("processing_timestamp", "<i8"),
+])
+# The AGAD phase store's names and types, then the record fields it does not keep
+AGAD_RESULT = np.dtype([
+    *AGAD_FIELDS.items(),
+    ("validation_report", "<u4"),          # index into tables["text"]["validation_report"]
+    ("next_phase_readiness", "u1"),
+    ("processing_timestamp", "<i8"),
+])
+RESULT_DTYPES = {"co2": CO2_RESULT, "resource": RESOURCE_RESULT, "agad": AGAD_RESULT}
+
+# Free-text fields sent as codes into a per-frame table of distinct values;
+# compact rows hold the strings themselves (see ROW_DTYPES)
+TEXT_FIELDS = {"agad": ("validation_report",)}
+ROW_DTYPES = {kind: np.dtype([(name, "O" if name in TEXT_FIELDS.get(kind, ()) else dtype[name])
+                              for name in dtype.names])
+              for kind, dtype in RESULT_DTYPES.items()}
+
+
+class FrameFormatError(ValueError):
+    """Bytes that are not a result frame of a supported version"""
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % _ALIGN)
+
+
+def encode_frame(kind: str, columns: Mapping[str, np.ndarray],
+                 tables: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """Frame buffers for ``columns``: a header plus one memoryview per column.
+
+    Contiguous columns (ring buffer windows, batch result arrays) are not
+    copied; hand the list to ``writelines`` or ``socket.sendmsg`` as is.
+    """
+    arrays = [(name, np.ascontiguousarray(values)) for name, values in columns.items()]
+    rows = len(arrays[0][1]) if arrays else 0
+    fields = []
+    for name, array in arrays:
+        if len(array) != rows:
+            raise ValueError(f"column {name} has {len(array)} rows, expected {rows}")
+        fields.append([name, array.dtype.str, list(array.shape[1:])])
+    meta = json.dumps({"fields": fields, "tables": tables or {}},
+                      separators=(",", ":")).encode("utf-8")
+    kind_bytes = kind.encode("ascii")
+
+    header = (_PREFIX.pack(MAGIC, FRAME_VERSION) + struct.pack("<B", len(kind_bytes)) + kind_bytes
+              + struct.pack("<II", rows, len(meta)) + meta)
+    header += _padding(_LENGTH.size + len(header))
+    buffers: List[Any] = [None, header]
+    length = len(header)
+    for _, array in arrays:
+        if array.nbytes:
+            buffers.append(memoryview(array).cast("B"))
+        pad = _padding(array.nbytes)
+        if pad:
+            buffers.append(pad)
+        length += array.nbytes + len(pad)
+    buffers[0] = _LENGTH.pack(length)
+    return buffers
+
+
+def write_frame(out, kind: str, columns: Mapping[str, np.ndarray],
+                tables: Optional[Dict[str, Any]] = None) -> int:
+    """Write one frame to a binary file or a connected socket; returns its size"""
+    buffers = encode_frame(kind, columns, tables)
+    size = sum(len(b) if isinstance(b, bytes) else b.nbytes for b in buffers)
+    if isinstance(out, socket.socket):
+        # Scatter-gather straight from the column memory
+        while buffers:
+            sent = out.sendmsg(buffers)
+            while buffers and sent:
+                first = memoryview(buffers[0])
+                if sent >= first.nbytes:
+                    sent -= first.nbytes
+                    buffers.pop(0)
+                else:
+                    buffers[0] = first[sent:]
+                    sent = 0
+    else:
+        out.writelines(buffers)
+    return size
+
+
+class ResultFrame:
+    """One decoded frame; ``columns`` are zero-copy views of the frame bytes"""
+
+    def __init__(self, kind: str, columns: Dict[str, np.ndarray], tables: Dict[str, Any]):
+        self.kind = kind
+        self.columns = columns
+        self.tables = tables
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Rows in the monitor's per-sample result shape (for co2/resource/agad frames)"""
+        decode = _DECODERS.get(self.kind)
+        if decode is None:
+            names = list(self.columns)
+            return [dict(zip(names, row)) for row in zip(*(c.tolist() for c in self.columns.values()))]
+        return decode(self.columns, self.tables)
+
+
+def decode_frame(data, offset: int = 0) -> Tuple[ResultFrame, int]:
+    """Decode the frame at ``offset`` of ``data``; returns it and the next offset"""
+    (length,) = _LENGTH.unpack_from(data, offset)
+    start = offset + _LENGTH.size
+    end = start + length
+    if len(data) < end:
+        raise FrameFormatError("truncated result frame")
+    magic, version = _PREFIX.unpack_from(data, start)
+    if magic != MAGIC:
+        raise FrameFormatError("not a GAIA-Q result frame")
+    if version != FRAME_VERSION:
+        raise FrameFormatError(f"result frame version {version}, expected {FRAME_VERSION}")
+    pos = start + _PREFIX.size
+    (kind_len,) = struct.unpack_from("<B", data, pos)
+    pos += 1
+    kind = bytes(data[pos:pos + kind_len]).decode("ascii")
+    pos += kind_len
+    rows, meta_len = struct.unpack_from("<II", data, pos)
+    pos += 8
+    meta = json.loads(bytes(data[pos:pos + meta_len]).decode("utf-8"))
+    pos += meta_len
+    pos += -(pos - offset) % _ALIGN
+
+    columns = {}
+    for name, dtype, shape in meta["fields"]:
+        dtype = np.dtype(dtype)
+        count = rows * int(np.prod(shape, dtype=np.int64))
+        nbytes = count * dtype.itemsize
+        columns[name] = np.frombuffer(data, dtype=dtype, count=count, offset=pos).reshape(rows, *shape)
+        pos += nbytes + (-nbytes % _ALIGN)
+    if pos != end:
+        raise FrameFormatError(f"result frame length mismatch ({pos - start} != {length})")
+    return ResultFrame(kind, columns, meta["tables"]), end
+
+
+def iter_frames(data) -> Iterator[ResultFrame]:
+    """Every frame in a buffer (e.g. a whole results file)"""
+    offset = 0
+    while offset < len(data):
+        frame, offset = decode_frame(data, offset)
+        yield frame
+
+
+def read_frames(f) -> Iterator[ResultFrame]:
+    """Frames from a binary file or socket file object, one read per frame"""
+    while True:
+        prefix = f.read(_LENGTH.size)
+        if not prefix:
+            return
+        if len(prefix) < _LENGTH.size:
+            raise FrameFormatError("truncated result frame")
+        (length,) = _LENGTH.unpack(prefix)
+        body = f.read(length)
+        if len(body) < length:
+            raise FrameFormatError("truncated result frame")
+        yield decode_frame(prefix + body)[0]
+
+
+def read_result_file(path: str) -> List[ResultFrame]:
+    with open(path, "rb") as f:
+        data = f.read()
+    return list(iter_frames(data))
+
+
+# --- Decoding back to dicts ----------------------------------------------------
+
+def _decode_co2(columns: Dict[str, np.ndarray], tables: Dict[str, Any]) -> List[Dict[str, Any]]:
+    names = ("absolute_co2_emissions", "co2_intensity", "well_to_wake_emissions",
+             "co2_abatement_potential", "timestamp_utc")
+    recommendations = tables.get("recommendations", {})
+    limit, margin = tables.get("co2_limit"), tables.get("co2_margin_percentage")
+    results = []
+    for row in zip(*(columns[name].tolist() for name in CO2_RESULT.names)):
+        record = dict(zip(CO2_RESULT.names, row))
+        prediction = {"trend": 0.0, "confidence": record["confidence"]}   # no full window yet
+        if record["trend_direction"] != NO_CODE:
+            prediction = {"predicted_emissions_24h": record["predicted_emissions_24h"],
+                          "trend_direction": TREND_DIRECTIONS[record["trend_direction"]],
+                          "confidence": record["confidence"]}
+        code = record["recommendations"]
+        results.append({
+            "metrics": {name: record[name] for name in names},
+            "safety_status": {"within_limits": bool(record["within_limits"]),
+                              "current_value": record["absolute_co2_emissions"],
+                              "threshold": limit,
+                              "margin_percentage": margin,
+                              "severity": SEVERITY[record["severity"]]},
+            "prediction": prediction,
+            "recommendations": tuple(recommendations.get(str(code), (code,))),
+            "processing_timestamp": record["processing_timestamp"],
+        })
+    return results
+
+
+def _decode_resource(columns: Dict[str, np.ndarray], tables: Dict[str, Any]) -> List[Dict[str, Any]]:
+    names = ("critical_material_intensity", "resource_circularity_indicator",
+             "supply_chain_risk_index", "resource_efficiency_index", "timestamp_utc")
+    indicators = tables.get("critical_indicators", [])
+    multipliers = tables.get("improvement_multipliers", {})
+    results = []
+    for row in zip(*(columns[name].tolist() for name in RESOURCE_RESULT.names)):
+        record = dict(zip(RESOURCE_RESULT.names, row))
+        code = record["critical_indicators"]
+        factors = {name: record[name] for name in OPTIMIZATION_FACTORS}
+        if any(value != value for value in factors.values()):   # NaN: no model
+            optimization = {"status": "model_not_available"}
+        else:
+            total = sum(factors.values())
+            optimization = {
+                "optimization_factors": factors,
+                "estimated_improvement": {name: total * m for name, m in multipliers.items()},
+                "implementation_priority": tuple(OPTIMIZATION_FACTORS[i]
+                                                 for i in record["implementation_priority"]),
+            }
+        results.append({
+            "metrics": {name: record[name] for name in names},
+            "criticality_status": {
+                "critical_indicators": tuple(name for bit, name in enumerate(indicators)
+                                             if code >> bit & 1),
+                "overall_status": OVERALL_STATUS[record["overall_status"]],
+                "risk_score": record["risk_score"],
+            },
+            "optimization": optimization,
+            "processing_timestamp": record["processing_timestamp"],
+        })
+    return results
+
+
+def _intern(values) -> Tuple[np.ndarray, List[str]]:
+    """Codes into the list of distinct ``values`` (in first-seen order)"""
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    index: Dict[str, int] = {}
+    codes = np.fromiter((index.setdefault(v.decode("utf-8", errors="replace") if isinstance(v, bytes) else v,
+                                          len(index)) for v in values),
+                        dtype=np.uint32, count=len(values))
+    return codes, list(index)
+
+
+def _phase_key(phase_id: bytes, trl: int, valid: int) -> str:
+    return f"{phase_id.decode('utf-8', errors='replace')}|{trl}|{valid}"
+
+
+def _decode_agad(columns: Dict[str, np.ndarray], tables: Dict[str, Any]) -> List[Dict[str, Any]]:
+    phases = tables.get("phases", {})
+    reports = tables.get("text", {}).get("validation_report", [])
+    results = []
+    for row in zip(*(columns[name].tolist() for name in AGAD_RESULT.names)):
+        record = dict(zip(AGAD_RESULT.names, row))
+        coverage = record["coverage_percentage"]
+        valid = record["method_valid"]
+        phase = phases.get(_phase_key(record["phase_id"], record["trl_level"], valid), {})
+        results.append({
+            "phase_data": {
+                "phase_id": record["phase_id"].decode("utf-8", errors="replace"),
+                "trl_level": record["trl_level"],
+                "verification_method": record["verification_method"].decode("utf-8", errors="replace"),
+                "validation_report": reports[record["validation_report"]],
+                "passed": bool(record["passed"]),
+                "coverage_percentage": None if coverage != coverage else coverage,
+                "timestamp_utc": record["timestamp_utc"],
+            },
+            "progression_analysis": {
+                "phase_completion_status": PHASE_STATUS[record["passed"]],
+                "trl_advancement": record["trl_level"],
+                "verification_completeness": 0.0 if coverage != coverage else coverage,
+                "next_phase_readiness": bool(record["next_phase_readiness"]),
+                "phase_name": phase.get("phase_name"),
+                "expected_verification_methods": phase.get("expected_verification_methods", []),
+                "verification_method_valid": None if valid < 0 else bool(valid),
+            },
+            "recommendations": tuple(phase.get("recommendations", ())),
+            "processing_timestamp": record["processing_timestamp"],
+        })
+    return results
+
+
+_DECODERS = {"co2": _decode_co2, "resource": _decode_resource, "agad": _decode_agad}
+
+
+# --- Writer --------------------------------------------------------------------
+
+class ResultWriter:
+    """Pipeline sink that writes monitor results as columnar frames.
+
+    Per-sample results arrive as compact rows (``process_*(compact=True)``)
+    and are collected in a preallocated structured array per stream, one
+    frame per ``frame_rows`` rows. Batch results are written straight from
+    their column arrays, after any rows already pending for that stream.
+    """
+
+    compact = True   # asks TelemetryPipeline for compact per-sample rows
+
+    def __init__(self, out, rules: Optional[MonitorRules] = None, frame_rows: int = 1024,
+                 close_out: bool = False, matrix: Optional[AGADMatrix] = None):
+        self.out = out
+        self.rules = rules or MonitorRules()
+        self.matrix = matrix   # AGAD matrix behind the phase tables (None: no matrix)
+        self.frame_rows = max(1, frame_rows)
+        self.close_out = close_out
+        self.frames = 0
+        self.bytes_written = 0
+        self._rows = {kind: np.zeros(self.frame_rows, dtype=dtype) for kind, dtype in ROW_DTYPES.items()}
+        self._pending = dict.fromkeys(RESULT_DTYPES, 0)
+
+    def __call__(self, kind: str, result) -> None:
+        if kind.endswith("_batch"):
+            self.write_batch(kind[:-len("_batch")], result)
+        elif isinstance(result, tuple):
+            self.write_row(kind, result)
+        else:
+            raise TypeError(f"{kind}: per-sample results must be compact rows (process_*(compact=True))")
+
+    def write_row(self, kind: str, row: tuple) -> None:
+        pending = self._pending[kind]
+        self._rows[kind][pending] = row
+        self._pending[kind] = pending + 1
+        if pending + 1 == self.frame_rows:
+            self.flush(kind)
+
+    def write_batch(self, kind: str, result: Dict[str, Any]) -> None:
+        self.flush(kind)
+        self._write(kind, _BATCH_COLUMNS[kind](result, self.rules))
+
+    def flush(self, kind: Optional[str] = None) -> None:
+        for name in ((kind,) if kind else RESULT_DTYPES):
+            pending = self._pending[name]
+            if pending:
+                rows = self._rows[name][:pending]
+                self._write(name, {field: rows[field] for field in rows.dtype.names})
+                self._pending[name] = 0
+        if hasattr(self.out, "flush"):
+            self.out.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.close_out:
+            self.out.close()
+
+    def tables(self, kind: str, columns: Mapping[str, np.ndarray]) -> Dict[str, Any]:
+        """Decoding tables for the codes present in ``columns``"""
+        rules = self.rules
+        if kind == "co2":
+            table = rules.co2_recommendations
+            return {"recommendations": {str(code): list(table.results(code))
+                                        for code in np.unique(columns["recommendations"]).tolist()},
+                    "co2_limit": rules.co2_limit,
+                    "co2_margin_percentage": rules.co2_margin * 100}
+        if kind == "resource":
+            return {"critical_indicators": [rule.name for rule in rules.resource.rules],
+                    "improvement_multipliers": dict(rules.improvement_multipliers)}
+        if kind == "agad":
+            phases = {}
+            for phase_id, trl, valid in zip(columns["phase_id"].tolist(), columns["trl_level"].tolist(),
+                                            columns["method_valid"].tolist()):
+                key = _phase_key(phase_id, trl, valid)
+                if key in phases:
+                    continue
+                entry = (self.matrix.lookup(phase_id.decode("utf-8", errors="replace"), trl)
+                         if self.matrix is not None else None)
+                phases[key] = {
+                    "phase_name": entry.phase_name if entry else None,
+                    "expected_verification_methods": list(entry.verification_methods) if entry else [],
+                    "recommendations": list(phase_recommendations(
+                        trl, entry, None if valid < 0 else bool(valid))),
+                }
+            return {"phases": phases}
+        return {}
+
+    def _write(self, kind: str, columns: Dict[str, np.ndarray]) -> None:
+        dtype = RESULT_DTYPES[kind]
+        columns, text = dict(columns), {}
+        for name in TEXT_FIELDS.get(kind, ()):
+            columns[name], text[name] = _intern(columns[name])
+        typed = {name: np.asarray(columns[name], dtype=dtype[name].base) for name in dtype.names}
+        tables = self.tables(kind, typed)
+        if text:
+            tables["text"] = text
+        self.bytes_written += write_frame(self.out, kind, typed, tables)
+        self.frames += 1
+
+
+def _now(count: int, result: Dict[str, Any]) -> np.ndarray:
+    return np.full(count, result["processing_timestamp"], dtype=np.int64)
+
+
+def _co2_batch_columns(result: Dict[str, Any], rules: MonitorRules) -> Dict[str, np.ndarray]:
+    metrics, prediction = result["metrics"], result["prediction"]
+    predicted = prediction["predicted_emissions_24h"]
+    increasing = (prediction["trend_direction"] == "increasing").view(np.uint8)
+    return {
+        **metrics,
+        "within_limits": result["safety_status"]["within_limits"].view(np.uint8),
+        "severity": (result["safety_status"]["severity"] == "HIGH").view(np.uint8),
+        "predicted_emissions_24h": predicted,
+        "trend_direction": np.where(np.isnan(predicted), NO_CODE, increasing),
+        "confidence": prediction["confidence"],
+        "recommendations": rules.co2_recommendations.codes(
+            {**metrics, "trend_direction": prediction["trend_direction"]}),
+        "processing_timestamp": _now(result["count"], result),
+    }
+
+
+def _resource_batch_columns(result: Dict[str, Any], rules: MonitorRules) -> Dict[str, np.ndarray]:
+    metrics, status, optimization = result["metrics"], result["criticality_status"], result["optimization"]
+    count = result["count"]
+    if "optimization_factors" in optimization:
+        factors = optimization["optimization_factors"]
+        matrix = np.column_stack([factors[name] for name in OPTIMIZATION_FACTORS])
+        priority = np.argsort(-matrix, axis=1, kind="stable")
+    else:
+        factors = {name: np.full(count, np.nan) for name in OPTIMIZATION_FACTORS}
+        priority = np.full((count, len(OPTIMIZATION_FACTORS)), NO_CODE)
+    return {
+        **metrics,
+        "critical_indicators": rules.resource.codes(metrics, status["critical_indicators"]),
+        "overall_status": (status["overall_status"] == "CRITICAL").view(np.uint8),
+        "risk_score": status["risk_score"],
+        **factors,
+        "implementation_priority": priority,
+        "processing_timestamp": _now(count, result),
+    }
+
+
+def _agad_batch_columns(result: Dict[str, Any], rules: MonitorRules) -> Dict[str, np.ndarray]:
+    progression = result["progression_analysis"]
+    return {
+        **result["phase_data"],
+        "method_valid": progression["verification_method_valid"],
+        "next_phase_readiness": progression["next_phase_readiness"].view(np.uint8),
+        "processing_timestamp": _now(result["count"], result),
+    }
+
+
+_BATCH_COLUMNS = {"co2": _co2_batch_columns, "resource": _resource_batch_columns,
+                  "agad": _agad_batch_columns}
+
+
+def open_result_sink(spec: str, rules: Optional[MonitorRules] = None,
+                     matrix: Optional[AGADMatrix] = None, frame_rows: int = 1024) -> ResultWriter:
+    """Writer for ``-`` (stdout), ``unix:<path>`` (connect) or a file path (append).
+
+    With ``-`` the caller must keep any other output off stdout.
+    """
+    if spec == "-":
+        return ResultWriter(sys.stdout.buffer, rules, frame_rows, matrix=matrix)
+    if spec.startswith("unix:"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(spec[len("unix:"):])
+        return ResultWriter(sock, rules, frame_rows, close_out=True, matrix=matrix)
+    return ResultWriter(open(spec, "ab"), rules, frame_rows, close_out=True, matrix=matrix)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Decode GAIA-Q result frames to JSON lines")
+    parser.add_argument("path", help="result file, or '-' for stdin")
+    parser.add_argument("--summary", action="store_true", help="one line per frame instead of per row")
+    args = parser.parse_args(argv)
+
+    f = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    with f:
+        for frame in read_frames(f):
+            if args.summary:
+                print(json.dumps({"kind": frame.kind, "rows": len(frame), "fields": list(frame.columns)}))
+                continue
+            for row in frame.to_dicts():
+                print(json.dumps({"type": frame.kind, **row}, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,37 @@ GAIA-Q Sustainability AI Monitor
 Real-time GA-SToP-CO2 metrics processing and AI-driven optimization
 """
 
+from __future__ import annotations
+
 import asyncio
 import json
+import sys
 import time
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import logging
 
+from lazy_import import lazy_import
+from monitor_instrumentation import MetricsRegistry, create_exporter
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# numpy and the numeric helper modules are imported on first use, so importing
+# this module (for the metric dataclasses, the CLI or a health check) stays cheap
+np = lazy_import("numpy", globals(), "np")
+agad_analytics = lazy_import("agad_analytics", globals())
+agad_matrix = lazy_import("agad_matrix", globals())
+metric_ring_buffer = lazy_import("metric_ring_buffer", globals())
+monitor_rules = lazy_import("monitor_rules", globals())
+monitor_scheduler = lazy_import("monitor_scheduler", globals())
+monitor_snapshot = lazy_import("monitor_snapshot", globals())
+offload_policy = lazy_import("offload_policy", globals())
+online_trainer = lazy_import("online_trainer", globals())
+prediction_engine = lazy_import("prediction_engine", globals())
+result_codec = lazy_import("result_codec", globals())
+windowed_aggregates = lazy_import("windowed_aggregates", globals())
+
 @dataclass
 class CO2Metrics:
     """GA-SToP-CO2 Core Metrics"""
@@ -42,28 +64,155 @@ class AGADPhaseData:
     coverage_percentage: Optional[float]
     timestamp_utc: int
 
+# Ordered optimization factor names (index order used by the batch priority matrix)
+OPTIMIZATION_FACTORS = ("material_substitution_factor", "circularity_improvement", "supply_risk_mitigation")
+
+_NAN = float("nan")
+
+# Marks the AGAD matrix as not loaded yet (None means the table is unavailable)
+_NOT_LOADED = object()
+
+class SimpleOptimizationModel:
+    """Rule-of-thumb resource allocation factors (stateless, shared by all monitors)"""
+    
+    def optimize_resource_allocation(self, 
+                                   current_metrics: ResourceMetrics,
+                                   constraints: Dict) -> Dict[str, float]:
+        """Optimize resource allocation based on current metrics"""
+        # Simplified optimization algorithm
+        optimization_factors = {
+            "material_substitution_factor": max(0.1, 
+                1.0 - current_metrics.critical_material_intensity),
+            "circularity_improvement": min(0.3,
+                (1.0 - current_metrics.resource_circularity_indicator) * 0.5),
+            "supply_risk_mitigation": max(0.0,
+                current_metrics.supply_chain_risk_index / 100.0 * 0.2)
+        }
+        
+        return optimization_factors
+    
+    def optimize_resource_allocation_batch(self,
+                                           columns: Dict[str, np.ndarray],
+                                           constraints: Dict) -> Dict[str, np.ndarray]:
+        """Vectorized optimize_resource_allocation over metric columns"""
+        return {
+            "material_substitution_factor": np.maximum(0.1,
+                1.0 - columns["critical_material_intensity"]),
+            "circularity_improvement": np.minimum(0.3,
+                (1.0 - columns["resource_circularity_indicator"]) * 0.5),
+            "supply_risk_mitigation": np.maximum(0.0,
+                columns["supply_chain_risk_index"] / 100.0 * 0.2)
+        }
+
+def _to_columns(samples, fields: Tuple[str, ...]) -> Dict[str, np.ndarray]:
+    """Convert a batch of metric samples into per-field column arrays.
+    
+    Accepts a sequence of metric dataclasses, a structured NumPy array with
+    matching field names, or a mapping of field name to array.
+    """
+    if isinstance(samples, np.ndarray):
+        if samples.dtype.names is None:
+            raise TypeError("Batch arrays must be structured with named metric fields")
+        return {name: np.asarray(samples[name]) for name in fields}
+    if isinstance(samples, dict):
+        return {name: np.asarray(samples[name]) for name in fields}
+    return {
+        name: np.fromiter((getattr(sample, name) for sample in samples),
+                          dtype=np.int64 if name == "timestamp_utc" else np.float64,
+                          count=len(samples))
+        for name in fields
+    }
+
+def _record_dict(record) -> Dict:
+    """Shallow field dict of a flat metric dataclass (what asdict returns, without the deep copy)"""
+    return dict(record.__dict__)
+
 class SustainabilityAIMonitor:
     """Real-time sustainability monitoring with AI optimization"""
     
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json",
+                 config: Optional[Dict] = None,
+                 executor: Optional[Executor] = None,
+                 prediction_batcher: Optional[prediction_engine.MicroBatcher] = None):
         self.logger = logging.getLogger(__name__)
-        self.config = self._load_config(config_path)
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # A preloaded config, a shared executor and a shared prediction batcher
+        # let many per-asset monitors live in one process without re-reading
+        # config or spawning threads each, and batch their predictions together
+        self.config = config if config is not None else self._load_config(config_path)
+        # Created on first use unless shared (see the executor property)
+        self._executor = executor
+        
+        # Hot-path instrumentation (stage latency, counters, gauges)
+        instrumentation = self.config.get("instrumentation", {})
+        self.metrics = MetricsRegistry(sample_rate=instrumentation.get("sample_rate", 1.0),
+                                       enabled=instrumentation.get("enabled", True))
         
-        # AI model for predictive analytics
+        # AI model for predictive analytics (see initialize_ai_models)
         self.prediction_model = None
         self.optimization_model = None
+        self._models_task: Optional[asyncio.Future] = None
+        self._lazy_models = False
+        # Snapshotted model weights restored before the models were built
+        self._model_state: Optional[Dict[str, np.ndarray]] = None
+        # Model calls run inline while cheap and in a pool once measured heavy
+        # (config "offload"); decisions are exported as offload_* metrics
+        self.offload = offload_policy.OffloadPolicy(self.config.get("offload"), self.metrics,
+                                                    lambda: self.executor)
+        # Concurrent single-window predictions share one batched model call
+        self.prediction_batcher = prediction_batcher or prediction_engine.MicroBatcher(
+            executor=executor, metrics=self.metrics, runner=self._run_batched)
+        # ... and so do per-sample optimizations once they are offloaded
+        self.optimization_batcher = offload_policy.Coalescer(
+            self.offload, "optimize_resource_usage_coalesced", self._optimize_records,
+            item_stage="optimize_resource_usage")
+        # Prediction errors are measured once the horizon elapses and the model
+        # is trained on them in the executor (config "training")
+        self.trainer = online_trainer.OnlineTrainer.from_config(
+            self.config, lambda: self.prediction_model, lambda: self.executor, self.metrics)
+        
+        # Real-time data buffers (fixed-capacity columnar ring buffers)
+        buffer_capacity = int(self.config.get("buffer_capacity", 1000))
+        ring_buffer = metric_ring_buffer.ColumnarRingBuffer
+        self.co2_buffer = ring_buffer.for_dataclass(CO2Metrics, buffer_capacity)
+        self.resource_buffer = ring_buffer.for_dataclass(ResourceMetrics, buffer_capacity)
+        
+        # Incremental rolling aggregates over the prediction/optimization windows
+        aggregator = windowed_aggregates.StreamAggregator
+        windows = aggregator.hours_windows(
+            prediction=self.config.get("prediction_horizon_hours", 24),
+            optimization=self.config.get("optimization_window_hours", 4))
+        self.co2_aggregates = aggregator(self.co2_buffer.fields, windows)
+        self.resource_aggregates = aggregator(self.resource_buffer.fields, windows)
+        
+        # AGAD phase x TRL verification matrix, loaded on first use (see agad_matrix)
+        self._agad_matrix = _NOT_LOADED
+        
+        self._register_metrics()
+        
+        # Periodic state snapshots (see start_snapshots)
+        self._snapshot_task: Optional[asyncio.Task] = None
+        
+        # Optional durable columnar telemetry store
+        self.store = None
+        store_config = dict(self.config.get("telemetry_store") or {})
+        if store_config.get("path"):
+            from telemetry_store import TelemetryStore
+            self.store = TelemetryStore(
+                store_config.pop("path"),
+                {"co2": CO2Metrics, "resource": ResourceMetrics, "agad": AGADPhaseData},
+                **store_config)
         
-        # Real-time data buffers
-        self.co2_buffer: List[CO2Metrics] = []
-        self.resource_buffer: List[ResourceMetrics] = []
-        self.agad_buffer: List[AGADPhaseData] = []
+        # Bounded columnar AGAD phase records; older history spills to the store
+        self.agad_store = agad_analytics.AGADPhaseStore(int(self.config.get("agad_capacity", 10000)),
+                                         spill=self.store["agad"] if self.store else None)
         
-        # Safety thresholds
-        self.co2_threshold = 50.0  # tCO2 max
-        self.criticality_threshold = 0.8  # 80% max criticality
+        # Safety thresholds, risk weights and recommendation rules (config "rules")
+        self.rules = monitor_rules.MonitorRules(self.config)
+        self.co2_threshold = self.rules.co2_threshold
+        self.criticality_threshold = self.rules.criticality_threshold
         
-    def _load_config(self, path: str) -> Dict:
+    @staticmethod
+    def _load_config(path: str) -> Dict:
         """Load configuration with safety defaults"""
         try:
             with open(path, 'r') as f:
@@ -71,6 +220,8 @@ class SustainabilityAIMonitor:
         except FileNotFoundError:
             return {
                 "monitoring_interval_ms": 100,
+                "buffer_capacity": 1000,
+                "agad_capacity": 10000,
                 "prediction_horizon_hours": 24,
                 "optimization_window_hours": 4,
                 "safety_margins": {
@@ -79,15 +230,207 @@ class SustainabilityAIMonitor:
                 }
             }
     
-    async def initialize_ai_models(self) -> bool:
-        """Initialize AI models for sustainability optimization"""
+    @property
+    def executor(self) -> Executor:
+        """Executor for model calls and snapshot I/O, started on first use"""
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=4)
+        return self._executor
+    
+    @property
+    def agad_matrix(self):
+        """AGAD phase x TRL verification matrix (None if the table is unavailable)"""
+        if self._agad_matrix is _NOT_LOADED:
+            self._agad_matrix = self._load_agad_matrix()
+        return self._agad_matrix
+    
+    def _load_agad_matrix(self):
+        """Load the AGAD TRL/V&V matrix named by config (shared per process)"""
+        path = self.config.get("agad_matrix", agad_matrix.DEFAULT_TABLE)
         try:
-            # Initialize prediction model (simplified neural network)
-            self.prediction_model = await self._create_prediction_model()
-            
-            # Initialize optimization model
-            self.optimization_model = await self._create_optimization_model()
-            
+            return agad_matrix.load_matrix(path)
+        except OSError as e:
+            self.logger.warning(f"AGAD matrix unavailable ({e}); verification checks disabled")
+            return None
+    
+    def _register_metrics(self) -> None:
+        """Declare metric help text; gauges are read lazily at export time"""
+        self.metrics.counter("processed_total", "Samples processed", stream="co2")
+        self.metrics.counter("threshold_breach_total", "Samples breaching safety thresholds",
+                             kind="co2_high")
+        for queue in ("parse", "validate", "process"):   # telemetry_pipeline stage queues
+            self.metrics.counter("dropped_total", "Telemetry items dropped by pipeline queues",
+                                 queue=queue)
+        self.metrics.counter("agad_unexpected_verification_total",
+                             "AGAD samples whose verification method is not in the matrix")
+        for stream, buffer in (("co2", self.co2_buffer), ("resource", self.resource_buffer)):
+            self.metrics.gauge("buffer_fill_ratio", "Ring buffer fill level",
+                               callback=lambda b=buffer: len(b) / b.capacity, stream=stream)
+        self.metrics.gauge("executor_backlog", "Executor calls queued or running",
+                           callback=self.metrics.executor_backlog)
+    
+    def start_metrics_exporter(self) -> Optional[asyncio.Task]:
+        """Start the exporter configured under ``instrumentation.exporter``"""
+        instrumentation = self.config.get("instrumentation", {})
+        if not self.metrics.enabled or "exporter" not in instrumentation:
+            return None
+        exporter = create_exporter(self.metrics, instrumentation)
+        return asyncio.ensure_future(exporter.run())
+    
+    def warm_start_from_store(self) -> Dict[str, int]:
+        """Refill ring buffers and aggregates from the newest stored telemetry"""
+        if not self.store:
+            return {}
+        loaded = {}
+        for stream, buffer, aggregates in (
+                ("co2", self.co2_buffer, self.co2_aggregates),
+                ("resource", self.resource_buffer, self.resource_aggregates)):
+            columns = self.store[stream].tail(buffer.capacity, buffer.fields)
+            buffer.extend(columns)
+            aggregates.update_columns(columns)
+            loaded[stream] = len(columns["timestamp_utc"])
+        columns = self.store["agad"].tail(self.agad_store.capacity, agad_analytics.RECORD_FIELDS)
+        self.agad_store.extend(columns, agad_analytics.method_validity(self.agad_matrix, columns),
+                               spill=False)
+        loaded["agad"] = len(columns["timestamp_utc"])
+        self.logger.info(f"Warm-started buffers from telemetry store: {loaded}")
+        return loaded
+    
+    def close(self) -> None:
+        """Flush pending telemetry and stop the executors"""
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+        if self.store:
+            self.store.flush()
+        if self.trainer is not None:
+            self.trainer.close()
+        self.offload.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+    
+    def _snapshot_sections(self) -> Dict[str, np.ndarray]:
+        """Copy buffers, model weights, trainer and aggregate state (runs on the event loop)"""
+        sections = {"meta": monitor_snapshot.encode_json({
+            "co2_fields": list(self.co2_buffer.fields),
+            "resource_fields": list(self.resource_buffer.fields),
+            "windows": self.co2_aggregates.windows,
+            "created_utc": int(time.time())
+        })}
+        for name, buffer in (("co2_buffer", self.co2_buffer), ("resource_buffer", self.resource_buffer)):
+            for field, column in buffer.window().items():
+                sections[f"{name}/{field}"] = column.copy()
+        for name, aggregates in (("co2_aggregates", self.co2_aggregates),
+                                 ("resource_aggregates", self.resource_aggregates)):
+            for key, array in aggregates.get_state().items():
+                sections[f"{name}/{key}"] = array
+        if self.prediction_model is not None and hasattr(self.prediction_model, "get_state"):
+            for key, array in self.prediction_model.get_state().items():
+                sections[f"prediction_model/{key}"] = array
+        if self.trainer is not None:
+            for key, array in self.trainer.get_state().items():
+                sections[f"trainer/{key}"] = array
+        return sections
+    
+    async def save_snapshot(self, path: Optional[str] = None) -> int:
+        """Snapshot monitor state; only the in-memory copy happens on the event loop"""
+        path = path or self.config.get("snapshot", {}).get("path", "monitor.snapshot")
+        sections = self._snapshot_sections()
+        size = await self.offload.run("save_snapshot", monitor_snapshot.write_snapshot, path, sections)
+        self.logger.debug(f"Wrote {size} byte snapshot to {path}")
+        return size
+    
+    def restore_snapshot(self, path: Optional[str] = None) -> bool:
+        """Restore buffers, aggregates, model weights and trainer state from a snapshot file.
+        
+        Returns False (leaving the monitor cold) when the file is missing,
+        truncated or corrupt, from another format version or for a
+        different metric layout.
+        """
+        path = path or self.config.get("snapshot", {}).get("path", "monitor.snapshot")
+        try:
+            sections = monitor_snapshot.read_snapshot(path, required=("meta",))
+            meta = monitor_snapshot.decode_json(sections["meta"])
+            co2_fields, resource_fields, windows = (meta["co2_fields"], meta["resource_fields"],
+                                                    meta["windows"])
+        except FileNotFoundError:
+            return False
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Ignoring snapshot {path}: {e}")
+            return False
+        
+        if (co2_fields != list(self.co2_buffer.fields) or
+                resource_fields != list(self.resource_buffer.fields)):
+            self.logger.warning(f"Ignoring snapshot {path}: metric layout changed")
+            return False
+        
+        def prefixed(prefix: str) -> Dict[str, np.ndarray]:
+            return {key[len(prefix):]: value for key, value in sections.items()
+                    if key.startswith(prefix)}
+        
+        self.co2_buffer.clear()
+        self.co2_buffer.extend(prefixed("co2_buffer/"))
+        self.resource_buffer.clear()
+        self.resource_buffer.extend(prefixed("resource_buffer/"))
+        if windows == self.co2_aggregates.windows:
+            self.co2_aggregates.set_state(prefixed("co2_aggregates/"))
+            self.resource_aggregates.set_state(prefixed("resource_aggregates/"))
+        model_state = prefixed("prediction_model/")
+        if model_state and self.prediction_model is None:
+            # Models not built yet (lazy_models): applied by _build_models
+            self._model_state = model_state
+        elif model_state:
+            self._set_model_state(model_state)
+        trainer_state = prefixed("trainer/")
+        if trainer_state and self.trainer is not None:
+            try:
+                self.trainer.set_state(trainer_state)
+            except (KeyError, ValueError) as e:
+                self.logger.warning(f"Trainer state not restored: {e}")
+        
+        self.logger.info(f"Restored monitor snapshot from {path} "
+                         f"({len(self.co2_buffer)} CO2, {len(self.resource_buffer)} resource samples)")
+        return True
+    
+    def _set_model_state(self, state: Dict[str, np.ndarray]) -> None:
+        if not hasattr(self.prediction_model, "set_state"):
+            self.logger.warning("Prediction model state not restored: model has no set_state")
+            return
+        try:
+            self.prediction_model.set_state(state)
+        except ValueError as e:
+            self.logger.warning(f"Prediction model state not restored: {e}")
+    
+    def start_snapshots(self, interval_s: Optional[float] = None) -> asyncio.Task:
+        """Write a snapshot every ``interval_s`` seconds in the background"""
+        interval_s = interval_s or self.config.get("snapshot", {}).get("interval_s", 60.0)
+        
+        async def snapshot_loop():
+            while True:
+                await asyncio.sleep(interval_s)
+                try:
+                    await self.save_snapshot()
+                except Exception as e:
+                    self.logger.error(f"Snapshot failed: {e}")
+        
+        self._snapshot_task = asyncio.ensure_future(snapshot_loop())
+        return self._snapshot_task
+    
+    async def initialize_ai_models(self, lazy: Optional[bool] = None) -> bool:
+        """Initialize AI models for sustainability optimization.
+        
+        Both models are built concurrently. With ``lazy`` (default: config
+        ``lazy_models``) construction is deferred to the first sample that
+        needs a model, which keeps short-lived jobs and health checks fast.
+        """
+        if lazy is None:
+            lazy = self.config.get("lazy_models", False)
+        if lazy:
+            self._models_task = None   # built by _ensure_models on first use
+            self._lazy_models = True
+            return True
+        try:
+            await self._build_models()
             self.logger.info("AI models initialized successfully")
             return True
             
@@ -95,205 +438,424 @@ class SustainabilityAIMonitor:
             self.logger.error(f"Failed to initialize AI models: {e}")
             return False
     
+    async def _build_models(self) -> None:
+        self.prediction_model, self.optimization_model = await asyncio.gather(
+            self._create_prediction_model(), self._create_optimization_model())
+        self._lazy_models = False
+        if self._model_state is not None:
+            state, self._model_state = self._model_state, None
+            self._set_model_state(state)
+    
+    async def _ensure_models(self) -> None:
+        """Build lazily initialized models once; concurrent callers share the build"""
+        if self._models_task is None:
+            self._models_task = asyncio.ensure_future(self._build_models())
+        try:
+            await self._models_task
+        except Exception as e:
+            self._lazy_models = False   # do not retry on every sample
+            self.logger.error(f"Failed to initialize AI models: {e}")
+    
     async def _create_prediction_model(self):
         """Create predictive model for CO2 and resource trends"""
-        # Simplified neural network for demonstration
-        # In production, this would be a sophisticated ML model
-        class SimplePredictionModel:
-            def __init__(self):
-                # Initialize with random weights (simplified)
-                self.weights = np.random.randn(10, 5)
-                self.bias = np.random.randn(5)
-                
-            def predict(self, input_data: np.ndarray) -> np.ndarray:
-                # Simple linear transformation
-                return np.dot(input_data, self.weights) + self.bias
-                
-            def update_weights(self, error: float):
-                # Simple gradient descent (simplified)
-                learning_rate = 0.001
-                self.weights *= (1.0 - learning_rate * error)
-        
-        return SimplePredictionModel()
+        # Simplified linear model for demonstration; any object implementing
+        # prediction_engine.PredictionModel can be swapped in
+        return prediction_engine.SimplePredictionModel()
     
     async def _create_optimization_model(self):
         """Create optimization model for resource allocation"""
-        class SimpleOptimizationModel:
-            def optimize_resource_allocation(self, 
-                                           current_metrics: ResourceMetrics,
-                                           constraints: Dict) -> Dict[str, float]:
-                """Optimize resource allocation based on current metrics"""
-                # Simplified optimization algorithm
-                optimization_factors = {
-                    "material_substitution_factor": max(0.1, 
-                        1.0 - current_metrics.critical_material_intensity),
-                    "circularity_improvement": min(0.3,
-                        (1.0 - current_metrics.resource_circularity_indicator) * 0.5),
-                    "supply_risk_mitigation": max(0.0,
-                        current_metrics.supply_chain_risk_index / 100.0 * 0.2)
-                }
-                
-                return optimization_factors
-        
         return SimpleOptimizationModel()
     
-    async def process_co2_metrics(self, metrics: CO2Metrics) -> Dict[str, any]:
-        """Process CO2 metrics with AI analysis"""
-        # Add to buffer
+    async def process_co2_metrics(self, metrics: CO2Metrics, compact: bool = False):
+        """Process CO2 metrics with AI analysis.
+        
+        With ``compact`` the result is a plain tuple laid out as
+        result_codec.CO2_RESULT instead of nested dicts (see ResultWriter).
+        """
+        # Add to buffer (oldest sample is overwritten once full)
         self.co2_buffer.append(metrics)
-        if len(self.co2_buffer) > 1000:  # Keep only recent data
-            self.co2_buffer.pop(0)
+        self.co2_aggregates.update(metrics)
+        if self.store:
+            self.store.append("co2", metrics)
+        if self.trainer is not None:
+            self.trainer.observe(metrics.timestamp_utc, metrics.absolute_co2_emissions)
         
         # Check safety thresholds
-        safety_status = self._check_co2_safety(metrics)
+        high = metrics.absolute_co2_emissions > self.rules.co2_threshold
+        self.metrics.inc("processed_total", stream="co2")
+        if high:
+            self.metrics.inc("threshold_breach_total", kind="co2_high")
         
         # AI prediction
-        prediction = await self._predict_co2_trend(metrics)
+        with self.metrics.time_stage("predict_co2_trend"):
+            prediction = await self._predict_co2_trend(metrics)
+        
+        if compact:
+            return self._co2_result_row(metrics, prediction)
+        
+        safety_status = self._check_co2_safety(metrics)
         
         # Generate recommendations
         recommendations = await self._generate_co2_recommendations(metrics, prediction)
         
+        with self.metrics.time_stage("serialize"):
+            metrics_dict = _record_dict(metrics)
+        
         return {
-            "metrics": asdict(metrics),
+            "metrics": metrics_dict,
             "safety_status": safety_status,
             "prediction": prediction,
             "recommendations": recommendations,
             "processing_timestamp": int(time.time())
         }
     
-    async def process_resource_metrics(self, metrics: ResourceMetrics) -> Dict[str, any]:
-        """Process resource criticality metrics with AI optimization"""
+    async def process_resource_metrics(self, metrics: ResourceMetrics, compact: bool = False):
+        """Process resource criticality metrics with AI optimization.
+        
+        With ``compact`` the result is a plain tuple laid out as
+        result_codec.RESOURCE_RESULT instead of nested dicts.
+        """
         # Add to buffer
         self.resource_buffer.append(metrics)
-        if len(self.resource_buffer) > 1000:
-            self.resource_buffer.pop(0)
+        self.resource_aggregates.update(metrics)
+        if self.store:
+            self.store.append("resource", metrics)
         
         # Check criticality thresholds
-        criticality_status = self._check_resource_criticality(metrics)
+        code = self.rules.resource.code(metrics)
+        self.metrics.inc("processed_total", stream="resource")
+        if code:
+            self.metrics.inc("threshold_breach_total", kind="resource_critical")
         
         # AI optimization
-        optimization = await self._optimize_resource_usage(metrics)
+        with self.metrics.time_stage("optimize_resource_usage"):
+            factors = await self._optimization_factors(metrics)
+        
+        if compact:
+            return self._resource_result_row(metrics, code, factors)
+        
+        with self.metrics.time_stage("serialize"):
+            metrics_dict = _record_dict(metrics)
         
         return {
-            "metrics": asdict(metrics),
-            "criticality_status": criticality_status,
-            "optimization": optimization,
+            "metrics": metrics_dict,
+            "criticality_status": self._check_resource_criticality(metrics, code),
+            "optimization": self._optimization_result(factors),
             "processing_timestamp": int(time.time())
         }
     
-    async def process_agad_phase(self, phase_data: AGADPhaseData) -> Dict[str, any]:
-        """Process AGAD phase data with lifecycle analysis"""
-        # Add to buffer
-        self.agad_buffer.append(phase_data)
+    async def process_agad_phase(self, phase_data: AGADPhaseData, compact: bool = False):
+        """Process AGAD phase data with lifecycle analysis.
+        
+        With ``compact`` the result is a plain tuple laid out as
+        result_codec.AGAD_RESULT instead of nested dicts.
+        """
+        self.metrics.inc("processed_total", stream="agad")
+        
+        # O(1) lookup of the expected V&V for this (phase, TRL)
+        entry = (self.agad_matrix.lookup(phase_data.phase_id, phase_data.trl_level)
+                 if self.agad_matrix is not None else None)
+        
+        if compact:
+            return self._agad_result_row(phase_data, entry)
         
         # Analyze phase progression
-        progression_analysis = await self._analyze_agad_progression(phase_data)
+        progression_analysis = await self._analyze_agad_progression(phase_data, entry)
+        if progression_analysis["verification_method_valid"] is False:
+            self.metrics.inc("agad_unexpected_verification_total")
+        
+        # Add to the bounded phase store (and the telemetry store, if any)
+        self.agad_store.append(phase_data, progression_analysis["verification_method_valid"])
         
         # Generate phase-specific sustainability recommendations
-        phase_recommendations = await self._generate_phase_recommendations(phase_data)
+        phase_recommendations = await self._generate_phase_recommendations(phase_data, entry)
         
         return {
-            "phase_data": asdict(phase_data),
+            "phase_data": _record_dict(phase_data),
             "progression_analysis": progression_analysis,
             "recommendations": phase_recommendations,
             "processing_timestamp": int(time.time())
         }
     
-    def _check_co2_safety(self, metrics: CO2Metrics) -> Dict[str, any]:
-        """Check CO2 metrics against safety thresholds"""
-        margin = self.config["safety_margins"]["co2_margin"]
-        threshold_with_margin = self.co2_threshold * (1 - margin)
+    async def process_co2_metrics_batch(self, samples) -> Dict[str, any]:
+        """Process N CO2 samples with vectorized safety checks and prediction.
+        
+        ``samples`` may be a sequence of CO2Metrics, a structured NumPy array or
+        a mapping of column arrays. Results are columnar: one array per output
+        field, aligned with the input order.
+        """
+        columns = _to_columns(samples, self.co2_buffer.fields)
+        count = len(columns["timestamp_utc"])
+        
+        # Windows may reach back into samples buffered before this batch
+        history = self.co2_buffer.matrix(prediction_engine.PREDICTION_WINDOW - 1,
+                                         prediction_engine.PREDICTION_FEATURES)
+        self.co2_buffer.extend(columns)
+        self.co2_aggregates.update_columns(columns)
+        if self.store:
+            self.store.append_columns("co2", columns)
+        if self.trainer is not None:
+            self.trainer.observe_batch(columns["timestamp_utc"], columns["absolute_co2_emissions"])
+        
+        safety_status = self._check_co2_safety_batch(columns)
+        self.metrics.inc("processed_total", count, stream="co2")
+        self.metrics.inc("threshold_breach_total", int(np.count_nonzero(safety_status["severity"] == "HIGH")),
+                         kind="co2_high")
+        with self.metrics.time_stage("predict_co2_trend_batch"):
+            prediction = await self._predict_co2_trend_batch(columns, history)
+        recommendations = self._generate_co2_recommendations_batch(columns, prediction)
         
         return {
-            "within_limits": metrics.absolute_co2_emissions <= threshold_with_margin,
-            "current_value": metrics.absolute_co2_emissions,
-            "threshold": threshold_with_margin,
-            "margin_percentage": margin * 100,
-            "severity": "HIGH" if metrics.absolute_co2_emissions > self.co2_threshold else "NORMAL"
+            "count": count,
+            "metrics": columns,
+            "safety_status": safety_status,
+            "prediction": prediction,
+            "recommendations": recommendations,
+            "processing_timestamp": int(time.time())
         }
     
-    def _check_resource_criticality(self, metrics: ResourceMetrics) -> Dict[str, any]:
-        """Check resource criticality against thresholds"""
-        margin = self.config["safety_margins"]["resource_margin"]
-        threshold_with_margin = self.criticality_threshold * (1 + margin)
+    async def process_resource_metrics_batch(self, samples) -> Dict[str, any]:
+        """Process N resource samples with vectorized criticality checks and optimization"""
+        columns = _to_columns(samples, self.resource_buffer.fields)
+        self.resource_buffer.extend(columns)
+        self.resource_aggregates.update_columns(columns)
+        if self.store:
+            self.store.append_columns("resource", columns)
+        
+        criticality_status = self._check_resource_criticality_batch(columns)
+        self.metrics.inc("processed_total", len(columns["timestamp_utc"]), stream="resource")
+        self.metrics.inc("threshold_breach_total",
+                         int(np.count_nonzero(criticality_status["overall_status"] == "CRITICAL")),
+                         kind="resource_critical")
+        with self.metrics.time_stage("optimize_resource_usage_batch"):
+            optimization = await self._optimize_resource_usage_batch(columns)
+        
+        return {
+            "count": len(columns["timestamp_utc"]),
+            "metrics": columns,
+            "criticality_status": criticality_status,
+            "optimization": optimization,
+            "processing_timestamp": int(time.time())
+        }
+    
+    async def process_agad_phases_batch(self, samples) -> Dict[str, any]:
+        """Process N AGAD phase records with vectorized progression analysis.
         
-        critical_indicators = []
+        ``samples`` may be a sequence of AGADPhaseData or a mapping of column
+        arrays. Results are columnar and aligned with the input order;
+        ``verification_method_valid`` is 1/0, or -1 where the (phase, TRL)
+        pair is not in the matrix. ``analytics`` summarizes the batch per
+        phase and TRL (see agad_analytics.phase_analytics).
+        """
+        columns = agad_analytics.agad_columns(samples)
+        count = len(columns["timestamp_utc"])
+        method_valid = agad_analytics.method_validity(self.agad_matrix, columns)
+        self.agad_store.extend(columns, method_valid)
+        
+        self.metrics.inc("processed_total", count, stream="agad")
+        self.metrics.inc("agad_unexpected_verification_total", int(np.count_nonzero(method_valid == 0)))
+        
+        passed = columns["passed"].astype(bool)
+        coverage = columns["coverage_percentage"]
+        with self.metrics.time_stage("agad_analytics_batch"):
+            analytics = agad_analytics.phase_analytics({**columns, "method_valid": method_valid})
+        
+        return {
+            "count": count,
+            "phase_data": columns,
+            "progression_analysis": {
+                "phase_completion_status": np.where(passed, "PASSED", "FAILED"),
+                "trl_advancement": columns["trl_level"],
+                "verification_completeness": np.nan_to_num(coverage, nan=0.0),
+                "next_phase_readiness": agad_analytics.next_phase_readiness(passed, coverage),
+                "verification_method_valid": method_valid
+            },
+            "analytics": analytics,
+            "processing_timestamp": int(time.time())
+        }
+    
+    def get_agad_analytics(self, n: Optional[int] = None, history: bool = False,
+                           start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, any]:
+        """Readiness, pass rates and coverage per AGAD phase and TRL.
         
-        if metrics.critical_material_intensity > threshold_with_margin:
-            critical_indicators.append("high_material_intensity")
+        Covers the newest ``n`` records held in memory, or with ``history``
+        everything in the telemetry store between ``start_ts`` and ``end_ts``.
+        """
+        return self.agad_store.analytics(n, history, start_ts, end_ts)
+    
+    def get_aggregates(self, stream: str = "co2", window: Optional[str] = None) -> Dict[str, Dict]:
+        """Rolling aggregates for the ``co2`` or ``resource`` stream.
         
-        if metrics.supply_chain_risk_index > 70:  # 70% risk threshold
-            critical_indicators.append("supply_chain_risk")
+        Returns ``{field: {window: {count, mean, min, max, ewma, p50, p95, p99}}}``
+        without touching the raw buffers; ``window`` selects one window (e.g. "24h").
+        """
+        aggregates = {"co2": self.co2_aggregates, "resource": self.resource_aggregates}[stream]
+        return aggregates.snapshot(window)
+    
+    def _check_co2_safety(self, metrics: CO2Metrics) -> Dict[str, any]:
+        """Check CO2 metrics against safety thresholds"""
+        rules = self.rules
         
-        if metrics.resource_circularity_indicator < 0.3:  # 30% minimum circularity
-            critical_indicators.append("low_circularity")
+        return {
+            "within_limits": metrics.absolute_co2_emissions <= rules.co2_limit,
+            "current_value": metrics.absolute_co2_emissions,
+            "threshold": rules.co2_limit,
+            "margin_percentage": rules.co2_margin * 100,
+            "severity": "HIGH" if metrics.absolute_co2_emissions > rules.co2_threshold else "NORMAL"
+        }
+    
+    def _check_resource_criticality(self, metrics: ResourceMetrics,
+                                    code: Optional[int] = None) -> Dict[str, any]:
+        """Check resource criticality against thresholds"""
+        # Shared tuple of triggered indicator names, interned per condition code
+        if code is None:
+            code = self.rules.resource.code(metrics)
         
         return {
-            "critical_indicators": critical_indicators,
-            "overall_status": "CRITICAL" if critical_indicators else "NORMAL",
+            "critical_indicators": self.rules.resource.names(code),
+            "overall_status": "CRITICAL" if code else "NORMAL",
             "risk_score": self._calculate_overall_risk_score(metrics)
         }
     
     def _calculate_overall_risk_score(self, metrics: ResourceMetrics) -> float:
         """Calculate overall resource risk score"""
-        # Weighted combination of risk factors
-        weights = {
-            "material_intensity": 0.3,
-            "supply_risk": 0.4,
-            "circularity": 0.3
-        }
+        # Weighted combination of risk factors (weights from config "rules")
+        return self.rules.risk_score(metrics.critical_material_intensity,
+                                     metrics.supply_chain_risk_index,
+                                     metrics.resource_circularity_indicator)
+    
+    def _check_co2_safety_batch(self, columns: Dict[str, np.ndarray]) -> Dict[str, any]:
+        """Vectorized _check_co2_safety over a column batch"""
+        rules = self.rules
+        emissions = columns["absolute_co2_emissions"]
         
-        score = (
-            weights["material_intensity"] * metrics.critical_material_intensity +
-            weights["supply_risk"] * (metrics.supply_chain_risk_index / 100.0) +
-            weights["circularity"] * (1.0 - metrics.resource_circularity_indicator)
-        )
+        return {
+            "within_limits": emissions <= rules.co2_limit,
+            "current_value": emissions,
+            "threshold": rules.co2_limit,
+            "margin_percentage": rules.co2_margin * 100,
+            "severity": np.where(emissions > rules.co2_threshold, "HIGH", "NORMAL")
+        }
+    
+    def _check_resource_criticality_batch(self, columns: Dict[str, np.ndarray]) -> Dict[str, any]:
+        """Vectorized _check_resource_criticality; indicators come back as boolean masks"""
+        indicators = self.rules.resource.masks(columns)
+        any_critical = np.logical_or.reduce(list(indicators.values()))
         
-        return min(1.0, max(0.0, score))
+        return {
+            "critical_indicators": indicators,
+            "overall_status": np.where(any_critical, "CRITICAL", "NORMAL"),
+            "risk_score": self._calculate_overall_risk_score_batch(columns)
+        }
+    
+    def _calculate_overall_risk_score_batch(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Vectorized _calculate_overall_risk_score"""
+        return self.rules.risk_score_batch(columns)
     
     async def _predict_co2_trend(self, current_metrics: CO2Metrics) -> Dict[str, float]:
         """Predict CO2 trend using AI model"""
-        if not self.prediction_model or len(self.co2_buffer) < 10:
+        if self._lazy_models:
+            await self._ensure_models()
+        if not self.prediction_model or len(self.co2_buffer) < prediction_engine.PREDICTION_WINDOW:
             return {"trend": 0.0, "confidence": 0.0}
         
-        # Prepare input data from recent metrics
-        recent_data = np.array([
-            [m.absolute_co2_emissions, m.co2_intensity, m.well_to_wake_emissions]
-            for m in self.co2_buffer[-10:]
-        ])
+        # Prepare input data from recent metrics: (window, features)
+        recent_data = self.co2_buffer.matrix(prediction_engine.PREDICTION_WINDOW,
+                                             prediction_engine.PREDICTION_FEATURES)
+        
+        # Run prediction (micro-batched with other pending requests)
+        prediction = await self.prediction_batcher.predict(recent_data, self.prediction_model)
+        predicted = float(prediction[0])
+        if self.trainer is not None:
+            self.trainer.track(current_metrics.timestamp_utc, recent_data, predicted)
+        
+        return {
+            "predicted_emissions_24h": predicted,
+            "trend_direction": "increasing" if predicted > current_metrics.absolute_co2_emissions else "decreasing",
+            "confidence": self._prediction_confidence()
+        }
+    
+    async def _predict_co2_trend_batch(self, columns: Dict[str, np.ndarray],
+                                       history: np.ndarray) -> Dict[str, np.ndarray]:
+        """Predict CO2 trend for every sample of a batch in a single model call.
+        
+        Each sample sees the same trailing window as the per-sample path: the
+        previous PREDICTION_WINDOW - 1 samples (from ``history`` and the batch)
+        plus itself. Samples without a full window get NaN with zero confidence.
+        """
+        if self._lazy_models:
+            await self._ensure_models()
+        count = len(columns["timestamp_utc"])
+        emissions = columns["absolute_co2_emissions"]
+        predicted = np.full(count, np.nan)
+        confidence = np.zeros(count)
         
-        # Run prediction
-        loop = asyncio.get_event_loop()
-        prediction = await loop.run_in_executor(
-            self.executor,
-            self.prediction_model.predict,
-            recent_data.flatten()
-        )
+        if self.prediction_model and count:
+            features = prediction_engine.PREDICTION_FEATURES
+            window = prediction_engine.PREDICTION_WINDOW
+            batch = np.column_stack([columns[name] for name in features]).astype(np.float64)
+            series = np.concatenate([history, batch])
+            if len(series) >= window:
+                windows = np.lib.stride_tricks.sliding_window_view(
+                    series, (window, len(features)))[:, 0]
+                first = count - len(windows)   # first sample with a full window
+                prediction = await self._run_prediction(windows, "predict_co2_trend_batch")
+                predicted[first:] = prediction[:, 0]
+                confidence[first:] = self._prediction_confidence()
+                if self.trainer is not None:
+                    self.trainer.track_batch(columns["timestamp_utc"][first:], windows,
+                                             predicted[first:])
         
         return {
-            "predicted_emissions_24h": float(prediction[0]),
-            "trend_direction": "increasing" if prediction[0] > current_metrics.absolute_co2_emissions else "decreasing",
-            "confidence": 0.85  # Simplified confidence score
+            "predicted_emissions_24h": predicted,
+            "trend_direction": np.where(predicted > emissions, "increasing", "decreasing"),
+            "confidence": confidence
         }
     
+    def _prediction_confidence(self) -> float:
+        """1 - rolling MAPE of matured predictions (0.0 until one has matured)"""
+        return self.trainer.confidence if self.trainer is not None else 0.0
+    
+    async def _run_prediction(self, windows: np.ndarray, stage: str = "predict_batch") -> np.ndarray:
+        """predict_batch placed by the offload policy (the model may go to a process pool)"""
+        return await self.offload.run(stage, self.prediction_model.predict_batch, windows, portable=True)
+    
+    async def _run_batched(self, fn, arg):
+        """Runner of the prediction batcher: one batched call placed by the offload policy"""
+        return await self.offload.run("predict_batch", fn, arg, portable=True)
+    
     async def _optimize_resource_usage(self, metrics: ResourceMetrics) -> Dict[str, any]:
         """Optimize resource usage using AI"""
+        return self._optimization_result(await self._optimization_factors(metrics))
+    
+    async def _optimization_factors(self, metrics: ResourceMetrics) -> Optional[Dict[str, float]]:
+        """Raw optimization factors, or None without an optimization model"""
+        if self._lazy_models:
+            await self._ensure_models()
         if not self.optimization_model:
-            return {"status": "model_not_available"}
-        
-        constraints = {
-            "max_material_intensity": self.criticality_threshold,
-            "min_circularity": 0.3,
-            "max_supply_risk": 70.0
-        }
+            return None
         
-        loop = asyncio.get_event_loop()
-        optimization_result = await loop.run_in_executor(
-            self.executor,
-            self.optimization_model.optimize_resource_allocation,
-            metrics,
-            constraints
-        )
+        if self.offload.decide("optimize_resource_usage") == offload_policy.INLINE:
+            return await self.offload.run("optimize_resource_usage",
+                                          self.optimization_model.optimize_resource_allocation,
+                                          metrics, self.rules.constraints)
+        # Heavy model: samples arriving together share one pooled batch call
+        return await self.optimization_batcher.submit(metrics)
+    
+    def _optimize_records(self, records: List[ResourceMetrics]) -> List[Dict[str, float]]:
+        """Per-sample optimization factors for coalesced samples, in one model call"""
+        model, constraints = self.optimization_model, self.rules.constraints
+        if not hasattr(model, "optimize_resource_allocation_batch"):
+            return [model.optimize_resource_allocation(record, constraints) for record in records]
+        factors = model.optimize_resource_allocation_batch(
+            _to_columns(records, self.resource_buffer.fields), constraints)
+        names = tuple(factors)
+        return [dict(zip(names, row))
+                for row in zip(*(np.asarray(factors[name]).tolist() for name in names))]
+    
+    def _optimization_result(self, optimization_result: Optional[Dict[str, float]]) -> Dict[str, any]:
+        if optimization_result is None:
+            return {"status": "model_not_available"}
         
         return {
             "optimization_factors": optimization_result,
@@ -301,133 +863,306 @@ class SustainabilityAIMonitor:
             "implementation_priority": self._prioritize_actions(optimization_result)
         }
     
-    def _estimate_improvement(self, optimization_factors: Dict[str, float]) -> Dict[str, float]:
-        """Estimate improvement from optimization"""
+    async def _optimize_resource_usage_batch(self, columns: Dict[str, np.ndarray]) -> Dict[str, any]:
+        """Vectorized _optimize_resource_usage over a column batch"""
+        if self._lazy_models:
+            await self._ensure_models()
+        if not self.optimization_model:
+            return {"status": "model_not_available"}
+        
+        factors = await self.offload.run("optimize_resource_usage_batch",
+                                         self.optimization_model.optimize_resource_allocation_batch,
+                                         columns, self.rules.constraints)
+        factor_matrix = np.column_stack([factors[name] for name in OPTIMIZATION_FACTORS])
+        total = factor_matrix.sum(axis=1)
+        # Stable descending sort keeps ties in declaration order, like sorted(reverse=True)
+        order = np.argsort(-factor_matrix, axis=1, kind="stable")
+        
         return {
-            "co2_reduction_percentage": sum(optimization_factors.values()) * 10,
-            "cost_reduction_percentage": sum(optimization_factors.values()) * 5,
-            "risk_reduction_percentage": sum(optimization_factors.values()) * 15
+            "optimization_factors": factors,
+            "estimated_improvement": {name: total * multiplier for name, multiplier
+                                      in self.rules.improvement_multipliers.items()},
+            "implementation_priority": np.asarray(OPTIMIZATION_FACTORS)[order]
         }
     
-    def _prioritize_actions(self, optimization_factors: Dict[str, float]) -> List[str]:
-        """Prioritize optimization actions"""
-        sorted_factors = sorted(optimization_factors.items(), 
-                              key=lambda x: x[1], reverse=True)
-        return [factor[0] for factor in sorted_factors]
+    def _estimate_improvement(self, optimization_factors: Dict[str, float]) -> Dict[str, float]:
+        """Estimate improvement from optimization"""
+        total = sum(optimization_factors.values())
+        return {name: total * multiplier
+                for name, multiplier in self.rules.improvement_multipliers.items()}
+    
+    def _prioritize_actions(self, optimization_factors: Dict[str, float]) -> Tuple[str, ...]:
+        """Prioritize optimization actions (shared tuple per ranking)"""
+        return monitor_rules.rank_names(tuple(optimization_factors), tuple(optimization_factors.values()))
     
-    async def _analyze_agad_progression(self, phase_data: AGADPhaseData) -> Dict[str, any]:
+    async def _analyze_agad_progression(self, phase_data: AGADPhaseData,
+                                        entry: Optional[agad_matrix.MatrixEntry] = None) -> Dict[str, any]:
         """Analyze AGAD phase progression"""
         return {
             "phase_completion_status": "PASSED" if phase_data.passed else "FAILED",
             "trl_advancement": phase_data.trl_level,
             "verification_completeness": phase_data.coverage_percentage or 0.0,
-            "next_phase_readiness": phase_data.passed and (phase_data.coverage_percentage or 0) > 80
+            "next_phase_readiness": phase_data.passed and (phase_data.coverage_percentage or 0) > 80,
+            "phase_name": entry.phase_name if entry else None,
+            "expected_verification_methods": list(entry.verification_methods) if entry else [],
+            # None when the (phase, TRL) pair is not covered by the matrix
+            "verification_method_valid": (
+                agad_matrix.normalize_method(phase_data.verification_method) in entry.verification_methods
+                if entry else None)
         }
     
-    async def _generate_phase_recommendations(self, phase_data: AGADPhaseData) -> List[str]:
+    async def _generate_phase_recommendations(self, phase_data: AGADPhaseData,
+                                              entry: Optional[agad_matrix.MatrixEntry] = None) -> Tuple[str, ...]:
         """Generate phase-specific sustainability recommendations"""
-        recommendations = []
-        
-        if phase_data.trl_level <= 3:  # Concept/preliminary phases
-            recommendations.extend([
-                "Integrate sustainability metrics into concept definition",
-                "Establish baseline CO2 and resource criticality targets",
-                "Identify sustainable material alternatives early"
-            ])
-        elif phase_data.trl_level <= 6:  # Design phases
-            recommendations.extend([
-                "Optimize design for material efficiency",
-                "Implement circular economy principles",
-                "Validate sustainability models with prototypes"
-            ])
-        elif phase_data.trl_level <= 9:  # Development/certification phases
-            recommendations.extend([
-                "Monitor real-world sustainability performance",
-                "Implement adaptive optimization algorithms",
-                "Prepare for operational sustainability monitoring"
-            ])
-        else:  # Operational phases
-            recommendations.extend([
-                "Continuous sustainability optimization",
-                "Fleet-wide performance monitoring",
-                "End-of-life planning and circular economy implementation"
-            ])
-        
-        return recommendations
+        # Interned per TRL band and V&V mismatch (see agad_matrix)
+        method_valid = (agad_matrix.normalize_method(phase_data.verification_method)
+                        in entry.verification_methods if entry else None)
+        return agad_matrix.phase_recommendations(phase_data.trl_level, entry, method_valid)
+    
+    def validate_agad_phases(self, samples: List[AGADPhaseData]) -> Dict[str, np.ndarray]:
+        """Bulk-check verification methods against the AGAD matrix at ingest.
+        
+        Returns ``known`` (pair present in the matrix) and ``valid`` masks
+        aligned with ``samples``; everything is unknown without a matrix.
+        """
+        if self.agad_matrix is None:
+            unknown = np.zeros(len(samples), dtype=bool)
+            return {"known": unknown, "valid": unknown.copy()}
+        return self.agad_matrix.validate_batch(
+            [sample.phase_id for sample in samples],
+            [sample.trl_level for sample in samples],
+            [sample.verification_method for sample in samples])
     
     async def _generate_co2_recommendations(self, 
                                           metrics: CO2Metrics, 
-                                          prediction: Dict[str, float]) -> List[str]:
+                                          prediction: Dict[str, float]) -> Tuple[str, ...]:
         """Generate CO2 reduction recommendations"""
-        recommendations = []
-        
-        if metrics.absolute_co2_emissions > self.co2_threshold * 0.8:
-            recommendations.append("URGENT: Implement immediate CO2 reduction measures")
-        
-        if prediction["trend_direction"] == "increasing":
-            recommendations.append("Proactive measures needed to reverse CO2 trend")
-        
-        if metrics.well_to_wake_emissions > 50:  # gCO2e/MJ threshold
-            recommendations.append("Optimize fuel/energy supply chain efficiency")
-        
-        recommendations.extend([
-            "Consider sustainable aviation fuel (SAF) adoption",
-            "Implement operational efficiency improvements",
-            "Explore hydrogen propulsion for future fleet"
-        ])
+        # Shared tuple per combination of triggered rules (see monitor_rules)
+        table = self.rules.co2_recommendations
+        return table.results(table.code(metrics, {"trend_direction": prediction.get("trend_direction")}))
+    
+    def _generate_co2_recommendations_batch(self,
+                                            columns: Dict[str, np.ndarray],
+                                            prediction: Dict[str, np.ndarray]) -> List[Tuple[str, ...]]:
+        """Vectorized _generate_co2_recommendations.
         
-        return recommendations
+        Conditions are evaluated as masks; samples that trigger the same
+        conditions share one recommendation tuple.
+        """
+        table = self.rules.co2_recommendations
+        codes = table.codes({**columns, "trend_direction": prediction["trend_direction"]})
+        return table.results_batch(codes)
+    
+    # --- Compact result rows (field order of the result_codec layouts) ---------
+    
+    def _co2_result_row(self, metrics: CO2Metrics, prediction: Dict[str, float]) -> tuple:
+        """One result_codec.CO2_RESULT row; recommendations stay a rule code"""
+        rules = self.rules
+        emissions = metrics.absolute_co2_emissions
+        trend = prediction.get("trend_direction")
+        return (emissions, metrics.co2_intensity, metrics.well_to_wake_emissions,
+                metrics.co2_abatement_potential, metrics.timestamp_utc,
+                emissions <= rules.co2_limit, emissions > rules.co2_threshold,
+                prediction.get("predicted_emissions_24h", _NAN),
+                result_codec.TREND_CODES.get(trend, result_codec.NO_CODE), prediction["confidence"],
+                rules.co2_recommendations.code(metrics, {"trend_direction": trend}),
+                int(time.time()))
+    
+    def _resource_result_row(self, metrics: ResourceMetrics, code: int,
+                             factors: Optional[Dict[str, float]]) -> tuple:
+        """One result_codec.RESOURCE_RESULT row; indicators stay a rule code"""
+        if factors is None:
+            values = (_NAN,) * len(OPTIMIZATION_FACTORS)
+            priority = (result_codec.NO_CODE,) * len(OPTIMIZATION_FACTORS)
+        else:
+            values = tuple(factors[name] for name in OPTIMIZATION_FACTORS)
+            priority = monitor_rules.rank_indices(values)
+        return (metrics.critical_material_intensity, metrics.resource_circularity_indicator,
+                metrics.supply_chain_risk_index, metrics.resource_efficiency_index,
+                metrics.timestamp_utc, code, code != 0,
+                self._calculate_overall_risk_score(metrics), *values, priority,
+                int(time.time()))
+    
+    def _agad_result_row(self, phase_data: AGADPhaseData,
+                         entry: Optional[agad_matrix.MatrixEntry]) -> tuple:
+        """One result_codec.AGAD_RESULT row, the report as text (also recorded in the phase store)"""
+        method_valid = (agad_matrix.normalize_method(phase_data.verification_method)
+                        in entry.verification_methods if entry else None)
+        if method_valid is False:
+            self.metrics.inc("agad_unexpected_verification_total")
+        self.agad_store.append(phase_data, method_valid)
+        coverage = phase_data.coverage_percentage
+        return (phase_data.phase_id.encode("utf-8"), phase_data.trl_level,
+                phase_data.verification_method.encode("utf-8"), phase_data.passed,
+                _NAN if coverage is None else coverage, phase_data.timestamp_utc,
+                -1 if method_valid is None else int(method_valid), phase_data.validation_report,
+                phase_data.passed and (coverage or 0) > agad_analytics.READINESS_COVERAGE,
+                int(time.time()))
+
+async def health_check(config_path: str = "config.json",
+                       lazy_models: Optional[bool] = None) -> Dict[str, any]:
+    """Build a monitor, process one sample per stream and time each phase.
+    
+    Used by ``--check`` and by the startup benchmark; ``first_result`` is
+    the first CO2 result, the slowest path on a cold monitor. The synthetic
+    samples must not reach production state, so the check runs without the
+    telemetry store and the online trainer.
+    """
+    timings = {}
+    started = time.perf_counter()
+    
+    def lap(name: str) -> None:
+        nonlocal started
+        now = time.perf_counter()
+        timings[name] = (now - started) * 1000
+        started = now
+    
+    config = SustainabilityAIMonitor._load_config(config_path)
+    config = {**config, "telemetry_store": None,
+              "training": {**(config.get("training") or {}), "enabled": False}}
+    monitor = SustainabilityAIMonitor(config=config)
+    lap("construct")
+    models_ok = await monitor.initialize_ai_models(lazy_models)
+    lap("initialize")
+    now = int(time.time())
+    co2 = await monitor.process_co2_metrics(CO2Metrics(45.2, 89.5, 42.1, 12.3, now))
+    lap("first_result")
+    resource = await monitor.process_resource_metrics(ResourceMetrics(0.65, 0.42, 35.8, 78.2, now))
+    agad = await monitor.process_agad_phase(AGADPhaseData("AGAD 0/7", 1, "UseCaseReview", "",
+                                                          True, 90.0, now))
+    lap("remaining_streams")
+    monitor.close()
+    
+    return {
+        "status": "ok" if models_ok and monitor.agad_matrix is not None else "degraded",
+        "models_initialized": models_ok,
+        "agad_matrix_loaded": monitor.agad_matrix is not None,
+        "co2_severity": co2["safety_status"]["severity"],
+        "resource_status": resource["criticality_status"]["overall_status"],
+        "agad_phase_status": agad["progression_analysis"]["phase_completion_status"],
+        "timings_ms": timings
+    }
 
 # Main execution function
-async def main():
+async def main(source: Optional[str] = None, config_path: str = "config.json",
+               results: Optional[str] = None):
     """Main execution function for sustainability monitoring"""
-    monitor = SustainabilityAIMonitor()
+    monitor = SustainabilityAIMonitor(config_path)
+    # Result frames written to stdout must not be interleaved with status text
+    status_out = sys.stderr if results == "-" else sys.stdout
     
     # Initialize AI models
     if not await monitor.initialize_ai_models():
-        print("Failed to initialize AI models")
+        print("Failed to initialize AI models", file=status_out)
         return
     
-    print("GAIA-Q Sustainability AI Monitor initialized successfully")
-    print("Real-time monitoring active...")
+    print("GAIA-Q Sustainability AI Monitor initialized successfully", file=status_out)
     
-    # Simulate real-time data processing
-    while True:
+    monitor.start_metrics_exporter()
+    
+    # Resume from the last snapshot, else from persisted telemetry
+    if "snapshot" in monitor.config:
+        restored = monitor.restore_snapshot()
+        monitor.start_snapshots()
+    else:
+        restored = False
+    if monitor.store and not restored:
+        monitor.warm_start_from_store()
+    
+    if source:
+        # Stream telemetry from a JSON-lines file, stdin or a local socket
+        from telemetry_pipeline import PipelineConfig, TelemetryPipeline, open_source, print_sink
+        
+        print(f"Streaming telemetry from {source}...", file=status_out)
+        if results:
+            # Binary result frames instead of status lines (see result_codec)
+            sink = result_codec.open_result_sink(results, monitor.rules, monitor.agad_matrix)
+        else:
+            sink = print_sink
+        pipeline = TelemetryPipeline(monitor, open_source(source), sink,
+                                     config=PipelineConfig.from_config(monitor.config))
         try:
-            # Simulate incoming metrics
-            co2_metrics = CO2Metrics(
-                absolute_co2_emissions=45.2,
-                co2_intensity=89.5,
-                well_to_wake_emissions=42.1,
-                co2_abatement_potential=12.3,
-                timestamp_utc=int(time.time())
-            )
-            
-            resource_metrics = ResourceMetrics(
-                critical_material_intensity=0.65,
-                resource_circularity_indicator=0.42,
-                supply_chain_risk_index=35.8,
-                resource_efficiency_index=78.2,
-                timestamp_utc=int(time.time())
-            )
-            
-            # Process metrics
-            co2_result = await monitor.process_co2_metrics(co2_metrics)
-            resource_result = await monitor.process_resource_metrics(resource_metrics)
-            
-            # Print results (in production, this would be logged/stored)
-            print(f"CO2 Status: {co2_result['safety_status']['severity']}")
-            print(f"Resource Risk: {resource_result['criticality_status']['overall_status']}")
-            
-            await asyncio.sleep(0.1)  # 100ms monitoring interval
-            
-        except KeyboardInterrupt:
-            print("\nShutting down monitoring system...")
-            break
-        except Exception as e:
-            print(f"Error in monitoring loop: {e}")
-            await asyncio.sleep(1)
+            stats = await pipeline.run()
+            print(f"Pipeline drained: {json.dumps(stats)}", file=status_out)
+        finally:
+            if results:
+                sink.close()
+            monitor.close()
+        return
+    
+    print("Real-time monitoring active...")
+    
+    # Each asset is polled on its own interval (monitoring_interval_ms, adapted
+    # per asset by the "scheduler" config section) instead of one fixed tick
+    scheduler = monitor_scheduler.MonitorScheduler.from_config(monitor.config, monitor.metrics)
+    for asset_id in monitor.config.get("assets", ["local"]):
+        scheduler.add(asset_id)
+    
+    async def poll(asset_ids: List[str]) -> Dict[str, Tuple[str, float]]:
+        statuses = {}
+        for asset_id in asset_ids:
+            try:
+                # Simulate incoming metrics
+                co2_metrics = CO2Metrics(
+                    absolute_co2_emissions=45.2,
+                    co2_intensity=89.5,
+                    well_to_wake_emissions=42.1,
+                    co2_abatement_potential=12.3,
+                    timestamp_utc=int(time.time())
+                )
+                
+                resource_metrics = ResourceMetrics(
+                    critical_material_intensity=0.65,
+                    resource_circularity_indicator=0.42,
+                    supply_chain_risk_index=35.8,
+                    resource_efficiency_index=78.2,
+                    timestamp_utc=int(time.time())
+                )
+                
+                # Process metrics
+                co2_result = await monitor.process_co2_metrics(co2_metrics)
+                resource_result = await monitor.process_resource_metrics(resource_metrics)
+                
+                # Print results (in production, this would be logged/stored)
+                severity = co2_result['safety_status']['severity']
+                resource_status = resource_result['criticality_status']['overall_status']
+                print(f"CO2 Status: {severity}")
+                print(f"Resource Risk: {resource_status}")
+                
+                # HIGH / CRITICAL tighten this asset's interval; stable emissions relax it
+                status = severity if severity == "HIGH" else resource_status
+                statuses[asset_id] = (status, co2_metrics.absolute_co2_emissions)
+                
+            except Exception as e:
+                print(f"Error in monitoring loop: {e}")
+        return statuses
+    
+    try:
+        await scheduler.run(poll)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nShutting down monitoring system...")
+        print(f"Scheduler: {json.dumps(scheduler.stats())}")
+    finally:
+        monitor.close()
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="GAIA-Q Sustainability AI Monitor")
+    parser.add_argument("--source",
+                        help="telemetry source: '-' for stdin, unix:<path>, or a JSON-lines file")
+    parser.add_argument("--check", action="store_true",
+                        help="health check: process one sample per stream, print JSON timings and exit")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--results",
+                        help="with --source: write binary result frames to a file or unix:<path>")
+    args = parser.parse_args()
+    
+    if args.check:
+        logging.basicConfig(level=logging.WARNING)
+        report = asyncio.run(health_check(args.config))
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0 if report["status"] == "ok" else 1)
+    
     logging.basicConfig(level=logging.INFO)
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(args.source, args.config, args.results))
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Telemetry Ingestion Pipeline
+Streaming parse -> validate -> process -> sink stages over bounded asyncio queues
+"""
+
+import asyncio
+import dataclasses
+import functools
+import json
+import logging
+import sys
+import time
+import typing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from sustainability_ai_monitor import (
+    AGADPhaseData,
+    CO2Metrics,
+    ResourceMetrics,
+    SustainabilityAIMonitor,
+)
+
+# Telemetry record "type" -> metric dataclass
+RECORD_TYPES = {
+    "co2": CO2Metrics,
+    "resource": ResourceMetrics,
+    "agad": AGADPhaseData,
+}
+
+# Queue overflow policies
+BLOCK = "block"              # backpressure: producer waits for space
+DROP_NEWEST = "drop_newest"  # reject the incoming item
+DROP_OLDEST = "drop_oldest"  # evict the oldest queued item to make room
+DROP_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+Sink = Callable[[str, Dict[str, Any]], Union[None, Awaitable[None]]]
+
+
+@dataclass
+class PipelineConfig:
+    """Pipeline tuning knobs (``pipeline`` section of config.json)"""
+    queue_size: int = 1024
+    drop_policy: str = BLOCK
+    parse_workers: int = 1
+    validate_workers: int = 1
+    process_workers: int = 1
+    sink_workers: int = 1
+    max_batch: int = 256          # samples coalesced into one batch call
+    stats_interval_s: float = 5.0
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "PipelineConfig":
+        known = {f.name for f in dataclasses.fields(cls)}
+        return cls(**{k: v for k, v in config.get("pipeline", {}).items() if k in known})
+
+
+class Envelope:
+    """One telemetry item travelling through the pipeline"""
+    __slots__ = ("received_at", "payload", "kind", "record")
+
+    def __init__(self, payload: Any, received_at: float):
+        self.received_at = received_at
+        self.payload = payload
+        self.kind: Optional[str] = None
+        self.record: Any = None
+
+
+class StageQueue:
+    """Bounded asyncio queue with an explicit overflow policy and counters"""
+
+    def __init__(self, name: str, maxsize: int, policy: str = BLOCK,
+                 on_drop: Optional[Callable[[str], None]] = None):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.name = name
+        self.policy = policy
+        self.on_drop = on_drop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.enqueued = 0
+        self.dropped = 0
+        self.high_watermark = 0
+
+    async def put(self, item: Any) -> bool:
+        """Enqueue ``item``; returns False if it was dropped"""
+        if self.policy == BLOCK:
+            await self.queue.put(item)
+        elif self.queue.full():
+            self.dropped += 1
+            if self.on_drop:
+                self.on_drop(self.name)
+            if self.policy == DROP_NEWEST:
+                return False
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.queue.put_nowait(item)
+        else:
+            self.queue.put_nowait(item)
+        self.enqueued += 1
+        depth = self.queue.qsize()
+        if depth > self.high_watermark:
+            self.high_watermark = depth
+        return True
+
+    async def get(self) -> Any:
+        return await self.queue.get()
+
+    def get_nowait_many(self, limit: int) -> List[Any]:
+        """Take up to ``limit`` already-queued items without waiting"""
+        items = []
+        while len(items) < limit and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+    def task_done(self, count: int = 1) -> None:
+        for _ in range(count):
+            self.queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "dropped": self.dropped,
+            "high_watermark": self.high_watermark,
+        }
+
+
+# --- Sources -----------------------------------------------------------------
+
+async def jsonl_file_source(path: str, chunk_bytes: int = 1 << 16) -> AsyncIterator[str]:
+    """Yield lines from a JSON-lines file, reading chunks off the event loop"""
+    loop = asyncio.get_running_loop()
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            lines = await loop.run_in_executor(None, f.readlines, chunk_bytes)
+            if not lines:
+                break
+            for line in lines:
+                yield line
+
+
+async def _stream_lines(reader: asyncio.StreamReader) -> AsyncIterator[bytes]:
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        yield line
+
+
+async def stdin_source() -> AsyncIterator[bytes]:
+    """Yield lines from standard input without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=1 << 20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    async for line in _stream_lines(reader):
+        yield line
+
+
+async def unix_socket_source(path: str) -> AsyncIterator[bytes]:
+    """Accept local socket connections and yield their lines as they arrive"""
+    lines: asyncio.Queue = asyncio.Queue(maxsize=4096)
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            async for line in _stream_lines(reader):
+                await lines.put(line)   # socket reads pause when the pipeline is full
+        finally:
+            writer.close()
+
+    server = await asyncio.start_unix_server(handle, path=path, limit=1 << 20)
+    async with server:
+        while True:
+            yield await lines.get()
+
+
+def open_source(spec: str) -> AsyncIterator:
+    """Build a source from ``-``/``stdin``, ``unix:<path>`` or ``[jsonl:]<path>``"""
+    if spec in ("-", "stdin"):
+        return stdin_source()
+    if spec.startswith("unix:"):
+        return unix_socket_source(spec[len("unix:"):])
+    if spec.startswith("jsonl:"):
+        spec = spec[len("jsonl:"):]
+    return jsonl_file_source(spec)
+
+
+# --- Record validation -------------------------------------------------------
+
+_BOOLS = {"true": True, "false": False, "1": True, "0": False}
+
+
+def _parse_bool(value: Any) -> bool:
+    """JSON true/false, 0/1 or "true"/"false" (any case); ``bool("false")`` would be True"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _BOOLS:
+        return _BOOLS[value.strip().lower()]
+    raise ValueError(f"not a boolean: {value!r}")
+
+
+@functools.lru_cache(maxsize=None)
+def _converters(record_type: type) -> Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...]:
+    """(field, converter) pairs; None marks an Optional[float] field"""
+    hints = typing.get_type_hints(record_type)   # resolves postponed (string) annotations
+    converters = {float: float, int: int, bool: _parse_bool, str: str}
+    return tuple((field.name, converters.get(hints[field.name]))
+                 for field in dataclasses.fields(record_type))
+
+
+def build_record(payload: Dict[str, Any]):
+    """Validate a decoded telemetry object and build its metric dataclass.
+
+    Returns (kind, record); raises ValueError for unknown types or bad fields.
+    """
+    kind = payload.get("type")
+    record_type = RECORD_TYPES.get(kind)
+    if record_type is None:
+        raise ValueError(f"unknown record type {kind!r}")
+    values = {}
+    for name, convert in _converters(record_type):
+        if name not in payload:
+            raise ValueError(f"{kind}: missing field {name}")
+        value = payload[name]
+        if convert is not None:
+            value = convert(value)
+        elif value is not None:   # Optional[float]
+            value = float(value)
+        values[name] = value
+    return kind, record_type(**values)
+
+
+def print_sink(kind: str, result: Dict[str, Any]) -> None:
+    """Default sink: one status line per processed sample or batch"""
+    if kind == "co2":
+        print(f"CO2 Status: {result['safety_status']['severity']}")
+    elif kind == "resource":
+        print(f"Resource Risk: {result['criticality_status']['overall_status']}")
+    elif kind == "co2_batch":
+        high = int((result["safety_status"]["severity"] == "HIGH").sum())
+        print(f"CO2 batch: {result['count']} samples, {high} HIGH")
+    elif kind == "resource_batch":
+        critical = int((result["criticality_status"]["overall_status"] == "CRITICAL").sum())
+        print(f"Resource batch: {result['count']} samples, {critical} CRITICAL")
+    elif kind == "agad_batch":
+        ready = int(result["progression_analysis"]["next_phase_readiness"].sum())
+        print(f"AGAD batch: {result['count']} phases, {ready} ready for next phase")
+    else:
+        print(f"AGAD Phase: {result['progression_analysis']['phase_completion_status']}")
+
+
+# --- Pipeline ----------------------------------------------------------------
+
+class TelemetryPipeline:
+    """Streaming ingestion pipeline feeding a SustainabilityAIMonitor.
+
+    Items flow source -> parse -> validate -> process -> sink with one bounded
+    queue in front of each stage. Stages run as many concurrent workers as
+    configured and never wait on a fixed tick, so backlogs drain as fast as
+    the monitor can process them. The process stage coalesces whatever is
+    already queued (up to ``max_batch``) into the monitor's batch API.
+    """
+
+    def __init__(self, monitor: SustainabilityAIMonitor, source: AsyncIterator,
+                 sink: Sink = print_sink, config: Optional[PipelineConfig] = None):
+        self.logger = logging.getLogger(__name__)
+        self.monitor = monitor
+        self.source = source
+        self.sink = sink
+        # Sinks that encode results themselves (result_codec.ResultWriter) take
+        # compact per-sample rows instead of result dicts
+        self.compact = getattr(sink, "compact", False)
+        self.config = config or PipelineConfig()
+        size, policy = self.config.queue_size, self.config.drop_policy
+        on_drop = lambda queue: monitor.metrics.inc("dropped_total", queue=queue)
+        self.parse_queue = StageQueue("parse", size, policy, on_drop)
+        self.validate_queue = StageQueue("validate", size, policy, on_drop)
+        self.process_queue = StageQueue("process", size, policy, on_drop)
+        self.sink_queue = StageQueue("sink", size, BLOCK)   # never drop processed results
+        self.counters = {"received": 0, "parse_errors": 0, "invalid": 0,
+                         "processed": 0, "process_errors": 0, "sink_errors": 0}
+        self.lag_max_s = 0.0
+        self.lag_ewma_s = 0.0
+        self.event_lag_s = 0.0
+
+    async def run(self) -> Dict[str, Any]:
+        """Run until the source is exhausted and every queue has drained"""
+        cfg = self.config
+        workers = (
+            [asyncio.create_task(self._parse_worker()) for _ in range(cfg.parse_workers)] +
+            [asyncio.create_task(self._validate_worker()) for _ in range(cfg.validate_workers)] +
+            [asyncio.create_task(self._process_worker()) for _ in range(cfg.process_workers)] +
+            [asyncio.create_task(self._sink_worker()) for _ in range(cfg.sink_workers)]
+        )
+        reporter = asyncio.create_task(self._report_stats())
+        try:
+            loop = asyncio.get_running_loop()
+            async for payload in self.source:
+                self.counters["received"] += 1
+                await self.parse_queue.put(Envelope(payload, loop.time()))
+            for queue in (self.parse_queue, self.validate_queue,
+                          self.process_queue, self.sink_queue):
+                await queue.queue.join()
+            if hasattr(self.sink, "flush"):
+                self.sink.flush()   # buffered sinks write their partial frames
+        finally:
+            reporter.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(reporter, *workers, return_exceptions=True)
+        return self.stats()
+
+    async def _parse_worker(self) -> None:
+        while True:
+            envelope = await self.parse_queue.get()
+            try:
+                envelope.payload = json.loads(envelope.payload)
+                if not isinstance(envelope.payload, dict):
+                    raise ValueError("telemetry line is not a JSON object")
+            except ValueError:
+                self.counters["parse_errors"] += 1
+            else:
+                await self.validate_queue.put(envelope)
+            finally:
+                self.parse_queue.task_done()
+
+    async def _validate_worker(self) -> None:
+        while True:
+            envelope = await self.validate_queue.get()
+            try:
+                envelope.kind, envelope.record = build_record(envelope.payload)
+            except (ValueError, TypeError) as e:
+                self.counters["invalid"] += 1
+                self.logger.debug(f"Rejected telemetry record: {e}")
+            else:
+                await self.process_queue.put(envelope)
+            finally:
+                self.validate_queue.task_done()
+
+    async def _process_worker(self) -> None:
+        max_batch = max(1, self.config.max_batch)
+        while True:
+            envelopes = [await self.process_queue.get()]
+            envelopes.extend(self.process_queue.get_nowait_many(max_batch - 1))
+            try:
+                await self._process_envelopes(envelopes)
+            except Exception as e:
+                self.counters["process_errors"] += len(envelopes)
+                self.logger.error(f"Failed to process telemetry batch: {e}")
+            finally:
+                self.process_queue.task_done(len(envelopes))
+
+    async def _process_envelopes(self, envelopes: List[Envelope]) -> None:
+        by_kind: Dict[str, List[Envelope]] = {}
+        for envelope in envelopes:
+            by_kind.setdefault(envelope.kind, []).append(envelope)
+
+        for kind, group in by_kind.items():
+            records = [envelope.record for envelope in group]
+            if kind == "co2" and len(group) > 1:
+                outputs = [("co2_batch", await self.monitor.process_co2_metrics_batch(records))]
+            elif kind == "resource" and len(group) > 1:
+                outputs = [("resource_batch", await self.monitor.process_resource_metrics_batch(records))]
+            elif kind == "agad" and len(group) > 1:
+                outputs = [("agad_batch", await self.monitor.process_agad_phases_batch(records))]
+            elif kind == "co2":
+                outputs = [(kind, await self.monitor.process_co2_metrics(records[0], self.compact))]
+            elif kind == "resource":
+                outputs = [(kind, await self.monitor.process_resource_metrics(records[0], self.compact))]
+            else:
+                outputs = [(kind, await self.monitor.process_agad_phase(r, self.compact)) for r in records]
+            self.counters["processed"] += len(group)
+            self._record_lag(group)
+            for output in outputs:
+                await self.sink_queue.put(output)
+
+    def _record_lag(self, group: List[Envelope]) -> None:
+        now = asyncio.get_running_loop().time()
+        lag = now - group[0].received_at   # oldest item in the group
+        self.lag_max_s = max(self.lag_max_s, lag)
+        self.lag_ewma_s += 0.1 * (lag - self.lag_ewma_s)
+        self.event_lag_s = time.time() - group[-1].record.timestamp_utc
+
+    async def _sink_worker(self) -> None:
+        while True:
+            kind, result = await self.sink_queue.get()
+            try:
+                outcome = self.sink(kind, result)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+            except Exception as e:
+                self.counters["sink_errors"] += 1
+                self.logger.error(f"Telemetry sink failed: {e}")
+            finally:
+                self.sink_queue.task_done()
+
+    async def _report_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.stats_interval_s)
+            stats = self.stats()
+            depths = {name: q["depth"] for name, q in stats["queues"].items()}
+            self.logger.info(
+                f"Pipeline: processed={stats['counters']['processed']} "
+                f"depth={depths} lag_ewma={stats['lag']['ewma_s']:.3f}s "
+                f"event_lag={stats['lag']['event_s']:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depths, drop counts, stage counters and lag"""
+        return {
+            "counters": dict(self.counters),
+            "queues": {q.name: q.stats() for q in (self.parse_queue, self.validate_queue,
+                                                  self.process_queue, self.sink_queue)},
+            "lag": {"ewma_s": self.lag_ewma_s, "max_s": self.lag_max_s,
+                    "event_s": self.event_lag_s},
+        }
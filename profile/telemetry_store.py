@@ -0,0 +1,481 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Telemetry Store
+Append-only, segmented columnar storage for monitor telemetry with memory-mapped reads
+
+Layout (one table per stream)::
+
+    <root>/<stream>/_schema.json
+    <root>/<stream>/seg-000001/<field>.col   fixed-width little-endian column
+    <root>/<stream>/seg-000001/_ts.idx       sparse timestamp index (every N rows)
+    <root>/<stream>/seg-000001/_meta.json    row count, time range, sorted/sealed flags
+"""
+
+import dataclasses
+import json
+import os
+import re
+import shutil
+import typing
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+# Fixed byte widths for string columns (UTF-8, truncated to fit)
+STRING_WIDTHS = {
+    "phase_id": 32,
+    "verification_method": 64,
+    "validation_report": 128,
+}
+DEFAULT_STRING_WIDTH = 64
+
+TIMESTAMP_FIELD = "timestamp_utc"
+
+# Live segment directories; ".compact"/".old" leftovers of an interrupted
+# compaction are resolved when the table is opened (see ColumnTable._recover)
+_SEGMENT_NAME = re.compile(r"seg-[0-9]{6}")
+_COMPACT_SUFFIX = ".compact"
+_OLD_SUFFIX = ".old"
+
+
+def schema_for(record_type: Type) -> List[Tuple[str, str]]:
+    """Derive an ordered (field, dtype string) schema from a metric dataclass"""
+    schema = []
+    hints = typing.get_type_hints(record_type)   # resolves postponed (string) annotations
+    for field in dataclasses.fields(record_type):
+        field_type = hints[field.name]
+        if typing.get_origin(field_type) is typing.Union:   # Optional[X] -> X, None stored as NaN
+            field_type = next(t for t in typing.get_args(field_type) if t is not type(None))
+        if field_type is float:
+            dtype = "<f8"
+        elif field_type is int:
+            dtype = "<i8"
+        elif field_type is bool:
+            dtype = "|u1"
+        elif field_type is str:
+            dtype = f"|S{STRING_WIDTHS.get(field.name, DEFAULT_STRING_WIDTH)}"
+        else:
+            raise TypeError(f"{record_type.__name__}.{field.name}: unsupported type {field.type!r}")
+        schema.append((field.name, dtype))
+    return schema
+
+
+def _write_json_atomic(path: str, payload: Dict) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+class Segment:
+    """One directory of equally long column files"""
+
+    def __init__(self, path: str, schema: Sequence[Tuple[str, str]], index_stride: int):
+        self.path = path
+        self.schema = list(schema)
+        self.dtypes = {name: np.dtype(dtype) for name, dtype in schema}
+        self.index_stride = index_stride
+        self.rows = 0
+        self.min_ts: Optional[int] = None
+        self.max_ts: Optional[int] = None
+        self.sorted = True
+        self.sealed = False
+        self.replaces: List[str] = []   # compaction sources still to delete (see ColumnTable._recover)
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(self.path, "_meta.json")
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.path, "_ts.idx")
+
+    def column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.col")
+
+    @classmethod
+    def create(cls, path: str, schema, index_stride: int) -> "Segment":
+        os.makedirs(path, exist_ok=True)
+        segment = cls(path, schema, index_stride)
+        for name, _ in schema:
+            open(segment.column_path(name), "ab").close()
+        open(segment.index_path, "ab").close()
+        segment.write_meta()
+        return segment
+
+    @classmethod
+    def open(cls, path: str, schema, index_stride: int) -> "Segment":
+        segment = cls(path, schema, index_stride)
+        try:
+            with open(segment.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            # Interrupted create: recover what the column files hold as an
+            # unsealed segment (missing files are created empty)
+            meta = None
+            for name, _ in schema:
+                open(segment.column_path(name), "ab").close()
+            open(segment.index_path, "ab").close()
+        segment.sealed = meta.get("sealed", False) if meta else False
+        segment.index_stride = meta.get("index_stride", index_stride) if meta else index_stride
+        # Column files are the source of truth: a crash mid-flush may leave
+        # them uneven, so trim every column to the shortest complete length
+        rows = min(os.path.getsize(segment.column_path(name)) // segment.dtypes[name].itemsize
+                   for name, _ in schema)
+        for name, _ in schema:
+            expected = rows * segment.dtypes[name].itemsize
+            if os.path.getsize(segment.column_path(name)) != expected:
+                os.truncate(segment.column_path(name), expected)
+        segment.rows = rows
+        expected_index = -(-rows // segment.index_stride) * 8
+        if os.path.getsize(segment.index_path) != expected_index:
+            segment._rebuild_index()
+        if rows:
+            timestamps = segment.column(TIMESTAMP_FIELD)
+            segment.min_ts = int(timestamps.min())
+            segment.max_ts = int(timestamps.max())
+        if meta:
+            segment.sorted = meta.get("sorted", True)
+            segment.replaces = meta.get("replaces", [])
+        else:
+            segment.sorted = bool(rows < 2 or np.all(np.diff(segment.column(TIMESTAMP_FIELD)) >= 0))
+            segment.write_meta()
+        return segment
+
+    def write_meta(self) -> None:
+        _write_json_atomic(self.meta_path, {
+            "rows": self.rows,
+            "min_ts": self.min_ts,
+            "max_ts": self.max_ts,
+            "sorted": self.sorted,
+            "sealed": self.sealed,
+            "index_stride": self.index_stride,
+            "replaces": self.replaces,
+        })
+
+    def append(self, columns: Dict[str, np.ndarray], fsync: bool = False) -> None:
+        """Append equally long column arrays to the segment files"""
+        timestamps = columns[TIMESTAMP_FIELD]
+        count = len(timestamps)
+        if not count:
+            return
+        if self.sorted:
+            if np.any(np.diff(timestamps) < 0) or (
+                    self.max_ts is not None and timestamps[0] < self.max_ts):
+                self.sorted = False
+        for name, _ in self.schema:
+            with open(self.column_path(name), "ab") as f:
+                np.ascontiguousarray(columns[name], dtype=self.dtypes[name]).tofile(f)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        # Sparse index: timestamp of every index_stride-th row
+        first = -(-self.rows // self.index_stride) * self.index_stride - self.rows
+        sampled = np.asarray(timestamps[first::self.index_stride], dtype="<i8")
+        if len(sampled):
+            with open(self.index_path, "ab") as f:
+                sampled.tofile(f)
+        self.rows += count
+        low, high = int(timestamps.min()), int(timestamps.max())
+        self.min_ts = low if self.min_ts is None else min(self.min_ts, low)
+        self.max_ts = high if self.max_ts is None else max(self.max_ts, high)
+
+    def _rebuild_index(self) -> None:
+        with open(self.index_path, "wb") as f:
+            if self.rows:
+                np.asarray(self.column(TIMESTAMP_FIELD)[::self.index_stride], dtype="<i8").tofile(f)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of a whole column (nothing is loaded eagerly)"""
+        if self.rows == 0:
+            return np.empty(0, dtype=self.dtypes[name])
+        return np.memmap(self.column_path(name), dtype=self.dtypes[name], mode="r",
+                         shape=(self.rows,))
+
+    def sparse_index(self) -> np.ndarray:
+        if self.rows == 0:
+            return np.empty(0, dtype="<i8")
+        return np.fromfile(self.index_path, dtype="<i8")
+
+    def row_range(self, start_ts: int, end_ts: int) -> Optional[np.ndarray]:
+        """Rows with start_ts <= timestamp <= end_ts, as a slice or an index array"""
+        if self.rows == 0 or self.max_ts < start_ts or self.min_ts > end_ts:
+            return None
+        timestamps = self.column(TIMESTAMP_FIELD)
+        if not self.sorted:
+            return np.flatnonzero((timestamps >= start_ts) & (timestamps <= end_ts))
+        # Narrow to index blocks first, then binary search only inside them
+        index = self.sparse_index()
+        stride = self.index_stride
+        lo_block = max(int(np.searchsorted(index, start_ts, side="left")) - 1, 0)
+        hi_block = int(np.searchsorted(index, end_ts, side="right"))
+        lo, hi = lo_block * stride, min(hi_block * stride, self.rows)
+        window = timestamps[lo:hi]
+        start = lo + int(np.searchsorted(window, start_ts, side="left"))
+        end = lo + int(np.searchsorted(window, end_ts, side="right"))
+        return slice(start, end) if end > start else None
+
+
+class ColumnTable:
+    """Segmented append-only table for one telemetry stream"""
+
+    def __init__(self, path: str, schema: Sequence[Tuple[str, str]],
+                 segment_rows: int = 1 << 20, index_stride: int = 1024,
+                 flush_rows: int = 4096, fsync: bool = False):
+        self.path = path
+        self.schema = [(name, dtype) for name, dtype in schema]
+        self.fields = tuple(name for name, _ in self.schema)
+        self.segment_rows = segment_rows
+        self.index_stride = index_stride
+        self.flush_rows = flush_rows
+        self.fsync = fsync
+        self._pending: List[Dict[str, np.ndarray]] = []
+        self._pending_rows = 0
+        os.makedirs(path, exist_ok=True)
+        self._check_schema()
+        self.segments: List[Segment] = [
+            Segment.open(os.path.join(path, name), self.schema, index_stride)
+            for name in sorted(os.listdir(path)) if _SEGMENT_NAME.fullmatch(name)
+        ]
+        self._recover()
+
+    def _recover(self) -> None:
+        """Finish or roll back a compaction interrupted by a crash.
+
+        A merged segment lists the other segments it replaces until they are
+        deleted, so those go first. Then ``X.old`` is the original of a
+        merged ``X``: deleted when ``X`` is live, renamed back otherwise.
+        Any ``.compact`` directory left after that never went live.
+        """
+        live = {os.path.basename(s.path): s for s in self.segments}
+        for segment in list(self.segments):
+            if not segment.replaces:
+                continue
+            for name in segment.replaces:
+                for leftover in (name, name + _OLD_SUFFIX):
+                    path = os.path.join(self.path, leftover)
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                if name in live:
+                    self.segments.remove(live.pop(name))
+            segment.replaces = []
+            segment.write_meta()
+        for name in sorted(os.listdir(self.path)):
+            path = os.path.join(self.path, name)
+            if name.endswith(_OLD_SUFFIX) and _SEGMENT_NAME.fullmatch(name[:-len(_OLD_SUFFIX)]):
+                original = name[:-len(_OLD_SUFFIX)]
+                if original in live:
+                    shutil.rmtree(path)
+                else:
+                    os.replace(path, os.path.join(self.path, original))
+                    live[original] = Segment.open(os.path.join(self.path, original), self.schema,
+                                                  self.index_stride)
+        for name in os.listdir(self.path):
+            if name.endswith(_COMPACT_SUFFIX):
+                shutil.rmtree(os.path.join(self.path, name))
+        self.segments = [live[name] for name in sorted(live)]
+
+    def _check_schema(self) -> None:
+        schema_path = os.path.join(self.path, "_schema.json")
+        if os.path.exists(schema_path):
+            with open(schema_path, "r", encoding="utf-8") as f:
+                stored = [tuple(item) for item in json.load(f)]
+            if stored != self.schema:
+                raise ValueError(f"Schema mismatch for telemetry table {self.path}")
+        else:
+            _write_json_atomic(schema_path, self.schema)
+
+    def _next_segment_path(self) -> str:
+        last = int(self.segments[-1].path.rsplit("-", 1)[1]) if self.segments else 0
+        return os.path.join(self.path, f"seg-{last + 1:06d}")
+
+    def _active_segment(self) -> Segment:
+        if not self.segments or self.segments[-1].sealed:
+            self.segments.append(Segment.create(self._next_segment_path(), self.schema,
+                                                self.index_stride))
+        return self.segments[-1]
+
+    @property
+    def rows(self) -> int:
+        return sum(segment.rows for segment in self.segments) + self._pending_rows
+
+    def append(self, record) -> None:
+        """Buffer one record (dataclass instance); flushed every ``flush_rows``"""
+        self.append_columns({name: np.asarray([_encode(getattr(record, name))])
+                             for name in self.fields})
+
+    def append_columns(self, columns: Dict[str, Any]) -> None:
+        """Buffer a column batch (mapping of field -> array)"""
+        batch = {name: np.asarray([_encode(v) for v in columns[name]])
+                 if (self._is_text(name) and not _is_bytes(columns[name])) or _has_none(columns[name])
+                 else np.asarray(columns[name])
+                 for name in self.fields}
+        self._pending.append(batch)
+        self._pending_rows += len(batch[TIMESTAMP_FIELD])
+        if self._pending_rows >= self.flush_rows:
+            self.flush()
+
+    def _is_text(self, name: str) -> bool:
+        return dict(self.schema)[name].startswith("|S")
+
+    def flush(self) -> None:
+        """Write buffered rows to disk, rolling over full segments"""
+        if not self._pending:
+            return
+        columns = {name: np.concatenate([batch[name] for batch in self._pending])
+                   for name in self.fields}
+        self._pending, self._pending_rows = [], 0
+        offset, total = 0, len(columns[TIMESTAMP_FIELD])
+        while offset < total:
+            segment = self._active_segment()
+            take = min(total - offset, self.segment_rows - segment.rows)
+            segment.append({name: values[offset:offset + take] for name, values in columns.items()},
+                           fsync=self.fsync)
+            offset += take
+            if segment.rows >= self.segment_rows:
+                segment.sealed = True
+            segment.write_meta()
+
+    def query(self, start_ts: int, end_ts: int,
+              fields: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """All rows with start_ts <= timestamp <= end_ts (segment order)"""
+        names = tuple(fields or self.fields)
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        for segment, rows in self.scan(start_ts, end_ts):
+            for name in names:
+                parts[name].append(np.asarray(segment.column(name)[rows]))
+        return {name: (np.concatenate(chunks) if chunks
+                       else np.empty(0, dtype=dict(self.schema)[name]))
+                for name, chunks in parts.items()}
+
+    def scan(self, start_ts: int, end_ts: int) -> Iterator[Tuple[Segment, Any]]:
+        """Yield (segment, rows) pairs for lazy, per-segment memmap access"""
+        self.flush()
+        for segment in self.segments:
+            rows = segment.row_range(start_ts, end_ts)
+            if rows is not None:
+                yield segment, rows
+
+    def tail(self, n: int, fields: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Newest ``n`` rows in append order, e.g. to warm-start ring buffers"""
+        self.flush()
+        names = tuple(fields or self.fields)
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        remaining = n
+        for segment in reversed(self.segments):
+            if remaining <= 0:
+                break
+            take = min(remaining, segment.rows)
+            for name in names:
+                parts[name].insert(0, np.asarray(segment.column(name)[segment.rows - take:]))
+            remaining -= take
+        return {name: (np.concatenate(chunks) if chunks
+                       else np.empty(0, dtype=dict(self.schema)[name]))
+                for name, chunks in parts.items()}
+
+    def compact(self, target_rows: Optional[int] = None) -> int:
+        """Merge runs of small sealed segments into time-sorted segments.
+
+        The active (unsealed) segment is left alone. Returns the number of
+        segments removed.
+        """
+        self.flush()
+        target_rows = target_rows or self.segment_rows
+        sealed = [s for s in self.segments if s.sealed]
+        groups: List[List[Segment]] = []
+        current: List[Segment] = []
+        for segment in sealed:
+            if current and sum(s.rows for s in current) + segment.rows > target_rows:
+                groups.append(current)
+                current = []
+            current.append(segment)
+        if current:
+            groups.append(current)
+
+        removed = 0
+        for group in groups:
+            if len(group) == 1 and group[0].sorted:
+                continue
+            columns = {name: np.concatenate([np.asarray(s.column(name)) for s in group])
+                       for name in self.fields}
+            order = np.argsort(columns[TIMESTAMP_FIELD], kind="stable")
+            merged_path = group[0].path + _COMPACT_SUFFIX
+            if os.path.exists(merged_path):
+                shutil.rmtree(merged_path)
+            merged = Segment.create(merged_path, self.schema, self.index_stride)
+            merged.append({name: values[order] for name, values in columns.items()},
+                          fsync=self.fsync)
+            merged.sealed = True
+            merged.replaces = [os.path.basename(s.path) for s in group[1:]]
+            merged.write_meta()
+            # Swap in the merged segment under the first segment's name. Every
+            # step can be recovered on open: the first original is only parked
+            # as ".old" until the merged copy is live, and the merged copy
+            # records the other originals until they are gone
+            old_path = group[0].path + _OLD_SUFFIX
+            os.replace(group[0].path, old_path)
+            os.replace(merged_path, group[0].path)
+            merged.path = group[0].path
+            shutil.rmtree(old_path)
+            for segment in group[1:]:
+                shutil.rmtree(segment.path)
+            merged.replaces = []
+            merged.write_meta()
+            position = self.segments.index(group[0])
+            self.segments[position:position + len(group)] = [merged]
+            removed += len(group) - 1
+        return removed
+
+
+def _encode(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return value
+
+
+def _is_bytes(values) -> bool:
+    return isinstance(values, np.ndarray) and values.dtype.kind == "S"
+
+
+def _has_none(values) -> bool:
+    return isinstance(values, (list, tuple)) and any(v is None for v in values)
+
+
+def decode_text(values: np.ndarray) -> List[str]:
+    """Decode a fixed-width bytes column back to Python strings"""
+    return [v.decode("utf-8", errors="replace") for v in values.tolist()]
+
+
+class TelemetryStore:
+    """Column tables for the monitor's co2, resource and agad streams"""
+
+    def __init__(self, root: str, record_types: Dict[str, Type], **table_options):
+        self.root = root
+        self.record_types = dict(record_types)
+        self.tables = {
+            stream: ColumnTable(os.path.join(root, stream), schema_for(record_type),
+                                **table_options)
+            for stream, record_type in self.record_types.items()
+        }
+
+    def __getitem__(self, stream: str) -> ColumnTable:
+        return self.tables[stream]
+
+    def append(self, stream: str, record) -> None:
+        self.tables[stream].append(record)
+
+    def append_columns(self, stream: str, columns: Dict[str, Any]) -> None:
+        self.tables[stream].append_columns(columns)
+
+    def query(self, stream: str, start_ts: int, end_ts: int,
+              fields: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        return self.tables[stream].query(start_ts, end_ts, fields)
+
+    def flush(self) -> None:
+        for table in self.tables.values():
+            table.flush()
+
+    def compact(self) -> Dict[str, int]:
+        return {stream: table.compact() for stream, table in self.tables.items()}
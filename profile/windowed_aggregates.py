@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+GAIA-Q Windowed Aggregates
+Incremental rolling statistics over GA-SToP-CO2 metric streams
+"""
+
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Quantiles reported by StreamAggregator.snapshot()
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch with bounded relative error.
+
+    Values map to bucket ``ceil(log_gamma(|v|))`` (DDSketch-style), so any
+    reported quantile is within ``relative_accuracy`` of a true sample value.
+    Buckets are plain counters, which makes removal as cheap as insertion and
+    lets the sketch follow a sliding window.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _bucket(self, value: float) -> Tuple[Optional[Dict[int, int]], int]:
+        magnitude = abs(value)
+        if magnitude < self.min_value:
+            return None, 0
+        store = self.positive if value > 0 else self.negative
+        return store, math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def add(self, value: float) -> None:
+        store, key = self._bucket(value)
+        if store is None:
+            self.zero_count += 1
+        else:
+            store[key] = store.get(key, 0) + 1
+        self.count += 1
+
+    def remove(self, value: float) -> None:
+        store, key = self._bucket(value)
+        if store is None:
+            self.zero_count -= 1
+        else:
+            remaining = store[key] - 1
+            if remaining:
+                store[key] = remaining
+            else:
+                del store[key]
+        self.count -= 1
+
+    def _bucket_counts(self, values: np.ndarray):
+        """Vectorized bucketing: yields (store, keys, counts) and the zero count"""
+        magnitude = np.abs(values)
+        nonzero = magnitude >= self.min_value
+        zeros = int(len(values) - np.count_nonzero(nonzero))
+        groups = []
+        for store, mask in ((self.positive, nonzero & (values > 0)),
+                            (self.negative, nonzero & (values < 0))):
+            if mask.any():
+                keys = np.ceil(np.log(magnitude[mask]) / self._log_gamma).astype(np.int64)
+                unique, counts = np.unique(keys, return_counts=True)
+                groups.append((store, unique.tolist(), counts.tolist()))
+        return groups, zeros
+
+    def add_many(self, values: np.ndarray) -> None:
+        groups, zeros = self._bucket_counts(values)
+        for store, keys, counts in groups:
+            for key, count in zip(keys, counts):
+                store[key] = store.get(key, 0) + count
+        self.zero_count += zeros
+        self.count += len(values)
+
+    def remove_many(self, values: np.ndarray) -> None:
+        groups, zeros = self._bucket_counts(values)
+        for store, keys, counts in groups:
+            for key, count in zip(keys, counts):
+                remaining = store[key] - count
+                if remaining:
+                    store[key] = remaining
+                else:
+                    del store[key]
+        self.zero_count -= zeros
+        self.count -= len(values)
+
+    def _value(self, key: int) -> float:
+        # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._value(key)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class _Chunk:
+    """Samples appended together; single samples are tuples, batches are arrays"""
+    __slots__ = ("timestamps", "values", "start", "total")
+
+    def __init__(self, timestamps, values, total: float):
+        self.timestamps = timestamps
+        self.values = values
+        self.start = 0
+        self.total = total
+
+
+class RollingWindow:
+    """Time-windowed rolling statistics with O(1) amortized updates.
+
+    Keeps a running sum, monotonic deques for min/max, a time-decayed EWMA
+    and a QuantileSketch. Samples older than ``window_s`` relative to the
+    newest timestamp are evicted as new samples arrive. Batches are folded in
+    with array operations and stored as one chunk, so ingesting N samples
+    costs a handful of NumPy calls rather than N Python-level updates.
+    """
+
+    def __init__(self, window_s: float, ewma_tau_s: Optional[float] = None,
+                 relative_accuracy: float = 0.01):
+        self.window_s = float(window_s)
+        self.ewma_tau_s = float(ewma_tau_s or window_s)
+        self.relative_accuracy = relative_accuracy
+        self.clear()
+
+    def clear(self) -> None:
+        self._chunks: deque = deque()
+        self._count = 0
+        self._min: deque = deque()       # (timestamp, value), increasing values
+        self._max: deque = deque()       # (timestamp, value), decreasing values
+        self.sketch = QuantileSketch(self.relative_accuracy)
+        self.total = 0.0
+        self.ewma: Optional[float] = None
+        self.last_timestamp: Optional[float] = None
+
+    def add(self, timestamp: float, value: float) -> None:
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            timestamp = self.last_timestamp   # clamp late samples into the current window
+
+        if self.ewma is None:
+            self.ewma = value
+        else:
+            # timestamp_utc has one-second resolution; same-second samples count as 1 s apart
+            dt = max(timestamp - self.last_timestamp, 1.0)
+            self.ewma += (1.0 - math.exp(-dt / self.ewma_tau_s)) * (value - self.ewma)
+        self.last_timestamp = timestamp
+
+        self._evict(timestamp - self.window_s)
+        self._chunks.append(_Chunk((timestamp,), (value,), value))
+        self._count += 1
+        self.total += value
+        self.sketch.add(value)
+        while self._min and self._min[-1][1] > value:
+            self._min.pop()
+        self._min.append((timestamp, value))
+        while self._max and self._max[-1][1] < value:
+            self._max.pop()
+        self._max.append((timestamp, value))
+
+    def add_many(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        """Fold a batch in; the result matches calling add() per sample"""
+        if len(values) == 0:
+            return
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if self.last_timestamp is not None:
+            timestamps = np.maximum(timestamps, self.last_timestamp)
+        timestamps = np.maximum.accumulate(timestamps)
+        self._fold_ewma(timestamps, values)
+        self.last_timestamp = float(timestamps[-1])
+
+        # Only samples still inside the window after the batch can matter
+        cutoff = self.last_timestamp - self.window_s
+        keep = int(np.searchsorted(timestamps, cutoff, side="right"))
+        timestamps, values = timestamps[keep:], values[keep:]
+        self._evict(cutoff)
+        if len(values) == 0:
+            return
+
+        total = float(values.sum())
+        self._chunks.append(_Chunk(timestamps, values, total))
+        self._count += len(values)
+        self.total += total
+        self.sketch.add_many(values)
+        self._merge_extrema(self._min, timestamps, values, np.minimum, np.greater)
+        self._merge_extrema(self._max, timestamps, values, np.maximum, np.less)
+
+    def _fold_ewma(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        if self.ewma is None:
+            self.ewma = float(values[0])
+            previous = timestamps[0]
+            timestamps, values = timestamps[1:], values[1:]
+        else:
+            previous = self.last_timestamp
+        if len(values) == 0:
+            return
+        dt = np.diff(timestamps, prepend=previous)
+        decay = np.maximum(dt, 1.0) / self.ewma_tau_s
+        elapsed = np.cumsum(decay)
+        # e_n = e_0 * exp(-C_n) + sum_j (1 - exp(-c_j)) * x_j * exp(-(C_n - C_j))
+        weights = -np.expm1(-decay) * np.exp(elapsed - elapsed[-1])
+        self.ewma = float(self.ewma * math.exp(-elapsed[-1]) + np.dot(weights, values))
+
+    @staticmethod
+    def _merge_extrema(extrema: deque, timestamps: np.ndarray, values: np.ndarray,
+                       accumulate, dominated) -> None:
+        # A sample stays a min (max) candidate only if no later sample is smaller (larger)
+        suffix = accumulate.accumulate(values[::-1])[::-1]
+        candidates = np.ones(len(values), dtype=bool)
+        candidates[:-1] = ~dominated(values[:-1], suffix[1:])
+        best = float(suffix[0])
+        while extrema and dominated(extrema[-1][1], best):
+            extrema.pop()
+        extrema.extend(zip(timestamps[candidates].tolist(), values[candidates].tolist()))
+
+    def _evict(self, cutoff: float) -> None:
+        chunks = self._chunks
+        while chunks:
+            chunk = chunks[0]
+            if chunk.timestamps[-1] <= cutoff:
+                chunks.popleft()
+                live = chunk.values[chunk.start:]
+                self._count -= len(live)
+                self.total -= chunk.total
+                if len(live) == 1:
+                    self.sketch.remove(live[0])
+                else:
+                    self.sketch.remove_many(live)
+                continue
+            if chunk.timestamps[chunk.start] <= cutoff:
+                # Partial expiry only happens inside batch (array) chunks
+                end = int(np.searchsorted(chunk.timestamps, cutoff, side="right"))
+                expired = chunk.values[chunk.start:end]
+                removed = float(expired.sum())
+                chunk.total -= removed
+                self.total -= removed
+                self._count -= len(expired)
+                self.sketch.remove_many(expired)
+                chunk.start = end
+            break
+        while self._min and self._min[0][0] <= cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] <= cutoff:
+            self._max.popleft()
+        if not chunks:
+            self.total = 0.0   # drop accumulated rounding error
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Live samples plus EWMA state, enough to rebuild the window exactly"""
+        timestamps, values = [], []
+        for chunk in self._chunks:
+            timestamps.append(np.asarray(chunk.timestamps[chunk.start:], dtype=np.float64))
+            values.append(np.asarray(chunk.values[chunk.start:], dtype=np.float64))
+        scalars = [np.nan if self.ewma is None else self.ewma,
+                   np.nan if self.last_timestamp is None else self.last_timestamp]
+        return {
+            "timestamps": np.concatenate(timestamps) if timestamps else np.empty(0),
+            "values": np.concatenate(values) if values else np.empty(0),
+            "scalars": np.array(scalars, dtype=np.float64),
+        }
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        self.clear()
+        self.add_many(state["timestamps"], state["values"])
+        ewma, last_timestamp = state["scalars"].tolist()
+        self.ewma = None if np.isnan(ewma) else ewma
+        self.last_timestamp = None if np.isnan(last_timestamp) else last_timestamp
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self._count if self._count else None
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.sketch.quantile(q)
+
+    def summary(self, quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        result = {
+            "count": self._count,
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "ewma": self.ewma,
+        }
+        for q in quantiles:
+            result[f"p{round(q * 100):d}"] = self.quantile(q)
+        return result
+
+
+class StreamAggregator:
+    """Rolling aggregates for every numeric field of a metric stream.
+
+    One RollingWindow is kept per (field, window) pair and updated as samples
+    are ingested, so dashboards can read 24 h means or p95 risk indices
+    without scanning the raw buffers.
+    """
+
+    def __init__(self, fields: Iterable[str], windows: Dict[str, float],
+                 timestamp_field: str = "timestamp_utc", relative_accuracy: float = 0.01):
+        self.fields = tuple(f for f in fields if f != timestamp_field)
+        self.timestamp_field = timestamp_field
+        self.windows = dict(windows)
+        self._rolling: Dict[str, Dict[str, RollingWindow]] = {
+            field: {name: RollingWindow(seconds, relative_accuracy=relative_accuracy)
+                    for name, seconds in self.windows.items()}
+            for field in self.fields
+        }
+
+    @staticmethod
+    def hours_windows(**hours: float) -> Dict[str, float]:
+        """Name windows after their length, e.g. ``{"24h": 86400.0}``"""
+        return {f"{h:g}h": h * 3600.0 for h in hours.values()}
+
+    def update(self, record) -> None:
+        """Fold one sample (dataclass instance) into every window"""
+        timestamp = getattr(record, self.timestamp_field)
+        for field in self.fields:
+            value = getattr(record, field)
+            for window in self._rolling[field].values():
+                window.add(timestamp, value)
+
+    def update_columns(self, columns) -> None:
+        """Fold a column batch (mapping of field -> array) into every window"""
+        timestamps = np.asarray(columns[self.timestamp_field], dtype=np.float64)
+        for field in self.fields:
+            values = np.asarray(columns[field], dtype=np.float64)
+            for window in self._rolling[field].values():
+                window.add_many(timestamps, values)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Flat ``{"field/window/part": array}`` state for snapshots"""
+        return {
+            f"{field}/{name}/{part}": array
+            for field, windows in self._rolling.items()
+            for name, window in windows.items()
+            for part, array in window.get_state().items()
+        }
+
+    def set_state(self, state: Dict[str, np.ndarray]) -> None:
+        for field, windows in self._rolling.items():
+            for name, window in windows.items():
+                prefix = f"{field}/{name}/"
+                parts = {key[len(prefix):]: value for key, value in state.items()
+                         if key.startswith(prefix)}
+                if parts:
+                    window.set_state(parts)
+
+    def window(self, field: str, window: str) -> RollingWindow:
+        return self._rolling[field][window]
+
+    def snapshot(self, window: Optional[str] = None,
+                 quantiles: Iterable[float] = DEFAULT_QUANTILES) -> Dict[str, Dict]:
+        """Current aggregates as ``{field: {window: summary}}``"""
+        names = self.windows if window is None else (window,)
+        return {
+            field: {name: self._rolling[field][name].summary(quantiles) for name in names}
+            for field in self.fields
+        }
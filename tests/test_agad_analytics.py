@@ -0,0 +1,116 @@
+import asyncio
+import os
+import sys
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from agad_analytics import COVERAGE_BINS, agad_columns, method_validity, phase_analytics  # noqa: E402
+from agad_matrix import load_matrix, phase_key  # noqa: E402
+from sustainability_ai_monitor import AGADPhaseData, SustainabilityAIMonitor  # noqa: E402
+
+
+def records(count=500, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = load_matrix()
+    entries = list(matrix.entries.values())
+    samples = []
+    for i in range(count):
+        entry = entries[int(rng.integers(len(entries)))]
+        phase_id = (entry.phase_id, f"AGAD {entry.phase}", str(entry.phase), "AGAD 99")[i % 4]
+        method = (entry.verification_methods[0] if entry.verification_methods and i % 3 else "NotAMethod")
+        coverage = None if i % 7 == 0 else float(rng.choice([0.0, 55.5, 80.0, 80.5, 99.0, 100.0]))
+        samples.append(AGADPhaseData(phase_id, entry.trl, method, f"r{i}.pdf",
+                                     bool(rng.random() < 0.6), coverage, i))
+    return samples
+
+
+def brute_force(samples, valid):
+    groups = defaultdict(list)
+    for sample, code in zip(samples, valid):
+        groups[(phase_key(sample.phase_id) or sample.phase_id, sample.trl_level)].append((sample, code))
+    return groups
+
+
+def test_phase_analytics_matches_per_record_grouping():
+    samples = records()
+    matrix = load_matrix()
+    columns = agad_columns(samples)
+    valid = method_validity(matrix, columns)
+    result = phase_analytics({**columns, "method_valid": valid})
+    expected = brute_force(samples, valid.tolist())
+    bins = len(COVERAGE_BINS) - 1
+
+    groups = result["groups"]
+    keys = list(zip(groups["phase"].tolist(), groups["trl_level"].tolist()))
+    assert sorted(keys) == sorted(expected)
+    for i, key in enumerate(keys):
+        rows = expected[key]
+        ready = [s.passed and (s.coverage_percentage or 0) > 80 for s, _ in rows]
+        covered = sorted(s.coverage_percentage for s, _ in rows if s.coverage_percentage is not None)
+        assert groups["count"][i] == len(rows)
+        assert groups["passed"][i] == sum(s.passed for s, _ in rows)
+        assert groups["pass_rate"][i] == pytest.approx(np.mean([s.passed for s, _ in rows]))
+        assert groups["ready"][i] == sum(ready)
+        assert groups["unexpected_methods"][i] == sum(code == 0 for _, code in rows)
+        assert groups["coverage_count"][i] == len(covered)
+        if covered:
+            assert groups["coverage_mean"][i] == pytest.approx(np.mean(covered))
+            assert groups["coverage_p50"][i] == pytest.approx(np.percentile(covered, 50))
+            assert groups["coverage_p90"][i] == pytest.approx(np.percentile(covered, 90))
+            histogram = np.zeros(bins, dtype=np.int64)
+            for value in covered:
+                histogram[min(int(value // (100.0 / bins)), bins - 1)] += 1
+            assert groups["coverage_histogram"][i].tolist() == histogram.tolist()
+        else:
+            assert np.isnan(groups["coverage_mean"][i]) and np.isnan(groups["coverage_p50"][i])
+
+    assert result["count"] == len(samples)
+    assert result["pass_rate"] == pytest.approx(np.mean([s.passed for s in samples]))
+    phases = dict(zip(result["phases"]["phase"].tolist(), result["phases"]["count"].tolist()))
+    assert phases == {phase: sum(len(rows) for (p, _), rows in expected.items() if p == phase)
+                      for phase, _ in expected}
+
+
+def test_method_validity_matches_check_method():
+    samples = records()
+    matrix = load_matrix()
+
+    codes = method_validity(matrix, agad_columns(samples)).tolist()
+
+    expected = [matrix.check_method(s.phase_id, s.trl_level, s.verification_method) for s in samples]
+    assert codes == [-1 if e is None else int(e) for e in expected]
+    assert {-1, 0, 1} == set(codes)
+
+
+def test_batch_progression_matches_per_record_processing():
+    samples = records(120, seed=1)
+
+    async def run():
+        single, batched = SustainabilityAIMonitor(config={}), SustainabilityAIMonitor(config={})
+        expected = [await single.process_agad_phase(sample) for sample in samples]
+        return expected, await batched.process_agad_phases_batch(samples), single, batched
+
+    expected, result, single, batched = asyncio.run(run())
+    progression = result["progression_analysis"]
+
+    for i, sample in enumerate(expected):
+        analysis = sample["progression_analysis"]
+        assert progression["phase_completion_status"][i] == analysis["phase_completion_status"]
+        assert progression["trl_advancement"][i] == analysis["trl_advancement"]
+        assert progression["verification_completeness"][i] == analysis["verification_completeness"]
+        assert bool(progression["next_phase_readiness"][i]) == analysis["next_phase_readiness"]
+        valid = analysis["verification_method_valid"]
+        assert progression["verification_method_valid"][i] == (-1 if valid is None else int(valid))
+    for name, column in single.agad_store.window().items():
+        np.testing.assert_array_equal(batched.agad_store.window()[name], column)
+
+
+def test_empty_input_gives_empty_analytics():
+    result = phase_analytics(agad_columns([]))
+
+    assert result["count"] == 0 and result["pass_rate"] is None
+    assert len(result["groups"]["phase"]) == 0
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import threading
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+import agad_matrix  # noqa: E402
+from agad_matrix import DEFAULT_TABLE, load_matrix, parse_table  # noqa: E402
+from monitor_snapshot import read_snapshot, write_snapshot  # noqa: E402
+
+
+def copy_table(tmp_path):
+    path = str(tmp_path / "AGAD-TRL-VV-TABLE.md")
+    shutil.copy(DEFAULT_TABLE, path)
+    return path
+
+
+def test_truncated_cache_is_a_cache_miss(tmp_path):
+    path = copy_table(tmp_path)
+    expected = load_matrix(path).entries
+    cache = agad_matrix._cache_path(path)
+    size = os.path.getsize(cache)
+
+    for cut in (0, 5, 13, size // 2, size - 1):
+        with open(cache, "r+b") as f:
+            f.truncate(cut)
+        agad_matrix._LOADED.clear()
+        assert load_matrix(path).entries == expected
+        assert os.path.getsize(cache) == size
+
+
+def test_cached_matrix_matches_parsed_table(tmp_path):
+    path = copy_table(tmp_path)
+    load_matrix(path)
+    agad_matrix._LOADED.clear()
+
+    cached = load_matrix(path)
+
+    assert os.path.exists(agad_matrix._cache_path(path))
+    assert list(cached.entries.values()) == parse_table(path)
+
+
+def test_validate_batch_matches_check_method():
+    matrix = load_matrix()
+    entries = list(matrix.entries.values())
+    phase_ids, trls, methods = [], [], []
+    for n, entry in enumerate(entries):
+        method = entry.verification_methods[0] if entry.verification_methods else "Analysis"
+        phase_ids += [entry.phase_id, f"AGAD {entry.phase}", "AGAD 99"]
+        trls += [entry.trl, entry.trl, entry.trl]
+        methods += [method, "NotAMethod" if n % 2 else method.lower(), method]
+
+    masks = matrix.validate_batch(phase_ids, trls, methods)
+
+    expected = [matrix.check_method(p, t, m) for p, t, m in zip(phase_ids, trls, methods)]
+    assert masks["known"].tolist() == [e is not None for e in expected]
+    assert masks["valid"].tolist() == [bool(e) for e in expected]
+    assert masks["valid"].any() and not masks["valid"].all()
+
+
+def test_concurrent_snapshot_writers_do_not_share_a_temp_file(tmp_path):
+    path = str(tmp_path / "shared.snapshot")
+    errors = []
+
+    def writer(n):
+        try:
+            for _ in range(20):
+                write_snapshot(path, {"values": np.full(4096, n)}, fsync=False)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert os.listdir(str(tmp_path)) == ["shared.snapshot"]
+    values = read_snapshot(path)["values"]
+    assert len(set(values.tolist())) == 1
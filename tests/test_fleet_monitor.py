@@ -0,0 +1,54 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from fleet_monitor import _ShardState, asset_config  # noqa: E402
+from sustainability_ai_monitor import CO2Metrics  # noqa: E402
+
+
+def write_config(tmp_path, **config):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def test_assets_get_their_own_store(tmp_path):
+    store_root = str(tmp_path / "store")
+    config_path = write_config(tmp_path, telemetry_store={"path": store_root, "flush_rows": 1})
+
+    async def run():
+        state = _ShardState(0, config_path)
+        items = [(asset, CO2Metrics(40.0 + i, 89.5, 42.1, 12.3, 1000 * n + i))
+                 for i in range(5) for n, asset in enumerate(("A-1", "B/2"))]
+        await state.handle("co2", items)
+        for monitor in state.assets.values():
+            monitor.close()
+        state.executor.shutdown()
+
+        restarted = _ShardState(0, config_path)
+        return {asset: (await restarted.monitor_for(asset)).warm_start_from_store()
+                for asset in ("A-1", "B/2")}, restarted
+
+    loaded, state = asyncio.run(run())
+
+    assert sorted(os.listdir(store_root)) == ["asset-A-1", "asset-B%2F2"]
+    assert loaded["A-1"]["co2"] == loaded["B/2"]["co2"] == 5
+    for n, asset in enumerate(("A-1", "B/2")):
+        timestamps = state.assets[asset].co2_buffer.column("timestamp_utc")
+        assert list(timestamps) == [1000 * n + i for i in range(5)]
+    state.executor.shutdown()
+
+
+def test_asset_config_shrinks_capacities_and_keeps_overrides():
+    config = {"agad_capacity": 10000, "training": {"batch_size": 32, "replay_capacity": 4096},
+              "fleet": {"asset": {"training": {"replay_capacity": 64}}}}
+
+    result = asset_config(config, "A-1")
+
+    assert result["agad_capacity"] == 256
+    assert result["training"] == {"batch_size": 32, "replay_capacity": 64}
+    assert "telemetry_store" not in result
+    assert config["training"]["replay_capacity"] == 4096
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from frontmatter_index import FrontMatterIndex, parse_front_matter, read_front_matter  # noqa: E402
+from metadata_check_insert import find_markdown  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FRONT_MATTER = [
+    "id: DOC-1\ntitle: \"A: quoted, title\"\nversion: 1.0\n",
+    "tags: [a, \"b, c\", d]\nrelated:\n  - DOC-2\n  - 'DOC-3'\nstatus:\n",
+    "# comment\n\nowner: ops\nauthors:\n- x\n- y\nempty: \"\"\n",
+]
+
+
+def front_matter_lines(path):
+    with open(path, encoding="utf-8-sig") as f:
+        lines = f.read().splitlines(keepends=True)
+    start = next(i for i, line in enumerate(lines) if line.strip())
+    end = next(i for i in range(start + 1, len(lines)) if lines[i].rstrip() in ("---", "..."))
+    return lines[start + 1:end]
+
+
+@pytest.mark.parametrize("text", FRONT_MATTER)
+def test_fast_parser_matches_yaml_base_loader(text):
+    yaml = pytest.importorskip("yaml")
+    lines = text.splitlines(keepends=True)
+
+    assert parse_front_matter(lines) == yaml.load(text, Loader=yaml.BaseLoader)
+
+
+def test_repository_documents_parse_like_yaml():
+    yaml = pytest.importorskip("yaml")
+    parsed = 0
+    for path in find_markdown(REPO):
+        meta = read_front_matter(path)
+        if meta is None:
+            continue
+        lines = front_matter_lines(path)
+        assert meta == yaml.load("".join(lines), Loader=yaml.BaseLoader), path
+        parsed += 1
+    assert parsed
+
+
+def write(path, meta, body="body\n"):
+    path.write_text(f"---\n{meta}---\n{body}", encoding="utf-8")
+
+
+def test_saved_index_reloads_and_updates_incrementally(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "a.md", "id: A\ntags: [x]\nrelated: [B, C]\nstatus: draft\n")
+    write(docs / "b.md", "tags: [x, y]\n")
+    write(docs / "c.md", "id: A\n")
+    (docs / "plain.md").write_text("no front matter\n", encoding="utf-8")
+    index_path = str(tmp_path / "index.json")
+
+    index = FrontMatterIndex(index_path)
+    assert index.update([str(docs)])["parsed"] == 4
+    index.save()
+
+    reloaded = FrontMatterIndex(index_path)
+    assert reloaded.docs == index.docs
+    assert reloaded.by_tag("x") == ["A", "b"]
+    assert reloaded.by_status("DRAFT") == ["A"]
+    assert reloaded.backlinks("B") == ["A"]
+    assert reloaded.dangling() == [("A", "B"), ("A", "C")]
+    assert list(reloaded.duplicate_ids()) == ["A"]
+
+    write(docs / "b.md", "id: B\ntags: [y]\n", body="edited body\n")
+    os.remove(docs / "c.md")
+    stats = reloaded.update([str(docs)])
+
+    assert (stats["reused"], stats["parsed"], stats["removed"]) == (2, 1, 1)
+    assert reloaded.by_tag("x") == ["A"]
+    assert reloaded.related("A") == [("B", 1), ("C", 1)]
+    assert reloaded.dangling() == [("A", "C")]
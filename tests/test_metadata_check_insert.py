@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from metadata_check_insert import (  # noqa: E402
+    HEAD_BYTES,
+    file_has_yaml_metadata,
+    has_yaml_metadata,
+    insert_metadata,
+    main,
+)
+
+BOM = "\ufeff"
+
+TEXTS = [
+    "---\ntitle: x\n---\nbody\n",
+    "\n\n  ---\n",
+    " \n---\n",
+    " " * (3 * HEAD_BYTES) + "---\n",
+    " " * (3 * HEAD_BYTES) + "body\n",
+    "# Title\n---\n",
+    "--",
+    "",
+    "é" * HEAD_BYTES + "\n",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_streamed_detection_matches_text_check(tmp_path, text):
+    path = tmp_path / "doc.md"
+    path.write_text(text, encoding="utf-8")
+    assert file_has_yaml_metadata(str(path)) == has_yaml_metadata(text)
+
+    path.write_text(BOM + text, encoding="utf-8")
+    assert file_has_yaml_metadata(str(path)) == has_yaml_metadata(text)
+
+
+def test_insert_keeps_the_bom_first(tmp_path):
+    path = tmp_path / "doc.md"
+    path.write_bytes((BOM + "# Title\nbody\n").encode("utf-8"))
+
+    assert insert_metadata(str(path), fsync=False, verbose=False) == "inserted"
+
+    text = path.read_bytes().decode("utf-8")
+    assert text.startswith(BOM + "---\ntitle:")
+    assert text.count(BOM) == 1
+    assert text.endswith("\n# Title\nbody\n")
+    assert file_has_yaml_metadata(str(path))
+    assert insert_metadata(str(path), fsync=False, verbose=False) == "present"
+
+
+def test_check_only_reports_without_writing(tmp_path, capsys):
+    (tmp_path / "a.md").write_text("---\n", encoding="utf-8")
+    (tmp_path / "b.md").write_text("body\n", encoding="utf-8")
+
+    assert main(["--recursive", str(tmp_path), "--check-only", "--no-fsync"]) == 1
+    assert (tmp_path / "b.md").read_text(encoding="utf-8") == "body\n"
+    assert main(["--recursive", str(tmp_path), "--no-fsync"]) == 0
+    assert main(["--recursive", str(tmp_path), "--check-only"]) == 0
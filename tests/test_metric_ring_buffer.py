@@ -0,0 +1,60 @@
+import os
+import sys
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from metric_ring_buffer import ColumnarRingBuffer  # noqa: E402
+
+
+@dataclass
+class Sample:
+    value: float
+    count: int
+    flag: bool
+
+
+def test_appends_and_extends_keep_the_newest_samples_in_order():
+    capacity = 7
+    buffer = ColumnarRingBuffer.for_dataclass(Sample, capacity)
+    expected = deque(maxlen=capacity)   # what the list-based buffers kept
+    rng = np.random.default_rng(0)
+    total = 0
+
+    for step in range(60):
+        count = int(rng.integers(0, 2 * capacity + 2))
+        values = rng.normal(size=count)
+        rows = [Sample(float(v), total + i, bool(i % 2)) for i, v in enumerate(values)]
+        if step % 3 == 0:
+            for row in rows:
+                buffer.append(row)
+        else:
+            buffer.extend({"value": values, "count": [r.count for r in rows], "flag": [r.flag for r in rows]})
+        expected.extend(rows)
+        total += count
+
+        assert len(buffer) == len(expected)
+        assert buffer.total_appended == total
+        assert buffer.records() == list(expected)
+        assert buffer.latest() == (expected[-1] if expected else None)
+        for n in (0, 1, 3, capacity, capacity + 5):
+            newest = list(expected)[-n:] if n else []
+            assert buffer.column("count", n).tolist() == [r.count for r in newest]
+            np.testing.assert_array_equal(buffer.matrix(n, ("value", "count")),
+                                          np.array([[r.value, r.count] for r in newest]).reshape(-1, 2))
+
+
+def test_windows_are_read_only_views():
+    buffer = ColumnarRingBuffer({"value": np.float64}, 4)
+    buffer.extend({"value": np.arange(6.0)})
+
+    window = buffer.window()["value"]
+
+    assert window.tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert np.shares_memory(window, buffer.column("value"))
+    with pytest.raises(ValueError):
+        window[0] = 1.0
@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from monitor_instrumentation import MetricsRegistry, render_prometheus  # noqa: E402
+from sustainability_ai_monitor import SustainabilityAIMonitor  # noqa: E402
+
+
+def test_executor_backlog_settles_for_calls_that_never_run():
+    registry = MetricsRegistry()
+    executor = ThreadPoolExecutor(max_workers=1)
+    futures = [executor.submit(registry.timed_executor_call("s", time.sleep, 0.05)) for _ in range(3)]
+    assert registry.executor_backlog() == 3
+
+    executor.shutdown(wait=True, cancel_futures=True)
+    try:
+        executor.submit(registry.timed_executor_call("s", time.sleep, 0))
+    except RuntimeError:
+        pass
+
+    assert futures[0].done()
+    assert registry.executor_backlog() == 0
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(namespace="t")
+    for value in (1e-5, 1e-3, 1e-3, 20.0):
+        registry.observe("lat", value)
+
+    lines = render_prometheus(registry).splitlines()
+
+    assert 't_lat_bucket{le="1e-05"} 1' in lines
+    assert 't_lat_bucket{le="0.001"} 3' in lines
+    assert 't_lat_bucket{le="10.0"} 3' in lines
+    assert 't_lat_bucket{le="+Inf"} 4' in lines
+    assert "t_lat_count 4" in lines
+
+
+def test_dropped_total_is_only_exported_per_queue():
+    monitor = SustainabilityAIMonitor(config={})
+    monitor.metrics.inc("dropped_total", queue="parse")
+
+    lines = [line for line in render_prometheus(monitor.metrics).splitlines()
+             if line.startswith("gaia_monitor_dropped_total")]
+
+    assert 'gaia_monitor_dropped_total{queue="parse"} 1' in lines
+    assert all("{" in line for line in lines)
@@ -0,0 +1,102 @@
+import itertools
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from monitor_rules import MonitorRules, rank_indices, rank_names  # noqa: E402
+
+
+def co2_recommendations(metrics, trend, co2_threshold=50.0):
+    """The monitor's original inline rules"""
+    recommendations = []
+    if metrics.absolute_co2_emissions > co2_threshold * 0.8:
+        recommendations.append("URGENT: Implement immediate CO2 reduction measures")
+    if trend == "increasing":
+        recommendations.append("Proactive measures needed to reverse CO2 trend")
+    if metrics.well_to_wake_emissions > 50:
+        recommendations.append("Optimize fuel/energy supply chain efficiency")
+    return tuple(recommendations) + ("Consider sustainable aviation fuel (SAF) adoption",
+                                     "Implement operational efficiency improvements",
+                                     "Explore hydrogen propulsion for future fleet")
+
+
+def resource_indicators(metrics):
+    indicators = []
+    if metrics.critical_material_intensity > 0.8 * (1 + 0.15):
+        indicators.append("high_material_intensity")
+    if metrics.supply_chain_risk_index > 70:
+        indicators.append("supply_chain_risk")
+    if metrics.resource_circularity_indicator < 0.3:
+        indicators.append("low_circularity")
+    return tuple(indicators)
+
+
+def risk_score(metrics):
+    score = (0.3 * metrics.critical_material_intensity + 0.4 * (metrics.supply_chain_risk_index / 100.0) +
+             0.3 * (1.0 - metrics.resource_circularity_indicator))
+    return min(1.0, max(0.0, score))
+
+
+def grid(**axes):
+    """Every combination of the given per-field values, as records and columns"""
+    names = list(axes)
+    rows = [SimpleNamespace(**dict(zip(names, values))) for values in itertools.product(*axes.values())]
+    return rows, {name: np.array([getattr(row, name) for row in rows]) for name in names}
+
+
+def test_co2_recommendation_table_matches_the_inline_rules():
+    rules = MonitorRules()
+    rows, columns = grid(absolute_co2_emissions=[0.0, 39.9, 40.0, 40.1, 60.0],
+                         well_to_wake_emissions=[49.9, 50.0, 50.1],
+                         trend_direction=["increasing", "decreasing", "none"])
+    table = rules.co2_recommendations
+
+    single = [table.results(table.code(row)) for row in rows]
+    batch = table.results_batch(table.codes(columns))
+
+    assert single == [co2_recommendations(row, row.trend_direction) for row in rows]
+    assert batch == single
+    assert all(a is b for a, b in zip(batch, single))   # one interned tuple per code
+
+
+def test_resource_rules_and_risk_score_match_the_inline_rules():
+    rules = MonitorRules()
+    rows, columns = grid(critical_material_intensity=[0.0, 0.91, 0.92, 0.93, 2.5],
+                         supply_chain_risk_index=[0.0, 69.9, 70.0, 70.1, 100.0],
+                         resource_circularity_indicator=[0.0, 0.29, 0.3, 0.31, 1.0])
+
+    masks = rules.resource.masks(columns)
+    scores = rules.risk_score_batch(columns)
+
+    for i, row in enumerate(rows):
+        expected = resource_indicators(row)
+        assert rules.resource.names(rules.resource.code(row)) == expected
+        assert tuple(name for name, mask in masks.items() if mask[i]) == expected
+        score = rules.risk_score(row.critical_material_intensity, row.supply_chain_risk_index,
+                                 row.resource_circularity_indicator)
+        assert score == pytest.approx(risk_score(row))
+        assert scores[i] == pytest.approx(score)
+
+
+def test_config_overrides_thresholds_and_weights():
+    rules = MonitorRules({"rules": {"co2_threshold": 100.0, "risk_weights": {"supply_risk": 0.0}},
+                          "safety_margins": {"co2_margin": 0.2}})
+    row = SimpleNamespace(absolute_co2_emissions=60.0, well_to_wake_emissions=0.0, trend_direction=None)
+
+    assert rules.co2_limit == pytest.approx(80.0)
+    assert rules.co2_recommendations.results(rules.co2_recommendations.code(row)) == \
+        co2_recommendations(row, None, co2_threshold=100.0)
+    assert rules.risk_weights == (0.3, 0.0, 0.3)
+
+
+@pytest.mark.parametrize("values", [(3.0, 1.0, 2.0), (1.0, 1.0, 1.0), (2.0, 5.0, 2.0), (0.0, -1.0, 0.0, 4.0)])
+def test_rankings_match_a_stable_descending_sort(values):
+    names = tuple(f"f{i}" for i in range(len(values)))
+
+    assert rank_indices(values) == tuple(sorted(range(len(values)), key=lambda k: values[k], reverse=True))
+    assert rank_names(names, values) == tuple(sorted(names, key=dict(zip(names, values)).get, reverse=True))
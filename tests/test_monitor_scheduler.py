@@ -0,0 +1,106 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from monitor_scheduler import MonitorScheduler  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(clock, **config):
+    return MonitorScheduler(100, {"batch_window_ms": 0, "stable_ticks": 3, **config}, clock=clock)
+
+
+def test_urgent_status_tightens_down_to_the_minimum_and_pulls_the_poll_in():
+    clock = FakeClock()
+    s = scheduler(clock)
+    s.add("a")
+    schedule = s.assets["a"]
+    first = schedule.due   # random phase within the first 100 ms
+
+    s.report("a", "HIGH")
+    assert schedule.interval_s == pytest.approx(0.05)
+    assert schedule.due == pytest.approx(min(first, 0.05))
+
+    for _ in range(5):
+        s.report("a", "CRITICAL")
+    assert schedule.interval_s == pytest.approx(0.025)
+    assert schedule.due == pytest.approx(min(first, 0.025))
+    assert s.counters["tightened"] == 2
+
+    clock.now = 0.025
+    assert s.advance_due(clock.now) == ["a"]
+    assert s.advance_due(clock.now) == []   # superseded heap entries are skipped
+
+
+def test_calm_polls_relax_the_interval_up_to_the_maximum():
+    s = scheduler(FakeClock(), max_interval_ms=200)
+    s.add("a")
+    schedule = s.assets["a"]
+
+    for value in (10.0, 10.1, 10.2):
+        s.report("a", "NORMAL", value)
+    assert schedule.interval_s == pytest.approx(0.15)
+
+    s.report("a", "NORMAL", 20.0)   # not stable: the calm count restarts
+    s.report("a", "NORMAL", 20.0)
+    assert schedule.interval_s == pytest.approx(0.15)
+
+    for _ in range(6):
+        s.report("a", "NORMAL")
+    assert schedule.interval_s == pytest.approx(0.2)
+    assert s.counters["relaxed"] == 2
+
+
+def test_late_polls_keep_their_cadence_and_missed_ones_skip_ahead():
+    clock = FakeClock()
+    s = scheduler(clock)
+    s.add("a")
+    schedule = s.assets["a"]
+    first = schedule.due
+
+    clock.now = first + 0.0045   # late, within one interval
+    assert s.advance_due(clock.now) == ["a"]
+    assert schedule.due == pytest.approx(first + 0.1)   # from the deadline, not the dispatch
+    assert schedule.missed == 0
+
+    clock.now = schedule.due + 0.35   # more than a full interval late
+    assert s.advance_due(clock.now) == ["a"]
+    assert schedule.missed == 1
+    assert s.counters["missed"] == 1
+    assert schedule.due == pytest.approx(clock.now + 0.1)   # no burst of catch-up polls
+    assert s.advance_due(clock.now) == []
+
+    jitter = s.stats()["jitter_ms"]
+    assert jitter["mean"] == pytest.approx((4.5 + 350) / 2)
+    assert jitter["p50_le"] == pytest.approx(5.0)
+    assert jitter["p99_le"] == pytest.approx(500.0)
+
+
+def test_run_dispatches_due_assets_and_applies_their_statuses():
+    s = MonitorScheduler(10, {"min_interval_ms": 5})
+    for asset_id in ("a", "b"):
+        s.add(asset_id)
+    seen = []
+
+    async def dispatch(asset_ids):
+        seen.extend(asset_ids)
+        if len(seen) >= 6:
+            s.stop()
+        return {asset_id: "HIGH" if asset_id == "a" else ("NORMAL", 1.0) for asset_id in asset_ids}
+
+    asyncio.run(asyncio.wait_for(s.run(dispatch), 5))
+
+    assert {"a", "b"} <= set(seen)
+    assert s.assets["a"].interval_s == pytest.approx(0.005)
+    assert s.assets["b"].interval_s == pytest.approx(0.01)
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from monitor_snapshot import (  # noqa: E402
+    SnapshotFormatError,
+    encode_json,
+    read_snapshot,
+    write_snapshot,
+)
+from sustainability_ai_monitor import CO2Metrics, SustainabilityAIMonitor  # noqa: E402
+
+SECTIONS = {
+    "meta": encode_json({"version": 1}),
+    "floats": np.arange(12, dtype=np.float64).reshape(3, 4),
+    "ints": np.array([1, -2, 3], dtype=np.int64),
+    "text": np.array([b"ab", b"cde"], dtype="|S3"),
+    "empty": np.empty((0, 3), dtype=np.float32),
+}
+
+
+def test_round_trip_keeps_dtype_shape_and_values(tmp_path):
+    path = str(tmp_path / "s.snapshot")
+    size = write_snapshot(path, SECTIONS, fsync=False)
+
+    sections = read_snapshot(path)
+
+    assert size == os.path.getsize(path)
+    assert list(sections) == list(SECTIONS)
+    for name, array in SECTIONS.items():
+        assert sections[name].dtype == array.dtype
+        np.testing.assert_array_equal(sections[name], array)
+
+
+def test_truncated_snapshot_raises_format_error(tmp_path):
+    path = str(tmp_path / "s.snapshot")
+    size = write_snapshot(path, SECTIONS, fsync=False)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    for cut in range(size):
+        with open(path, "wb") as f:
+            f.write(data[:cut])
+        with pytest.raises(SnapshotFormatError):
+            read_snapshot(path)
+
+
+def test_corrupt_dtype_and_missing_section_raise_format_error(tmp_path):
+    path = str(tmp_path / "s.snapshot")
+    write_snapshot(path, {"ints": SECTIONS["ints"]}, fsync=False)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data.replace(b"<i8", b"|\xff8"))
+    with pytest.raises(SnapshotFormatError):
+        read_snapshot(path)
+
+    write_snapshot(path, {"ints": SECTIONS["ints"]}, fsync=False)
+    with pytest.raises(SnapshotFormatError):
+        read_snapshot(path, required=("meta",))
+
+
+def test_monitor_restores_its_snapshot_and_ignores_a_truncated_one(tmp_path):
+    path = str(tmp_path / "monitor.snapshot")
+
+    async def save():
+        monitor = SustainabilityAIMonitor(config={"snapshot": {"path": path}})
+        await monitor.initialize_ai_models()
+        for i in range(15):
+            await monitor.process_co2_metrics(CO2Metrics(40.0 + i, 89.5, 42.1, 12.3, i))
+        await monitor.save_snapshot()
+        monitor.close()
+        return monitor
+
+    saved = asyncio.run(save())
+    restored = SustainabilityAIMonitor(config={"snapshot": {"path": path}})
+    assert restored.restore_snapshot()
+    np.testing.assert_array_equal(restored.co2_buffer.column("absolute_co2_emissions"),
+                                  saved.co2_buffer.column("absolute_co2_emissions"))
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) // 2)
+    assert not SustainabilityAIMonitor(config={"snapshot": {"path": path}}).restore_snapshot()
+    write_snapshot(path, {"ints": SECTIONS["ints"]}, fsync=False)
+    assert not SustainabilityAIMonitor(config={"snapshot": {"path": path}}).restore_snapshot()
@@ -0,0 +1,80 @@
+import os
+import random
+import subprocess
+import sys
+
+NPN_LINT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "npn_lint.py")
+sys.path.insert(0, os.path.dirname(NPN_LINT))
+
+from npn_lint import REGEX, validate, validate_many  # noqa: E402
+
+VALID_NAMES = ("GPFD-07-000-0001-CF-v1.0.md", "AB-00-000-0000-XX-r01.x", "ABCDE-12-345-6789-ABCDEF-123-r90.tar12")
+
+
+def run_lint(cwd, *args):
+    result = subprocess.run([sys.executable, NPN_LINT, *args], cwd=cwd,
+                            capture_output=True, text=True)
+    return result.returncode, result.stdout, result.stderr
+
+
+def test_cache_in_tree_gives_identical_results(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "a.md").touch()
+
+    first = run_lint(tmp_path, "-r", ".", "--cache", "--summary-only")
+    second = run_lint(tmp_path, "-r", ".", "--cache", "--summary-only")
+
+    assert (tmp_path / ".npn_lint_cache.json").exists()
+    assert first[:2] == second[:2] == (1, "1 checked, 1 invalid\n")
+    assert "2 directories reused, 0 rescanned" in second[2]
+
+
+def test_index_in_tree_is_not_linted_and_reuses_directories(tmp_path):
+    docs = tmp_path / "sub"
+    docs.mkdir()
+    for ver in ("v1.0", "v1.2", "r02"):
+        (docs / f"GPFD-07-000-0001-CF-{ver}.md").touch()
+
+    assert "2 directories indexed, 0 unchanged" in run_lint(tmp_path, "index", "build", ".")[2]
+    assert "0 directories indexed, 2 unchanged" in run_lint(tmp_path, "index", "build", ".")[2]
+    assert run_lint(tmp_path, "-r", ".", "--summary-only")[:2] == (0, "3 checked, 0 invalid\n")
+
+    # v and r numbers are not comparable: one latest per scheme
+    code, out, _ = run_lint(tmp_path, "index", "latest", "GPFD-07-000-0001")
+    assert code == 0
+    assert [line.split()[1] for line in out.splitlines()] == ["r02", "v1.2"]
+
+
+def mutations(seed=0, count=3000):
+    """Canonical names with random single-character edits, plus edge cases"""
+    rng = random.Random(seed)
+    alphabet = "AZaz09-._ vr"
+    names = list(VALID_NAMES) + ["", "-", "A", " GPFD-07-000-0001-CF-v1.0.md", "GPFD-07-000-0001-CF-r00.md"]
+    for _ in range(count):
+        name = list(rng.choice(VALID_NAMES))
+        i = rng.randrange(len(name) + 1)
+        edit = rng.randrange(3)
+        if edit == 0 and i < len(name):
+            del name[i]
+        elif edit == 1:
+            name.insert(i, rng.choice(alphabet))
+        elif i < len(name):
+            name[i] = rng.choice(alphabet)
+        names.append("".join(name))
+    return names
+
+
+def test_validate_matches_the_plain_regex():
+    names = mutations()
+    expected = [REGEX.match(name) for name in names]
+
+    for cache in (False, True):
+        results = [validate(name, cache=cache) for name in names]
+        batch = [parsed for _, parsed in validate_many(names, cache=cache)]
+        for name, match, parsed, batched in zip(names, expected, results, batch):
+            if match is None:
+                assert parsed is None and batched is None, name
+            else:
+                assert parsed.as_dict() == match.groupdict(), name
+                assert batched == parsed
+    assert 0 < sum(match is not None for match in expected) < len(names)
@@ -0,0 +1,103 @@
+import os
+import sys
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from online_trainer import OnlineTrainer  # noqa: E402
+from prediction_engine import PREDICTION_FEATURES, PREDICTION_WINDOW, SimplePredictionModel  # noqa: E402
+
+
+class InlineExecutor:
+    """Runs each training round as it is submitted"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def trainer(model=None, **config):
+    settings = {"horizon_s": 5, "train_every": 1000, "seed": 0, **config}
+    executor = InlineExecutor()
+    return OnlineTrainer(lambda: model, lambda: executor, config=settings)
+
+
+def window(value):
+    return np.full((PREDICTION_WINDOW, len(PREDICTION_FEATURES)), float(value))
+
+
+def matured_trainer(**config):
+    """Predictions at t = 0..9 (and 28) against observations every 2 s from t = 0 to 30"""
+    t = trainer(**config)
+    for ts in (*range(10), 28):
+        t.track(ts, window(ts), 0.9 * (1000 + ts + 5 + (ts + 5) % 2))
+    for ts in range(0, 32, 2):
+        t.observe(ts, 1000.0 + ts)
+    t._round()
+    return t
+
+
+def test_predictions_match_the_first_observation_past_their_horizon():
+    t = matured_trainer()
+
+    windows, targets = t.replay.ordered()
+
+    # The first observation at or after ts + 5 is the next even timestamp
+    assert targets.tolist() == [1000.0 + ts + 5 + (ts + 5) % 2 for ts in range(10)]
+    assert windows[:, 0, 0].tolist() == list(range(10))
+    assert t.counters["matured"] == 10
+    assert t.stats()["pending"] == 1   # t = 28 is due at 33, after the last observation
+
+
+def test_rolling_error_covers_the_newest_matured_predictions():
+    t = matured_trainer(error_window=4)
+
+    targets = np.array([1000.0 + ts + 5 + (ts + 5) % 2 for ts in range(6, 10)])
+    errors = 0.1 * targets
+    error = t.rolling_error()
+
+    assert error["mae"] == pytest.approx(errors.mean())
+    assert error["rmse"] == pytest.approx(np.sqrt(np.mean(errors ** 2)))
+    assert error["mape"] == pytest.approx(0.1)
+    assert t.confidence == pytest.approx(0.9)
+    assert trainer().confidence == 0.0   # nothing matured yet
+
+
+def test_state_round_trip_keeps_errors_confidence_and_replay():
+    saved = matured_trainer(error_window=4)
+    state = saved.get_state()
+
+    restored = trainer(error_window=4)
+    restored.set_state(state)
+    smaller = trainer(error_window=2, replay_capacity=3)
+    smaller.set_state(state)
+
+    assert restored.confidence == saved.confidence
+    assert restored.rolling_error() == saved.rolling_error()
+    for ours, theirs in zip(restored.replay.ordered(), saved.replay.ordered()):
+        np.testing.assert_array_equal(ours, theirs)
+    assert smaller.replay.ordered()[1].tolist() == saved.replay.ordered()[1][-3:].tolist()
+    assert smaller.rolling_error()["mae"] == pytest.approx(np.mean(state["abs_errors"][-2:]))
+    with pytest.raises(ValueError):
+        trainer().set_state({**state, "replay_windows": state["replay_windows"][:, :2]})
+
+
+def test_training_raises_confidence_on_a_learnable_series():
+    model = SimplePredictionModel(rng=np.random.default_rng(0))
+    t = trainer(model, train_every=128)
+    values = 40.0 + np.random.default_rng(1).normal(0, 1, 3000)
+    confidence = []
+    for ts in range(PREDICTION_WINDOW, len(values)):
+        recent = np.column_stack([values[ts - PREDICTION_WINDOW + 1:ts + 1],
+                                  np.full(PREDICTION_WINDOW, 89.5), np.full(PREDICTION_WINDOW, 42.1)])
+        t.track(ts, recent, float(model.predict(recent)[0]))
+        t.observe(ts, values[ts])
+        confidence.append(t.confidence)
+
+    assert confidence[300] < 0.5
+    assert confidence[-1] > 0.9
+    assert t.counters["updates"] > 0
@@ -0,0 +1,62 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from prediction_engine import (  # noqa: E402
+    PREDICTION_FEATURES,
+    PREDICTION_WINDOW,
+    MicroBatcher,
+    SimplePredictionModel,
+)
+
+SHAPE = (PREDICTION_WINDOW, len(PREDICTION_FEATURES))
+
+
+def test_predict_batch_matches_single_window_predict():
+    model = SimplePredictionModel(rng=np.random.default_rng(1))
+    windows = np.random.default_rng(2).normal(size=(7, *SHAPE))
+
+    batch = model.predict_batch(windows)
+
+    assert batch.shape == (7, 5)
+    for window, row in zip(windows, batch):
+        np.testing.assert_allclose(model.predict(window), row)
+
+
+def test_batcher_routes_each_request_to_its_model_in_one_call():
+    models = [SimplePredictionModel(rng=np.random.default_rng(seed)) for seed in range(3)]
+    windows = np.random.default_rng(4).normal(size=(9, *SHAPE))
+    calls = []
+
+    async def runner(fn, arg):
+        calls.append(fn)
+        return fn(arg)
+
+    async def run():
+        batcher = MicroBatcher(runner=runner)
+        rows = await asyncio.gather(*(batcher.predict(window, models[i % 3])
+                                      for i, window in enumerate(windows)))
+        return batcher, rows
+
+    batcher, rows = asyncio.run(run())
+
+    assert batcher.batches == len(calls) == 1
+    for i, (window, row) in enumerate(zip(windows, rows)):
+        np.testing.assert_allclose(row, models[i % 3].predict(window))
+
+
+def test_update_reduces_loss_and_legacy_update_keeps_weight_signs():
+    model = SimplePredictionModel(rng=np.random.default_rng(5))
+    windows = np.random.default_rng(6).normal(size=(64, *SHAPE))
+    targets = np.zeros((64, 5))
+
+    losses = [model.update(windows, targets) for _ in range(50)]
+    assert losses[-1] < losses[0]
+
+    signs = np.sign(model.weights)
+    model.update_weights(20.0)
+    assert np.array_equal(np.sign(model.weights), signs)
@@ -0,0 +1,89 @@
+import asyncio
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from result_codec import ResultWriter, iter_frames  # noqa: E402
+from sustainability_ai_monitor import (  # noqa: E402
+    AGADPhaseData,
+    CO2Metrics,
+    ResourceMetrics,
+    SustainabilityAIMonitor,
+)
+
+CO2 = [CO2Metrics(40.0 + 30 * np.sin(i / 3.0), 89.5 + i % 7, 42.1, 12.3, 1000 + i) for i in range(40)]
+RESOURCE = [ResourceMetrics(0.1 * i, 20.0 + i, 40.0 + 2 * i, 50.0 + i % 9, 1000 + i) for i in range(40)]
+LONG_REPORT = "reports/" + "x" * 200 + ".pdf"   # wider than the telemetry store's column
+AGAD = [AGADPhaseData(f"AGAD {i % 9 + 1}/{i % 4 + 1}", i % 9 + 1, ("Test", "Analysis", "NotAMethod")[i % 3],
+                      LONG_REPORT if i == 7 else f"report_{i % 5:03d}.pdf",
+                      i % 2 == 0, None if i % 6 == 0 else 50.0 + i, 1000 + i)
+        for i in range(36)]
+
+
+async def monitors():
+    monitors = [SustainabilityAIMonitor(config={}) for _ in range(2)]
+    for monitor in monitors:
+        await monitor.initialize_ai_models()
+    monitors[1].prediction_model.set_state(monitors[0].prediction_model.get_state())
+    return monitors
+
+
+def without_timestamp(result):
+    return {key: value for key, value in result.items() if key != "processing_timestamp"}
+
+
+@pytest.mark.parametrize("kind, process, samples", [
+    ("co2", "process_co2_metrics", CO2),
+    ("resource", "process_resource_metrics", RESOURCE),
+    ("agad", "process_agad_phase", AGAD),
+])
+def test_compact_frames_decode_to_the_dict_results(kind, process, samples):
+    async def run():
+        compact_monitor, dict_monitor = await monitors()
+        out = io.BytesIO()
+        writer = ResultWriter(out, compact_monitor.rules, frame_rows=16, matrix=compact_monitor.agad_matrix)
+        expected = []
+        for sample in samples:
+            writer(kind, await getattr(compact_monitor, process)(sample, compact=True))
+            expected.append(await getattr(dict_monitor, process)(sample))
+        writer.close()
+        return out.getvalue(), expected
+
+    data, expected = asyncio.run(run())
+    frames = list(iter_frames(data))
+    decoded = [row for frame in frames for row in frame.to_dicts()]
+
+    assert [frame.kind for frame in frames] == [kind] * 3
+    assert [without_timestamp(row) for row in decoded] == [without_timestamp(row) for row in expected]
+
+
+def test_agad_batch_frames_keep_the_validation_reports():
+    async def run():
+        monitor = (await monitors())[0]
+        out = io.BytesIO()
+        writer = ResultWriter(out, monitor.rules, matrix=monitor.agad_matrix)
+        writer("agad_batch", await monitor.process_agad_phases_batch(AGAD))
+        writer.close()
+        return out.getvalue()
+
+    (frame,) = iter_frames(asyncio.run(run()))
+
+    assert [row["phase_data"]["validation_report"] for row in frame.to_dicts()] == \
+        [sample.validation_report for sample in AGAD]
+    assert len(frame.tables["text"]["validation_report"]) == 6
+
+
+def test_over_long_phase_ids_are_rejected_not_cut():
+    monitor = SustainabilityAIMonitor(config={})
+    phase = AGADPhaseData("AGAD 1/1 " + "x" * 40, 1, "Test", "r.pdf", True, 90.0, 1)
+
+    with pytest.raises(ValueError, match="phase_id"):
+        asyncio.run(monitor.process_agad_phase(phase, compact=True))
+    with pytest.raises(ValueError, match="phase_id"):
+        asyncio.run(monitor.process_agad_phases_batch([phase]))
+    assert len(monitor.agad_store) == 0
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from sustainability_ai_monitor import (  # noqa: E402
+    OPTIMIZATION_FACTORS,
+    CO2Metrics,
+    ResourceMetrics,
+    SustainabilityAIMonitor,
+    health_check,
+)
+
+
+def co2_samples(count, start=0):
+    return [CO2Metrics(40.0 + np.sin(i / 5.0), 89.5 + i % 3, 42.1, 12.3, start + i)
+            for i in range(count)]
+
+
+def paired_monitors():
+    """Two monitors with the same model weights, for per-sample vs batch runs"""
+    async def build():
+        monitors = [SustainabilityAIMonitor(config={}) for _ in range(2)]
+        for monitor in monitors:
+            await monitor.initialize_ai_models()
+        monitors[1].prediction_model.set_state(monitors[0].prediction_model.get_state())
+        return monitors
+    return asyncio.run(build())
+
+
+def test_co2_batch_matches_per_sample_results():
+    single, batched = paired_monitors()
+    samples = [CO2Metrics(35.0 + 20 * np.sin(i / 4.0), 89.5 + i % 7, 42.1, 12.3 + i % 2, i) for i in range(40)]
+
+    async def run():
+        expected = [await single.process_co2_metrics(sample) for sample in samples]
+        # Two batches, so windows also reach back across a batch boundary
+        results = [await batched.process_co2_metrics_batch(samples[:13]),
+                   await batched.process_co2_metrics_batch(samples[13:])]
+        return expected, results
+
+    expected, results = asyncio.run(run())
+    rows = [(result, i) for result in results for i in range(result["count"])]
+
+    assert len(rows) == len(expected)
+    for (result, i), sample in zip(rows, expected):
+        safety, prediction = result["safety_status"], result["prediction"]
+        assert {name: column[i] for name, column in result["metrics"].items()} == sample["metrics"]
+        assert bool(safety["within_limits"][i]) == sample["safety_status"]["within_limits"]
+        assert safety["severity"][i] == sample["safety_status"]["severity"]
+        if "predicted_emissions_24h" in sample["prediction"]:
+            assert prediction["predicted_emissions_24h"][i] == pytest.approx(
+                sample["prediction"]["predicted_emissions_24h"])
+            assert prediction["trend_direction"][i] == sample["prediction"]["trend_direction"]
+        else:
+            assert np.isnan(prediction["predicted_emissions_24h"][i])
+        assert prediction["confidence"][i] == sample["prediction"]["confidence"]
+        assert result["recommendations"][i] == sample["recommendations"]
+    assert {"HIGH", "NORMAL"} == {sample["safety_status"]["severity"] for sample in expected}
+
+
+def test_resource_batch_matches_per_sample_results():
+    single, batched = paired_monitors()
+    samples = [ResourceMetrics(0.05 * i, 5.0 + 3 * i, 20.0 + 2 * i, 40.0 + i % 11, i) for i in range(30)]
+
+    async def run():
+        return ([await single.process_resource_metrics(sample) for sample in samples],
+                await batched.process_resource_metrics_batch(samples))
+
+    expected, result = asyncio.run(run())
+    status, optimization = result["criticality_status"], result["optimization"]
+
+    for i, sample in enumerate(expected):
+        indicators = tuple(name for name, mask in status["critical_indicators"].items() if mask[i])
+        assert indicators == sample["criticality_status"]["critical_indicators"]
+        assert status["overall_status"][i] == sample["criticality_status"]["overall_status"]
+        assert status["risk_score"][i] == pytest.approx(sample["criticality_status"]["risk_score"])
+        factors = sample["optimization"]["optimization_factors"]
+        for name in OPTIMIZATION_FACTORS:
+            assert optimization["optimization_factors"][name][i] == pytest.approx(factors[name])
+        for name, improvement in sample["optimization"]["estimated_improvement"].items():
+            assert optimization["estimated_improvement"][name][i] == pytest.approx(improvement)
+        assert tuple(optimization["implementation_priority"][i]) == \
+            sample["optimization"]["implementation_priority"]
+    assert {"CRITICAL", "NORMAL"} == {sample["criticality_status"]["overall_status"] for sample in expected}
+
+
+def test_health_check_leaves_the_telemetry_store_alone(tmp_path):
+    store = tmp_path / "store"
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"telemetry_store": {"path": str(store), "flush_rows": 1}}))
+
+    report = asyncio.run(health_check(str(config)))
+
+    assert report["status"] == "ok"
+    assert not store.exists()
+
+
+def test_lazy_models_pick_up_restored_weights(tmp_path):
+    path = str(tmp_path / "monitor.snapshot")
+
+    async def save():
+        monitor = SustainabilityAIMonitor(config={"snapshot": {"path": path}})
+        await monitor.initialize_ai_models()
+        for sample in co2_samples(12):
+            await monitor.process_co2_metrics(sample)
+        await monitor.save_snapshot()
+        monitor.close()
+        return monitor.prediction_model.get_state()
+
+    async def restore():
+        monitor = SustainabilityAIMonitor(config={"snapshot": {"path": path}, "lazy_models": True})
+        await monitor.initialize_ai_models()
+        assert monitor.restore_snapshot()
+        assert monitor.prediction_model is None
+        await monitor.process_co2_metrics(co2_samples(1, 12)[0])
+        monitor.close()
+        return monitor.prediction_model.get_state()
+
+    saved = asyncio.run(save())
+    restored = asyncio.run(restore())
+
+    np.testing.assert_array_equal(restored["weights"], saved["weights"])
+    np.testing.assert_array_equal(restored["bias"], saved["bias"])
+
+
+def test_snapshot_keeps_the_trainer_confidence(tmp_path):
+    config = {"snapshot": {"path": str(tmp_path / "monitor.snapshot")},
+              "training": {"horizon_s": 2, "train_every": 10 ** 6, "seed": 0}}
+
+    async def save():
+        monitor = SustainabilityAIMonitor(config=config)
+        await monitor.initialize_ai_models()
+        for sample in co2_samples(30):
+            await monitor.process_co2_metrics(sample)
+        monitor.trainer._round()
+        await monitor.save_snapshot()
+        monitor.close()
+        return monitor.trainer
+
+    saved = asyncio.run(save())
+    restored = SustainabilityAIMonitor(config=config)
+    assert restored.restore_snapshot()
+
+    assert saved.counters["matured"] > 0
+    assert restored.trainer.confidence == saved.confidence
+    assert restored.trainer.rolling_error() == saved.rolling_error()
+    assert len(restored.trainer.replay) == len(saved.replay)
@@ -0,0 +1,107 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+import telemetry_store  # noqa: E402
+from telemetry_store import ColumnTable  # noqa: E402
+
+SCHEMA = [("timestamp_utc", "int64"), ("value", "float64")]
+
+
+class Crash(Exception):
+    pass
+
+
+def make_table(path):
+    table = ColumnTable(str(path), SCHEMA, segment_rows=4, flush_rows=1)
+    for ts in range(10):
+        table.append_columns({"timestamp_utc": [ts], "value": [float(ts)]})
+    table.flush()
+    return table
+
+
+def contents(path):
+    table = ColumnTable(str(path), SCHEMA, segment_rows=4, flush_rows=1)
+    names = sorted(os.listdir(str(path)))
+    return list(table.query(0, 100)["timestamp_utc"]), names
+
+
+@pytest.mark.parametrize("crash_at", range(1, 6))
+def test_compact_recovers_from_crash_at_any_step(tmp_path, monkeypatch, crash_at):
+    table = make_table(tmp_path)
+    assert len(table.segments) == 3
+    calls = {"n": 0}
+    real_replace, real_rmtree = os.replace, shutil.rmtree
+
+    def step(real):
+        def wrapped(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == crash_at:
+                raise Crash()
+            return real(*args, **kwargs)
+        return wrapped
+
+    monkeypatch.setattr(telemetry_store.os, "replace", step(real_replace))
+    monkeypatch.setattr(telemetry_store.shutil, "rmtree", step(real_rmtree))
+    with pytest.raises(Crash):
+        table.compact(target_rows=16)
+    monkeypatch.undo()
+
+    timestamps, names = contents(tmp_path)
+    assert timestamps == list(range(10))
+    assert not [n for n in names if n.endswith((".old", ".compact"))]
+
+
+def test_segment_without_meta_is_reopened(tmp_path):
+    make_table(tmp_path)
+    os.remove(os.path.join(str(tmp_path), "seg-000002", "_meta.json"))
+    os.makedirs(os.path.join(str(tmp_path), "seg-000004"))
+
+    timestamps, _ = contents(tmp_path)
+    assert timestamps == list(range(10))
+    table = ColumnTable(str(tmp_path), SCHEMA, segment_rows=4, flush_rows=1)
+    assert np.all(np.diff(table.query(0, 100)["timestamp_utc"]) > 0)
+
+
+def test_queries_match_a_brute_force_filter_across_reopen_and_compact(tmp_path):
+    rng = np.random.default_rng(0)
+    timestamps = np.cumsum(rng.choice([0, 1, 1, 2, 7], size=300)) - rng.choice([0, 0, 0, 3], size=300)
+    values = rng.normal(size=300)
+    table = ColumnTable(str(tmp_path), SCHEMA, segment_rows=32, index_stride=4, flush_rows=10)
+    for start in range(0, 300, 25):
+        table.append_columns({"timestamp_utc": timestamps[start:start + 25],
+                              "value": values[start:start + 25]})
+    ranges = [(int(lo), int(lo + width)) for lo, width in
+              zip(rng.integers(-5, timestamps.max() + 5, 40), rng.integers(0, 60, 40))]
+
+    def expected(lo, hi):
+        keep = (timestamps >= lo) & (timestamps <= hi)
+        return timestamps[keep], values[keep]
+
+    def check(table, in_append_order):
+        for lo, hi in ranges:
+            result = table.query(lo, hi)
+            got, want = (result["timestamp_utc"], result["value"]), expected(lo, hi)
+            if not in_append_order:
+                got, want = ([column[np.lexsort(pair[::-1])] for column in pair] for pair in (got, want))
+            np.testing.assert_array_equal(got[0], want[0])
+            np.testing.assert_array_equal(got[1], want[1])
+
+    check(table, in_append_order=True)
+    tail = table.tail(45)
+    np.testing.assert_array_equal(tail["value"], values[-45:])
+
+    reopened = ColumnTable(str(tmp_path), SCHEMA, segment_rows=32, index_stride=4, flush_rows=10)
+    assert reopened.rows == 300
+    check(reopened, in_append_order=True)
+
+    assert reopened.compact(target_rows=128) > 0
+    assert all(segment.sorted for segment in reopened.segments if segment.sealed)
+    check(reopened, in_append_order=False)
+    check(ColumnTable(str(tmp_path), SCHEMA, segment_rows=32, index_stride=4, flush_rows=10),
+          in_append_order=False)
@@ -0,0 +1,104 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profile"))
+
+from windowed_aggregates import RollingWindow  # noqa: E402
+
+WINDOW_S = 50.0
+QUANTILES = (0.0, 0.5, 0.95, 0.99, 1.0)
+
+
+def stream(count=600, seed=0):
+    """Second-resolution timestamps with repeats, gaps and a few late samples"""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([0, 1, 1, 2, 5, 40, 80], size=count)
+    timestamps = np.cumsum(steps).astype(np.float64)
+    late = rng.random(count) < 0.05
+    timestamps[late] -= 3
+    values = rng.normal(20.0, 8.0, count)   # both signs, so negative buckets are covered
+    values[rng.random(count) < 0.02] = 0.0
+    return timestamps, values
+
+
+class BruteForce:
+    """Every sample kept; statistics recomputed from scratch"""
+
+    def __init__(self, window_s, tau_s):
+        self.window_s, self.tau_s = window_s, tau_s
+        self.samples, self.ewma, self.last = [], None, None
+
+    def add(self, timestamp, value):
+        if self.last is not None:
+            timestamp = max(timestamp, self.last)
+            dt = max(timestamp - self.last, 1.0)
+            self.ewma += (1.0 - math.exp(-dt / self.tau_s)) * (value - self.ewma)
+        else:
+            self.ewma = value
+        self.last = timestamp
+        self.samples.append((timestamp, value))
+
+    def live(self):
+        return sorted(v for t, v in self.samples if t > self.last - self.window_s)
+
+
+def check(window, reference):
+    live = reference.live()
+    assert len(window) == len(live)
+    assert window.mean == pytest.approx(np.mean(live), rel=1e-9, abs=1e-9)
+    assert window.min == min(live)
+    assert window.max == max(live)
+    assert window.ewma == pytest.approx(reference.ewma, rel=1e-9)
+    for q in QUANTILES:
+        true = live[int(q * (len(live) - 1))]
+        assert window.quantile(q) == pytest.approx(true, rel=window.relative_accuracy, abs=1e-9)
+
+
+def test_per_sample_updates_match_brute_force():
+    timestamps, values = stream()
+    window = RollingWindow(WINDOW_S, ewma_tau_s=20.0)
+    reference = BruteForce(WINDOW_S, 20.0)
+
+    for timestamp, value in zip(timestamps.tolist(), values.tolist()):
+        window.add(timestamp, value)
+        reference.add(timestamp, value)
+        check(window, reference)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_batches_match_per_sample_updates(seed):
+    timestamps, values = stream(seed=seed)
+    rng = np.random.default_rng(seed)
+    cuts = np.sort(rng.choice(np.arange(1, len(values)), size=12, replace=False))
+    batched = RollingWindow(WINDOW_S, ewma_tau_s=20.0)
+    single = RollingWindow(WINDOW_S, ewma_tau_s=20.0)
+    reference = BruteForce(WINDOW_S, 20.0)
+
+    for i, (ts, vs) in enumerate(zip(np.split(timestamps, cuts), np.split(values, cuts))):
+        if i % 3 == 2:
+            for timestamp, value in zip(ts.tolist(), vs.tolist()):
+                batched.add(timestamp, value)
+        else:
+            batched.add_many(ts, vs)
+        for timestamp, value in zip(ts.tolist(), vs.tolist()):
+            single.add(timestamp, value)
+            reference.add(timestamp, value)
+        check(batched, reference)
+        assert [batched.quantile(q) for q in QUANTILES] == [single.quantile(q) for q in QUANTILES]
+
+
+def test_state_round_trip_rebuilds_the_window():
+    timestamps, values = stream()
+    window = RollingWindow(WINDOW_S)
+    window.add_many(timestamps, values)
+
+    restored = RollingWindow(WINDOW_S)
+    restored.set_state(window.get_state())
+    restored.add(timestamps[-1] + 7, 3.0)
+    window.add(timestamps[-1] + 7, 3.0)
+
+    assert restored.summary() == window.summary()